@@ -5,6 +5,7 @@ Created on Wed Feb 19 13:23:18 2025
 @author: lasse
 """
 import pygame
+from asset_atlas import assets
 
 class Button:
     def __init__(self, x, y, width, height, action, image_path, alt_image_path=None):
@@ -26,15 +27,13 @@ class Button:
         
         if image_path:
             try:
-                self.image = pygame.image.load(image_path).convert_alpha()
-                self.image = pygame.transform.smoothscale(self.image, (width, height))
+                self.image = assets.image(image_path, (width, height))  #Shared and already scaled, from the asset atlas
             except pygame.error:
                 print(f"Error loading image: {image_path}.")
                 
         if alt_image_path:
             try:
-                self.alt_image = pygame.image.load(alt_image_path).convert_alpha()
-                self.alt_image = pygame.transform.smoothscale(self.alt_image, (width, height))
+                self.alt_image = assets.image(alt_image_path, (width, height))  #Shared and already scaled, from the asset atlas
             except pygame.error:
                 print(f"Error loading alt image: {alt_image_path}.")
                 
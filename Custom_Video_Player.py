@@ -1,38 +1,237 @@
-import pygame
+import json
+import os
+import threading
+
 import cv2
-import sys
+import numpy as np
+import pygame
 
-def play_static_video(video_path, screen, screen_width, screen_height, background_image):
-    """Plays a staticy MP4 video in the background until it ends."""
-    cap = cv2.VideoCapture(video_path)
 
-    clock = pygame.time.Clock()
-    video_running = True
+class FrameRing:
+
+    def __init__(self, depth, shape):
+        """
+        Fixed set of preallocated frame buffers handed between one producer and one consumer.
+        The producer blocks while every buffer is full, the consumer while every buffer is empty.
+        """
+        self.buffers = np.empty((depth,) + shape, dtype=np.uint8)
+        self.depth = depth
+        self._condition = threading.Condition()
+        self._head = 0  # next buffer to read
+        self._count = 0  # buffers holding unread frames
+        self._finished = False  # the producer has no more frames
+        self._stopped = False  # the consumer does not want any more frames
+
+    def acquire_write(self):
+        """Waits for a free buffer and returns it, None once the consumer stopped."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._count < self.depth or self._stopped)
+            if self._stopped:
+                return None
+            return self.buffers[(self._head + self._count) % self.depth]
+
+    def commit_write(self):
+        with self._condition:
+            self._count += 1
+            self._condition.notify_all()
+
+    def acquire_read(self):
+        """Waits for the next frame and returns its buffer, None once every frame was read."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._count > 0 or self._finished or self._stopped)
+            if self._count == 0 or self._stopped:
+                return None
+            return self.buffers[self._head]
+
+    def release_read(self):
+        with self._condition:
+            self._head = (self._head + 1) % self.depth
+            self._count -= 1
+            self._condition.notify_all()
+
+    @property
+    def stopped(self):
+        return self._stopped
+
+    def finish(self):
+        with self._condition:
+            self._finished = True
+            self._condition.notify_all()
+
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
 
-    while cap.isOpened() and video_running:
-        ret, frame = cap.read()
-        if not ret:
-            break  #Stop when the video ends
 
-        #Convert frame from BGR (OpenCV) to RGB (Pygame)
-        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        frame = cv2.transpose(frame)
-        frame_surface = pygame.surfarray.make_surface(frame)
+class ClipDecoder:
 
-        #Scale the video to match screen size
-        frame_surface = pygame.transform.scale(frame_surface, (screen_width, screen_height))
+    def __init__(self, video_path, size, depth=8, cache_dir=None, max_cache_bytes=512 * 1024 * 1024):
+        """
+        Decodes a video clip on its own thread into a small ring of frames that are already scaled to
+        the screen and converted to RGB, so the UI thread only has to blit them. The decoded frames can
+        be kept in a raw file that later launches memory-map instead of decoding the clip again.
 
-        screen.blit(frame_surface, (0, 0))
-        screen.blit(background_image, (0, 0)) 
-        pygame.display.update()
+        Parameters:
+            video_path (str): The clip to play.
+            size (tuple): (width, height) the frames are scaled to.
+            depth (int): Frames decoded ahead of playback.
+            cache_dir (str): Folder for the raw frame cache, None turns the cache off.
+            max_cache_bytes (int): Clips that would decode to more than this are not cached.
+        """
+        self.video_path = video_path
+        self.size = size
+        self.depth = depth
+        self.cache_dir = cache_dir
+        self.max_cache_bytes = max_cache_bytes
+        self.fps = 30.0
+        self.cached = False
+        self._ring = None
+        self._thread = None
+        self._cache_frames = None
 
-        #Allows quiting
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                video_running = False  #Stop video early
-                pygame.quit()
-                sys.exit()
+    def _cache_paths(self):
+        width, height = self.size
+        name = f"{os.path.splitext(os.path.basename(self.video_path))[0]}_{width}x{height}"
+        return os.path.join(self.cache_dir, name + ".rgb"), os.path.join(self.cache_dir, name + ".json")
+
+    def _source_key(self):
+        stat = os.stat(self.video_path)
+        return {"size": stat.st_size, "mtime": stat.st_mtime}
+
+    def _open_cache(self):
+        if self.cache_dir is None or not os.path.exists(self.video_path):
+            return None
+        frames_path, info_path = self._cache_paths()
+        try:
+            with open(info_path) as file:
+                info = json.load(file)
+            if info["source"] != self._source_key() or not os.path.exists(frames_path):
+                return None  # the clip changed since it was cached
+            width, height = self.size
+            self.fps = info["fps"]
+            return np.memmap(frames_path, dtype=np.uint8, mode="r", shape=(info["frames"], height, width, 3))
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def start(self):
+        self._cache_frames = self._open_cache()
+        if self._cache_frames is not None:
+            self.cached = True
+            return self
+        width, height = self.size
+        self._ring = FrameRing(self.depth, (height, width, 3))
+        capture = cv2.VideoCapture(self.video_path)
+        fps = capture.get(cv2.CAP_PROP_FPS)
+        if fps and fps > 0:
+            self.fps = fps
+        self._thread = threading.Thread(target=self._decode, args=(capture,), daemon=True)
+        self._thread.start()
+        return self
+
+    def _decode(self, capture):
+        cache_file, frames_written, cache_path = None, 0, None
+        if self.cache_dir is not None and capture.isOpened():
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                cache_path = self._cache_paths()[0] + ".part"
+                cache_file = open(cache_path, "wb")
+            except OSError as e:
+                print(f"Video cache disabled: {e}")
+        frame_bytes = self.size[0] * self.size[1] * 3
+        scaled = None
+        completed = False  #The player stops the ring after the last frame too, so the end of the clip is tracked here
+        try:
+            while capture.isOpened():
+                ret, frame = capture.read()
+                if not ret:
+                    completed = True
+                    break  #Stop when the video ends
+                buffer = self._ring.acquire_write()
+                if buffer is None:
+                    break  #Playback was skipped
+                #Scale first so the colour conversion only touches screen sized frames, straight into the ring
+                scaled = cv2.resize(frame, self.size, dst=scaled, interpolation=cv2.INTER_LINEAR)
+                cv2.cvtColor(scaled, cv2.COLOR_BGR2RGB, dst=buffer)
+                if cache_file is not None:
+                    if (frames_written + 1) * frame_bytes > self.max_cache_bytes:
+                        cache_file.close()
+                        os.remove(cache_path)
+                        cache_file = None
+                    else:
+                        cache_file.write(buffer.data)
+                        frames_written += 1
+                self._ring.commit_write()
+        finally:
+            capture.release()
+            self._ring.finish()
+            if cache_file is not None:
+                cache_file.close()
+                self._save_cache(cache_path, frames_written, completed)
+
+    def _save_cache(self, part_path, frames, completed):
+        # Only a clip that was decoded to the end is kept
+        if not completed or frames == 0:
+            os.remove(part_path)
+            return
+        frames_path, info_path = self._cache_paths()
+        os.replace(part_path, frames_path)
+        with open(info_path, "w") as file:
+            json.dump({"source": self._source_key(), "fps": self.fps, "frames": frames}, file)
+
+    def frames(self):
+        """Yields RGB frames of shape (height, width, 3). A frame is only valid until the next one is asked for."""
+        if self._cache_frames is not None:
+            yield from self._cache_frames
+            return
+        while True:
+            buffer = self._ring.acquire_read()
+            if buffer is None:
+                return
+            try:
+                yield buffer
+            finally:
+                self._ring.release_read()
+
+    def stop(self):
+        if self._ring is not None:
+            self._ring.stop()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+
+
+def play_static_video(video_path, screen, screen_width, screen_height, background_image, cache=True, overlay=None):
+    """
+    Plays a staticy MP4 video in the background until it ends or the screen is clicked.
+    Frames are decoded and scaled ahead on a separate thread, with cache on the decoded clip is kept
+    next to it in .cache/ and reused on later launches. overlay is called with the screen after each
+    frame is drawn, to show startup progress over the clip.
+
+    Returns "finished" when the clip ended, "skipped" when it was clicked away and "quit" when the
+    window was closed, the caller decides what closing means.
+    """
+    cache_dir = os.path.join(os.path.dirname(video_path), ".cache") if cache else None
+    decoder = ClipDecoder(video_path, (screen_width, screen_height), cache_dir=cache_dir).start()
+
+    clock = pygame.time.Clock()
+    try:
+        for frame in decoder.frames():
+            #The frame is already RGB at screen size, wrap it without copying
+            frame_surface = pygame.image.frombuffer(frame, (screen_width, screen_height), "RGB")
+            screen.blit(frame_surface, (0, 0))
+            screen.blit(background_image, (0, 0))
+            if overlay is not None:
+                overlay(screen)
+            pygame.display.update()
 
-        clock.tick(30)  #Limit frame rate to 30
+            #Allows quiting and skipping
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    return "quit"
+                if event.type in (pygame.MOUSEBUTTONDOWN, pygame.KEYDOWN):
+                    return "skipped"  #Skip the rest of the video
 
-    cap.release()
+            clock.tick(decoder.fps)  #Play at the clip's own frame rate
+        return "finished"
+    finally:
+        decoder.stop()
@@ -1,9 +1,13 @@
 import pygame
+import threading
 from collections import deque
+from itertools import islice
+from text_cache import fonts
+from asset_atlas import assets
 
 class ScrollableCommandList:
     
-    def __init__(self, commandList, screen, widthRatio=0.3, height=300, x=0, y=0):
+    def __init__(self, commandList, screen, widthRatio=0.3, height=300, x=0, y=0, tracer=None):
         """Class responsible for rendering the commands the drone still needs to execute.
         Utilized inside UserInterface.py
 
@@ -13,8 +17,11 @@ class ScrollableCommandList:
             widthRatio: Percentage of width list should take up on screen
             x: top left x coordinate of list
             y: top left y coordinate of list
+            tracer: Optional FlightTracer, every dequeued command is recorded on it
         """
         self.commandQueue = deque(commandList)  #Queue to hold commands
+        self.lock = threading.Lock()  #Commands are dequeued from the command executor's thread while the UI draws
+        self.tracer = tracer
         self.screen = screen  #Screen to draw on
         self.widthRatio = widthRatio  #Percentage of screen that block list takes up
         self.x = x  #Top left x position of list
@@ -26,77 +33,122 @@ class ScrollableCommandList:
         self.blockSpacing = 10
         self.scrollY = 0  #Var to keep track of scrolling
         self.maxScroll = max(0, len(commandList) * (self.blockSize + self.blockSpacing) - self.height)  #Ensures scrolling stops when last block in list is reached
-        self.font = pygame.font.Font(None, 30)
+        self.font = fonts.get(None, 30)
+        self.cacheHits = 0  #Number of draws served from the variant cache
+        self.cacheMisses = 0  #Number of variants that had to be loaded while drawing
+        self.variants = {}  #(command, isRed, slot) -> scaled, faded image (None if the icon is missing)
+        self.preload_variants(commandList)
+
+    def slot_count(self):
+        """Returns how many slots can be visible at once in the list."""
+        return (self.height + self.blockSize + self.blockSpacing - 1) // (self.blockSize + self.blockSpacing)
+
+    def slot_size(self, slot):
+        """Returns the icon size for a visible slot. Shrinks for each slot, smallest it can get is 50"""
+        return max(50, self.blockSize - (slot * 10))
+
+    def slot_opacity(self, slot):
+        """Returns the alpha value for a visible slot. Decreases for each slot, lowest it can get is 20"""
+        return max(20, 255 - (slot * 120))
+
+    def preload_variants(self, commands):
+        """Loads every icon once and builds each (command, red/normal, slot) variant so draw only has to blit."""
+        for command in set(commands):
+            for slot in range(self.slot_count()):
+                self.variants[(command, False, slot)] = self._make_variant(command, False, slot)
+            #Red icon is only ever shown in the first slot
+            self.variants[(command, True, 0)] = self._make_variant(command, True, 0)
+
+    def _load_icon(self, command, isRed, size):
+        image_path = f"icons/{command}_red.png" if isRed else f"icons/{command}.png"
+        try:
+            return assets.image(image_path, (size, size))  #Already scaled in the asset atlas
+        except pygame.error:
+            return None  #If image is missing, set to None
+
+    def _make_variant(self, command, isRed, slot):
+        icon = self._load_icon(command, isRed, self.slot_size(slot))
+        if icon is None:
+            return None
+        img = icon.copy()  #The atlas image is shared, fade a copy
+        #Apply opacity
+        img.fill((255, 255, 255, self.slot_opacity(slot)), special_flags=pygame.BLEND_RGBA_MULT)
+        return img
+
+    def get_variant(self, command, isRed, slot):
+        """Returns the cached image for a command in a slot, loading it if it was not preloaded."""
+        key = (command, isRed, slot)
+        if key in self.variants:
+            self.cacheHits += 1
+            return self.variants[key]
+        self.cacheMisses += 1
+        img = self._make_variant(command, isRed, slot)
+        self.variants[key] = img
+        return img
+
+    def cache_stats(self):
+        """Returns the variant cache counters so the hit rate can be checked."""
+        return {"hits": self.cacheHits, "misses": self.cacheMisses, "variants": len(self.variants)}
             
     def is_empty(self):
         """Returns True if the command queue is empty, otherwise False."""
-        return not self.commandQueue
+        with self.lock:
+            return not self.commandQueue
 
     def draw(self):
         """Renders the command list on the screen at (self.x, self.y) with fading opacity."""
-        #Recalculate maxScroll
-        self.maxScroll = max(0, len(self.commandQueue) * (self.blockSize + self.blockSpacing) - self.height)
-    
-        #Determine which commands to display based on scroll position
-        startIndex = self.scrollY // (self.blockSize + self.blockSpacing)
-        maxVisibleCommands = (self.height + self.blockSize + self.blockSpacing - 1) // (self.blockSize + self.blockSpacing)
-    
-        visibleCommands = list(self.commandQueue)[startIndex:startIndex + maxVisibleCommands]
+        with self.lock:
+            #Recalculate maxScroll
+            self.maxScroll = max(0, len(self.commandQueue) * (self.blockSize + self.blockSpacing) - self.height)
         
-        if self.commandQueue: #Get first command in queue
-            first_command = self.commandQueue[0] 
-        else: 
-            first_command = None
-
-
+            #Determine which commands to display based on scroll position
+            startIndex = self.scrollY // (self.blockSize + self.blockSpacing)
+            maxVisibleCommands = self.slot_count()
+        
+            #Copy the visible commands, the queue can change while they are drawn
+            visibleCommands = list(islice(self.commandQueue, startIndex, startIndex + maxVisibleCommands))
     
         for i, command in enumerate(visibleCommands):
             blockY = self.y + i * (self.blockSize + self.blockSpacing)
     
-            #Opacity Calculation for each block
-            opacity = max(20, 255 - (i * 120))  #Decrease alpha value for each command in list. Lowest it can get is 20
-            newBlocksize = max(50, self.blockSize - (i * 10))
-    
-            #Load red icon only for the first command in the entire queue
-            if command == first_command and startIndex + i == 0:
-                image_path = f"icons/{command}_red.png"
-            else:
-                image_path = f"icons/{command}.png"
-    
-            try:
-                img = pygame.image.load(image_path).convert_alpha()
-                img = pygame.transform.smoothscale(img, (newBlocksize, newBlocksize))
-            except pygame.error:
-                img = None  #If image is missing, set to None
+            #Red icon only for the first command in the entire queue
+            img = self.get_variant(command, startIndex + i == 0, i)
     
             if img:
-                #Apply opacity
-                img = img.copy()
-                img.fill((255, 255, 255, opacity), special_flags=pygame.BLEND_RGBA_MULT)
+                newBlocksize = img.get_width()
                 self.screen.blit(img, (self.x + (self.blockSize - newBlocksize) // 2, blockY)) #Needed to offset change in x when block size changes
 
 
-    def dequeue_command(self):
-        """Removes the first command from the queue when executed and resets scroll position to top of list. Returns the removed command."""
-        if self.commandQueue:
-            prev_command = self.commandQueue.popleft()  #Remove first command in queue
-            #Recalculate max scroll based on updated list
-            self.maxScroll = max(0, len(self.commandQueue) * (self.blockSize + self.blockSpacing) - self.height)
-            #Prevent scrollY from being greater than maxScroll
-            self.scrollY = 0
-            
-            return prev_command #Return next command or None
-        return None  #Return None if the queue is already empty
+    def dequeue_command(self, id=None):
+        """
+        Removes the first command from the queue when executed and resets scroll position to top of list. Returns the removed command.
+        id is the block's index in the program, recorded with the dequeue when tracing.
+        """
+        with self.lock:
+            if self.commandQueue:
+                prev_command = self.commandQueue.popleft()  #Remove first command in queue
+                #Recalculate max scroll based on updated list
+                self.maxScroll = max(0, len(self.commandQueue) * (self.blockSize + self.blockSpacing) - self.height)
+                #Prevent scrollY from being greater than maxScroll
+                self.scrollY = 0
+                remaining = len(self.commandQueue)
+            else:
+                return None  #Return None if the queue is already empty
+        if self.tracer is not None:
+            self.tracer.instant("dequeued", "command", id=id, command=prev_command, remaining=remaining)
+        return prev_command #Return next command or None
     
     def get_first_command(self):
-        return self.commandQueue[0] if self.commandQueue else None  #Return next command or None
+        with self.lock:
+            return self.commandQueue[0] if self.commandQueue else None  #Return next command or None
 
     def handle_scroll(self, direction):
         """Handles scrolling up and down within the command list. If you would like to scroll up, pass 'up' to method."""
-        if direction == "up":
-            self.scrollY = max(0, self.scrollY - (self.blockSize + self.blockSpacing))
-        elif direction == "down":
-            self.scrollY = min(self.maxScroll, self.scrollY + (self.blockSize + self.blockSpacing))
+        with self.lock:
+            if direction == "up":
+                self.scrollY = max(0, self.scrollY - (self.blockSize + self.blockSpacing))
+            elif direction == "down":
+                self.scrollY = min(self.maxScroll, self.scrollY + (self.blockSize + self.blockSpacing))
 
     def is_mouse_inside(self, mouseX, mouseY):
         """Checks if the mouse is within the command list box."""
@@ -104,10 +156,11 @@ class ScrollableCommandList:
 
     def get_current_command(self):
         """Returns the currently highlighted command based on scroll position."""
-        index = self.scrollY // (self.blockSize + self.blockSpacing)
-        if 0 <= index < len(self.commandQueue):
-            return list(self.commandQueue)[index]
-        return None
+        with self.lock:
+            index = self.scrollY // (self.blockSize + self.blockSpacing)
+            if 0 <= index < len(self.commandQueue):
+                return self.commandQueue[index]
+            return None
 
 #Testing for module. Press space to simulate removing a block from the commandList
 if __name__ == "__main__":
@@ -0,0 +1,239 @@
+import hashlib
+import io
+import json
+import mmap
+import os
+import threading
+
+import numpy as np
+import pygame
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+ATLAS_PATH = os.path.join(ROOT, "icons", "atlas.rgba")
+INDEX_PATH = os.path.join(ROOT, "icons", "atlas.json")
+ATLAS_WIDTH = 2048
+
+COMMANDS = ("rotate_left", "rotate_right", "fly_forward", "fly_backward", "fly_left", "fly_right",
+            "fly_up", "fly_down", "hover", "takeoff", "land")
+
+# Every image the program draws, at the size and with the scaling its user asks for: (path, size, smooth)
+MANIFEST = (
+    # Editor blocks, Interface.icons
+    [(f"icons/{command}_red.png", (120, 120), False) for command in COMMANDS]
+    # Command list, ScrollableCommandList: every slot size from blockSize down to 50, red only in the first slot
+    + [(f"icons/{command}.png", (size, size), True) for command in COMMANDS for size in range(130, 40, -10)]
+    + [(f"icons/{command}_red.png", (130, 130), True) for command in COMMANDS]
+    # Flight screen HUD and buttons
+    + [(f"icons/{name}.png", (140, 32), True) for name in ("BatteryBar", "TemperatureBar", "SpeedBar")]
+    + [(f"icons/{name}.png", (90, 90), True) for name in ("StartRecordingCommandBlock", "RecordingOnCommandBlock",
+                                                          "EStopCommandBlock", "ToggleCameraOnCommandBlock",
+                                                          "ToggleCameraOffCommandBlock")]
+    + [("icons/background.png", (1280, 700), False)]
+)
+
+
+def _resolve(path):
+    """Relative paths are inside the project, whatever directory the program was started from."""
+    return path if os.path.isabs(path) else os.path.join(ROOT, path)
+
+
+def _key(path, size, smooth):
+    """Name of an image in the atlas index, paths are relative to the project so callers can use either form."""
+    relative = os.path.relpath(_resolve(path), ROOT).replace(os.sep, "/")
+    size_text = "native" if size is None else f"{size[0]}x{size[1]}"
+    return f"{relative}|{size_text}|{'smooth' if smooth else 'fast'}"
+
+
+def _source_stamp(path):
+    """Size and content hash, a checkout that rewrites the file without changing it keeps the atlas valid."""
+    with open(_resolve(path), "rb") as file:
+        data = file.read()
+    return [len(data), hashlib.sha1(data).hexdigest()]
+
+
+def _scaled(path, size, smooth):
+    image = pygame.image.load(_resolve(path))
+    if smooth:
+        image = image.convert_alpha()  # the smoothscaling users convert first, this keeps their exact pixels
+    if size is not None and image.get_size() != tuple(size):
+        image = pygame.transform.smoothscale(image, size) if smooth else pygame.transform.scale(image, size)
+    return image
+
+
+def build_atlas(manifest=MANIFEST, atlas_path=ATLAS_PATH, index_path=INDEX_PATH, width=ATLAS_WIDTH):
+    """
+    Build step: scales every image in the manifest once and packs them into one raw RGBA file with a JSON
+    index of sub-rectangles. Rows are packed tallest first. Needs a display mode. Returns the index.
+    """
+    images = [(_key(path, size, smooth), path, _scaled(path, size, smooth)) for path, size, smooth in manifest]
+    images.sort(key=lambda item: -item[2].get_height())
+
+    rects = {}
+    x = y = row_height = 0
+    for key, path, image in images:
+        w, h = image.get_size()
+        if x + w > width:
+            x, y, row_height = 0, y + row_height, 0
+        rects[key] = [x, y, w, h]
+        x += w
+        row_height = max(row_height, h)
+    height = y + row_height
+
+    # Copy the pixels exactly, blitting onto a transparent surface would blend semi transparent edges with black
+    pixels = np.zeros((height, width, 4), dtype=np.uint8)
+    for key, path, image in images:
+        rx, ry, w, h = rects[key]
+        pixels[ry:ry + h, rx:rx + w] = np.frombuffer(pygame.image.tobytes(image, "RGBA"), dtype=np.uint8).reshape(h, w, 4)
+
+    pixels.tofile(atlas_path)
+    index = {
+        "size": [width, height],
+        "rects": rects,
+        "sources": {path: _source_stamp(path) for path, _, _ in manifest},
+    }
+    with open(index_path, "w") as file:
+        json.dump(index, file, indent=1)
+    return index
+
+
+class AssetStore:
+
+    def __init__(self, atlas_path=ATLAS_PATH, index_path=INDEX_PATH, manifest=MANIFEST):
+        """
+        Hands out every icon and HUD image from one atlas. The bundle is read once, converted to the
+        display format once and each image is a subsurface of it, so all modules blit the same converted
+        pixels. Images that are not in the atlas, or every image when the bundle is missing or older than
+        its sources, are loaded from their files once and kept. A missing or out of date bundle is rebuilt
+        from the manifest the first time an image is asked for with a display mode set, once per store.
+
+        read() only does the disk work and can run on a worker thread, image() converts and must be
+        called from the thread that draws. The returned surfaces are shared, copy one before drawing on it.
+
+        Attributes:
+            atlas_hits (int): Images served from the atlas.
+            file_loads (int): Images that had to be loaded from their own file.
+        """
+        self.atlas_path = atlas_path
+        self.index_path = index_path
+        self.manifest = manifest
+        self.atlas = None
+        self.rects = {}
+        self.atlas_hits = 0
+        self.file_loads = 0
+        self._read = False
+        self._outdated = False
+        self._build_tried = False
+        self._pixels = None
+        self._size = None
+        self._files = {}
+        self._images = {}
+        self._lock = threading.Lock()
+
+    def _read_bundle(self):
+        self._read = True
+        self._outdated = True  # until the bundle is read, every image comes from its own file
+        try:
+            with open(self.index_path) as file:
+                index = json.load(file)
+            for path, stamp in index["sources"].items():
+                if _source_stamp(path) != stamp:
+                    return
+            width, height = index["size"]
+            pixels = np.memmap(self.atlas_path, dtype=np.uint8, mode="r")
+            if pixels.size != width * height * 4:
+                return  # cut short
+        except (OSError, ValueError, KeyError):
+            return  # no bundle
+        # The map reads lazily, touching a byte per page does the disk reads here instead of in convert_alpha
+        pixels[::mmap.PAGESIZE].max()
+        self._outdated = False
+        self._pixels = pixels
+        self._size = (width, height)
+        self.rects = index["rects"]
+
+    def _build_bundle(self):
+        """Rebuilds a missing or out of date bundle from the manifest and reads it. Needs a display mode."""
+        self._build_tried = True
+        print("Asset atlas is missing or out of date, rebuilding it")
+        try:
+            build_atlas(self.manifest, self.atlas_path, self.index_path)
+        except (OSError, pygame.error) as e:
+            print(f"Could not build the asset atlas, images are loaded from their files: {e}")
+            return
+        self._files.clear()  # read() kept these for a bundle that was missing, the new one has them
+        self._read_bundle()
+
+    def _convert_bundle(self):
+        atlas = pygame.image.frombuffer(self._pixels, self._size, "RGBA")
+        # convert_alpha needs a display mode, without one the atlas stays in its file format
+        self.atlas = atlas.convert_alpha() if pygame.display.get_surface() is not None else atlas.copy()
+        self._pixels = None  # closes the map, the atlas surface has its own copy
+
+    def read(self, paths=()):
+        """
+        Reads the atlas, and the files of those paths that are not in it, into memory. Only touches the
+        disk, so it can run on a worker thread while the main thread draws; image() then only converts.
+        """
+        with self._lock:
+            if not self._read:
+                self._read_bundle()
+            keys = set(self.rects)
+        for path in paths:
+            resolved = _resolve(path)
+            prefix = _key(path, None, True).split("|")[0] + "|"
+            if resolved in self._files or any(key.startswith(prefix) for key in keys):
+                continue
+            try:
+                with open(resolved, "rb") as file:
+                    self._files[resolved] = file.read()
+            except OSError:
+                pass  # image() raises like pygame.image.load when it is asked for it
+
+    def image(self, path, size=None, smooth=True):
+        """
+        Returns the image at path scaled to size, with smoothscale when smooth is set. Raises FileNotFoundError
+        like pygame.image.load when the file does not exist. Converts to the display format, call it from
+        the thread that draws.
+        """
+        key = _key(path, size, smooth)
+        image = self._images.get(key)
+        if image is not None:
+            return image
+        with self._lock:
+            if not self._read:
+                self._read_bundle()
+            if self._outdated and not self._build_tried and pygame.display.get_surface() is not None:
+                self._build_bundle()
+        if self.atlas is None and self._pixels is not None:
+            self._convert_bundle()
+
+        if key in self.rects:
+            image = self.atlas.subsurface(pygame.Rect(self.rects[key]))
+            self.atlas_hits += 1
+        else:
+            resolved = _resolve(path)
+            data = self._files.pop(resolved, None)
+            image = pygame.image.load(io.BytesIO(data), resolved) if data is not None else pygame.image.load(resolved)
+            if pygame.display.get_surface() is not None:
+                image = image.convert_alpha()
+            if size is not None and image.get_size() != tuple(size):
+                image = pygame.transform.smoothscale(image, size) if smooth else pygame.transform.scale(image, size)
+            self.file_loads += 1
+        self._images[key] = image
+        return image
+
+    def stats(self):
+        return {"atlas": self.atlas is not None, "atlas_hits": self.atlas_hits, "file_loads": self.file_loads}
+
+
+# Shared by the editor, the flight screen, the command list and the buttons
+assets = AssetStore()
+
+
+if __name__ == "__main__":
+    # A hidden display is enough for convert_alpha
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.display.set_mode((1, 1))
+    index = build_atlas()
+    width, height = index["size"]
+    print(f"Packed {len(index['rects'])} images into a {width}x{height} atlas ({width * height * 4 / 1e6:.1f} MB) at {ATLAS_PATH}")
@@ -0,0 +1,206 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class CommandExecutor:
+
+    def __init__(self, drone, default_timeout=30.0, tracer=None, telemetry=None):
+        """
+        Owns the drone link for a flight. It runs an asyncio loop on its own thread and every command is a
+        task with a timeout that can be cancelled. djitellopy's calls block, so commands run one at a time
+        on a link thread. djitellopy matches a reply to whichever call pops the shared reply list first, so
+        the link thread is the only one that ever waits for replies. The emergency stop sends the SDK
+        "stop" from its own thread without waiting for a reply, which halts a move that is still in the
+        air, and then lands on the link thread once that move returned. The UI only submits programs and
+        stop requests.
+
+        Parameters:
+            drone: The Tello (or a stand-in) the emergency stop talks to.
+            default_timeout (float): Seconds a command may take when the plan gives no timeout.
+            tracer (FlightTracer): Optional, emergency stops are recorded on it.
+            telemetry (TelemetryPoller): Optional, used to see when the drone stopped moving.
+
+        Attributes:
+            stops (list): One dict per emergency stop with the reason, stop_sent_seconds (stop requested
+                until "stop" was sent), preempt_seconds (stop requested until telemetry showed zero velocity,
+                or until the drone landed when it never did or there is no telemetry) and land_seconds
+                (stop requested until the land command returned).
+        """
+        self.drone = drone
+        self.default_timeout = default_timeout
+        self.tracer = tracer
+        self.telemetry = telemetry
+        self.stops = []
+        self.loop = None
+        self._thread = None
+        self._link = ThreadPoolExecutor(max_workers=1, thread_name_prefix="drone-link")
+        self._priority = ThreadPoolExecutor(max_workers=1, thread_name_prefix="drone-estop")
+        self._plan = None
+        self._stopping = None
+        self._ready = threading.Event()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run_loop, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def _run_loop(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self._ready.set()
+        self.loop.run_forever()
+        self.loop.close()
+
+    def shutdown(self, timeout=2, stop_timeout=10, land=True):
+        """
+        Cancels whatever is still running and stops the loop. When land is set and the drone is still
+        flying, it is stopped and landed like on an emergency stop. Returns only once the command in the
+        air finished and its late replies were dropped, so the next flight on the same link does not read
+        them as its own. A landing gets up to stop_timeout seconds.
+        """
+        if self.loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._cancel_running(), self.loop).result(timeout)
+        try:
+            asyncio.run_coroutine_threadsafe(self._finish_stop(), self.loop).result(stop_timeout)
+            if land and getattr(self.drone, "is_flying", False):
+                self.emergency_stop("flight screen closed").result(stop_timeout)
+            self._link.submit(self._drop_replies).result(stop_timeout)  #Queued behind the command in the air
+            if land and getattr(self.drone, "is_flying", False):  #That command was a takeoff
+                self.emergency_stop("flight screen closed").result(stop_timeout)
+        except Exception as e:
+            print(f"Emergency stop did not finish: {e}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=timeout)
+        self._link.shutdown(wait=False, cancel_futures=True)
+        self._priority.shutdown(wait=False)
+
+    @property
+    def busy(self):
+        return self._plan is not None and not self._plan.done()
+
+    def run_plan(self, plan, fly, on_done=None, timeout_for=None):
+        """
+        Flies the plan's segments one after another and returns a concurrent.futures.Future for the whole plan.
+
+        Parameters:
+            plan (list): Segments from trajectory_compiler.
+            fly: Called with a segment on the link thread to fly it.
+            on_done: Called with (segment, seconds) after each segment, on the loop thread.
+            timeout_for: Called with a segment, returns its timeout in seconds.
+                A segment that runs out of time cancels the plan and triggers the emergency stop.
+        """
+        if self.busy:
+            raise RuntimeError("A program is already running")
+        return asyncio.run_coroutine_threadsafe(self._fly_plan(plan, fly, on_done, timeout_for), self.loop)
+
+    async def _fly_plan(self, plan, fly, on_done, timeout_for):
+        loop = asyncio.get_running_loop()
+        self._plan = asyncio.current_task()  # what the emergency stop cancels
+        for segment in plan:
+            timeout = timeout_for(segment) if timeout_for is not None else self.default_timeout
+            start = time.monotonic()
+            command = loop.run_in_executor(self._link, fly, segment)
+            try:
+                # shield: on a timeout the blocking call is left to finish on the link thread, it can not be interrupted
+                await asyncio.wait_for(asyncio.shield(command), timeout)
+            except asyncio.TimeoutError:
+                print(f"Command timed out after {timeout:.1f}s: {segment}")
+                loop.create_task(self._emergency_stop("timeout"))
+                return False
+            except Exception as e:
+                print(f"Error executing command: {e}")
+                loop.create_task(self._emergency_stop("error"))
+                return False
+            if on_done is not None:
+                on_done(segment, time.monotonic() - start)
+        return True
+
+    async def _cancel_running(self):
+        if self._plan is not None and not self._plan.done():
+            self._plan.cancel()  # the command in the air finishes on the link thread, nothing after it is sent
+
+    async def _finish_stop(self):
+        if self._stopping is not None and not self._stopping.done():
+            await asyncio.wait([self._stopping])
+
+    def emergency_stop(self, reason="stop button"):
+        """
+        Cancels the running program and lands on the priority path. Safe to call from any thread,
+        returns a concurrent.futures.Future that is done once the land command returned.
+        """
+        requested = time.monotonic()
+        return asyncio.run_coroutine_threadsafe(self._emergency_stop(reason, requested), self.loop)
+
+    async def _emergency_stop(self, reason, requested=None):
+        requested = requested or time.monotonic()
+        self._stopping = asyncio.current_task()
+        loop = asyncio.get_running_loop()
+        await self._cancel_running()
+        record = {"reason": reason}
+        still = None
+        try:
+            #Hover now, no reply is waited for so the move still waiting on the link thread keeps its own
+            await loop.run_in_executor(self._priority, self.drone.send_command_without_return, "stop")
+            record["stop_sent_seconds"] = time.monotonic() - requested
+            if self.telemetry is not None:
+                still = loop.create_task(self._wait_until_still(requested))
+            #Queued behind the move in the air, the only caller waiting for replies is the link thread
+            await loop.run_in_executor(self._link, self._land)
+            record["land_seconds"] = time.monotonic() - requested
+            record["preempt_seconds"] = still.result() if still is not None and still.done() else record["land_seconds"]
+        except Exception as e:
+            print(f"Error during landing: {e}")
+            record["error"] = str(e)
+        finally:
+            if still is not None:
+                still.cancel()
+        self.stops.append(record)
+        if self.tracer is not None:
+            self.tracer.complete("emergency stop", "command", requested, **record)
+        print(f"Emergency stop ({reason}): {record}")
+        return record
+
+    async def _wait_until_still(self, requested, poll=0.02):
+        """Returns the seconds from the stop request until a state packet showed zero velocity."""
+        while True:
+            speed = self.telemetry.snapshot.speed
+            if speed.updated is not None and speed.updated >= requested and speed.value == 0:
+                return speed.updated - requested
+            await asyncio.sleep(poll)
+
+    def _drop_replies(self, quiet=0.3, limit=1.0):
+        """
+        Runs on the link thread. Throws away replies nobody waited for, like the one to "stop", so the
+        next command does not take them for its own. Waits until the link was quiet for quiet seconds.
+        """
+        get_udp = getattr(self.drone, "get_own_udp_object", None)
+        if get_udp is None:
+            return
+        replies = get_udp()["responses"]
+        deadline = time.monotonic() + limit
+        while True:
+            replies.clear()
+            time.sleep(quiet)
+            if not replies or time.monotonic() > deadline:
+                replies.clear()
+                return
+
+    def _land(self):
+        self._drop_replies()
+        self.drone.land()
+
+    def stop_stats(self):
+        """Returns how quickly emergency stops took effect, in seconds."""
+        preempt = [stop["preempt_seconds"] for stop in self.stops if "preempt_seconds" in stop]
+        land = [stop["land_seconds"] for stop in self.stops if "land_seconds" in stop]
+        return {
+            "stops": len(self.stops),
+            "preempt_max": max(preempt, default=0.0),
+            "preempt_mean": sum(preempt) / len(preempt) if preempt else 0.0,
+            "land_max": max(land, default=0.0),
+            "land_mean": sum(land) / len(land) if land else 0.0,
+        }
@@ -0,0 +1,107 @@
+import pygame
+
+
+class StackLayout:
+
+    def __init__(self, x, block_size, spacing=10):
+        """
+        Fixed pitch vertical stack of blocks growing upward from its bottom block.
+        Maps program indexes to screen rectangles and screen positions back to indexes
+        with arithmetic only, so lookups cost the same for any program length.
+
+        Parameters:
+            x (int): Left edge of every block in the stack.
+            block_size (tuple): The (width, height) of a block.
+            spacing (int): Vertical gap between two blocks.
+        """
+        self.x = x
+        self.width, self.height = block_size
+        self.spacing = spacing
+        self.pitch = self.height + spacing
+
+    def y_for(self, index, origin_y):
+        """Returns the top of the block at index when the bottom block's top is at origin_y."""
+        return origin_y - index * self.pitch
+
+    def rect_for(self, index, origin_y):
+        return pygame.Rect(self.x, self.y_for(index, origin_y), self.width, self.height)
+
+    def index_at(self, pos, origin_y, count):
+        """
+        Returns the index of the block under pos, or None when pos is beside the stack or in a gap.
+        """
+        x, y = pos
+        if not self.x <= x < self.x + self.width:
+            return None
+        index = -((y - origin_y) // self.pitch)  # ceil((origin_y - y) / pitch)
+        if not 0 <= index < count:
+            return None
+        if y >= self.y_for(index, origin_y) + self.height:
+            return None
+        return index
+
+    def visible_range(self, origin_y, top, bottom, count):
+        """Returns the range of indexes whose blocks intersect the rows from top to bottom."""
+        first = max(0, (origin_y - bottom) // self.pitch + 1)
+        stop = min(count, -((top - origin_y - self.height) // self.pitch))  # ceil((origin_y + height - top) / pitch)
+        return range(first, max(first, stop))
+
+    def nearest_slot(self, y, origin_y, count):
+        """Returns the index of the slot whose block center is closest to y, clamped to the program."""
+        if count == 0:
+            return 0
+        index = round((origin_y + self.height / 2 - y) / self.pitch)
+        return max(0, min(index, count - 1))
+
+
+class SpatialGrid:
+
+    def __init__(self, cell_size=160):
+        """
+        Uniform grid for hit testing freely placed rectangles.
+        Each item is stored in every cell its rectangle overlaps, so a point lookup only
+        checks the few items in one cell.
+
+        Parameters:
+            cell_size (int): Width and height of a grid cell in pixels.
+        """
+        self.cell_size = cell_size
+        self.cells = {}  # (column, row) -> list of items
+        self.rects = {}  # item -> pygame.Rect
+
+    def _cells_for(self, rect):
+        size = self.cell_size
+        for column in range(rect.left // size, (rect.right - 1) // size + 1):
+            for row in range(rect.top // size, (rect.bottom - 1) // size + 1):
+                yield column, row
+
+    def insert(self, item, rect):
+        rect = pygame.Rect(rect)
+        self.rects[item] = rect
+        for cell in self._cells_for(rect):
+            self.cells.setdefault(cell, []).append(item)
+
+    def remove(self, item):
+        rect = self.rects.pop(item, None)
+        if rect is None:
+            return
+        for cell in self._cells_for(rect):
+            items = self.cells[cell]
+            items.remove(item)
+            if not items:
+                del self.cells[cell]
+
+    def update(self, item, rect):
+        self.remove(item)
+        self.insert(item, rect)
+
+    def __contains__(self, item):
+        return item in self.rects
+
+    def item_at(self, pos):
+        """Returns the most recently inserted item whose rectangle contains pos, or None."""
+        cell = (pos[0] // self.cell_size, pos[1] // self.cell_size)
+        for item in reversed(self.cells.get(cell, ())):
+            if self.rects[item].collidepoint(pos):
+                return item
+        return None
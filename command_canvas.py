@@ -0,0 +1,95 @@
+import numpy as np
+import pygame
+
+
+class CommandCanvas:
+
+    def __init__(self, width, view_height, tile_height=None, gradient_span=3700):
+        """
+        Scrollable background of the program side of the editor.
+        The canvas is anchored at the bottom and grows upward with the program. It is split
+        into horizontal tiles that are only created when they scroll into view, and tiles that
+        leave the view are dropped again, so memory follows the visible window rather than
+        the program length.
+
+        Parameters:
+            width (int): Width of the canvas in pixels.
+            view_height (int): Height of the visible window in pixels.
+            tile_height (int): Height of one tile, defaults to the view height.
+            gradient_span (int): Height over which the red to blue gradient runs, rows above it stay red.
+
+        Attributes:
+            height (int): Current scrollable height of the canvas, never less than the view.
+            tiles (dict): Resident tiles keyed by tile index, 0 being the bottom tile.
+        """
+        self.width = width
+        self.view_height = view_height
+        self.tile_height = tile_height or view_height
+        self.gradient_span = gradient_span
+        self.height = view_height
+        self.tiles = {}
+        self.tiles_built = 0
+
+    def ensure_height(self, content_height):
+        """Grows or shrinks the scrollable height to fit the content, it never gets shorter than the view."""
+        self.height = max(self.view_height, content_height)
+
+    def max_offset(self):
+        """Returns how far the canvas can be scrolled up from the bottom."""
+        return self.height - self.view_height
+
+    def gradient_column(self, tile_index):
+        """
+        Returns the colors of one tile as a (tile_height, 3) array, top row first.
+        Rows are measured from the bottom of the canvas so tiles never depend on the canvas height.
+        """
+        top = (tile_index + 1) * self.tile_height - 1
+        from_bottom = np.arange(top, top - self.tile_height, -1)
+        # Same gradient as the original full size surface, row 0 being the top of gradient_span
+        row = np.clip(self.gradient_span - 1 - from_bottom, 0, None)
+        column = np.zeros((self.tile_height, 3), dtype=np.uint8)
+        column[:, 0] = 255 * (self.gradient_span - row) // self.gradient_span  # Red component
+        column[:, 2] = 255 * row // self.gradient_span  # Blue component
+        return column
+
+    def build_tile(self, tile_index):
+        """Creates one tile surface in a single vectorized pass."""
+        column = self.gradient_column(tile_index)
+        # surfarray arrays are indexed (x, y), every x gets the same column
+        pixels = np.broadcast_to(column, (self.width, self.tile_height, 3))
+        tile = pygame.surfarray.make_surface(np.ascontiguousarray(pixels))
+        if pygame.display.get_surface() is not None:
+            tile = tile.convert()
+        self.tiles_built += 1
+        return tile
+
+    def visible_tiles(self, offset):
+        """Returns the range of tile indexes inside the view when scrolled up by offset pixels."""
+        first = offset // self.tile_height
+        last = (offset + self.view_height - 1) // self.tile_height
+        return range(first, last + 1)
+
+    def draw(self, screen, position, offset):
+        """
+        Blits the visible part of the canvas with its bottom edge at the bottom of the view.
+
+        Parameters:
+            screen (pygame.Surface): Surface to draw on.
+            position (tuple): Top left corner of the view on the screen.
+            offset (int): How many pixels the view is scrolled up from the bottom of the canvas.
+        """
+        offset = max(0, min(offset, self.max_offset()))
+        visible = self.visible_tiles(offset)
+
+        # Drop tiles that scrolled away, keeping one either side for smooth scrolling
+        for tile_index in list(self.tiles):
+            if tile_index < visible.start - 1 or tile_index > visible.stop:
+                del self.tiles[tile_index]
+
+        x, y = position
+        for tile_index in visible:
+            tile = self.tiles.get(tile_index)
+            if tile is None:
+                tile = self.tiles[tile_index] = self.build_tile(tile_index)
+            tile_top = (tile_index + 1) * self.tile_height - 1
+            screen.blit(tile, (x, y + self.view_height - 1 - tile_top + offset))
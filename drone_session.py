@@ -0,0 +1,157 @@
+import pygame
+
+from asset_atlas import assets
+from startup_orchestrator import StartupOrchestrator
+from telemetry import TelemetryPoller
+from tello_simulator import create_tello
+
+SOUNDS = {
+    "startup": "sounds/startup.mp3",
+    "click": "sounds/button_press.wav",
+    "alert": "sounds/alert.mp3",
+    "command_executed": "sounds/command_executed.mp3",
+}
+IMAGES = {
+    "background": "icons/background.png",
+    "battery": "icons/BatteryBar.png",
+    "temperature": "icons/TemperatureBar.png",
+    "speed": "icons/SpeedBar.png",
+}
+BUTTON_IMAGES = ("icons/StartRecordingCommandBlock.png", "icons/RecordingOnCommandBlock.png", "icons/EStopCommandBlock.png",
+                 "icons/ToggleCameraOnCommandBlock.png", "icons/ToggleCameraOffCommandBlock.png")
+
+
+class DroneSession:
+
+    def __init__(self, screen_size=(1280, 700), icon_size=(140, 32), button_size=(90, 90)):
+        """
+        Owns everything the flight screen needs that outlives one flight: the drone link, its video
+        stream and telemetry, the decoded sounds and the flight screen images. The first run connects
+        and loads them, later runs get them back straight away, so going from the editor to a flight and
+        back costs no reconnect. The link is only made again when the drone stopped sending its state.
+        close() ends it when the program exits.
+
+        Attributes:
+            tello: The connected drone, or the simulator when DRONEBLOCKS_SIMULATOR is set.
+            frame_read: djitellopy's background video reader, it keeps decoding between flights.
+            telemetry (TelemetryPoller): Reads drone stats for the HUD for the life of the session.
+            sounds (dict): Decoded sounds by name, see SOUNDS.
+            images (dict): The background and HUD bars, scaled to the screen, see prepare_images.
+            startup (StartupOrchestrator): The startup work of the latest flight, empty when everything was ready.
+            connects (int): Times the link was made.
+            flights (int): Flight screens run on this session.
+        """
+        self.screen_size = screen_size
+        self.icon_size = icon_size
+        self.button_size = button_size
+        self.tello = None
+        self.frame_read = None
+        self.telemetry = None
+        self.sounds = {}
+        self.images = {}
+        self.startup = None
+        self.connects = 0
+        self.flights = 0
+
+    @property
+    def link_lost(self):
+        """True when there is no link yet, or the drone's state packets stopped arriving."""
+        if self.tello is None or self.telemetry is None:
+            return True
+        return "battery" in self.telemetry.snapshot.stale
+
+    def _connect(self):
+        tello = self.tello or create_tello()  #The real drone, or the simulator when DRONEBLOCKS_SIMULATOR is set
+        tello.connect()
+        self.tello = tello
+        self.connects += 1
+        return tello
+
+    def _start_telemetry(self, tello):
+        if self.telemetry is None:
+            self.telemetry = TelemetryPoller(tello, rate_hz=5).start()
+        return self.telemetry
+
+    def _start_stream(self, tello):
+        tello.streamon()
+        self.frame_read = tello.get_frame_read()  #Waits for the first frame, the reader is kept for later flights
+        return self.frame_read
+
+    def _load_sounds(self, *names):
+        def load():
+            for name in names:
+                self.sounds[name] = pygame.mixer.Sound(SOUNDS[name])
+        return load
+
+    def _read_images(self):
+        assets.read([*IMAGES.values(), *BUTTON_IMAGES])  #Disk reads only, converting is left to the main thread
+
+    def prepare_images(self):
+        """
+        Converts the flight screen images to the display format once per session and returns them.
+        Call it from the thread that draws, after the "images" task.
+        """
+        if not self.images:
+            self.images = {
+                "background": assets.image(IMAGES["background"], self.screen_size, smooth=False),  #Scaled to fit screen
+                "battery": assets.image(IMAGES["battery"], self.icon_size),
+                "temperature": assets.image(IMAGES["temperature"], self.icon_size),
+                "speed": assets.image(IMAGES["speed"], self.icon_size),
+            }
+            for path in BUTTON_IMAGES:
+                assets.image(path, self.button_size)  #Buttons are made per flight, their images are ready in the asset store
+        return self.images
+
+    def start(self, tracer=None):
+        """
+        Starts whatever the next flight still needs on a StartupOrchestrator and returns it. Connecting,
+        starting the stream, decoding sounds and loading images wait on the network or the disk, so they
+        run side by side. Nothing is started when the session is ready, the orchestrator is then empty.
+        """
+        if not pygame.get_init():
+            pygame.init()
+        if not pygame.mixer.get_init():
+            pygame.mixer.init()
+
+        startup = StartupOrchestrator(tracer=tracer)
+        if self.link_lost:
+            startup.add("connect", self._connect, label="Connecting to drone")
+            startup.add("telemetry", self._start_telemetry, requires=("connect",), label="Reading drone stats")
+            startup.add("stream", self._start_stream, requires=("connect",), label="Starting camera")
+        if "startup" not in self.sounds:
+            startup.add("startup sound", self._load_sounds("startup"), label="Loading sounds")
+        if len(self.sounds) < len(SOUNDS):
+            startup.add("sounds", self._load_sounds("click", "alert", "command_executed"), label="Loading sounds")
+        if not self.images:
+            startup.add("images", self._read_images, label="Loading images")
+        self.startup = startup.start()
+        return startup
+
+    def wait(self, *names):
+        """
+        Waits for the named tasks of the latest start and raises if one failed. Names that were not
+        started this time were ready already.
+        """
+        for name in names:
+            if self.startup is not None and name in self.startup.tasks:
+                self.startup.result(name)
+
+    def close(self):
+        """Ends the link, call once when the program exits."""
+        if self.startup is not None:
+            self.startup.wait(timeout=10)
+            self.startup.shutdown()
+        if self.telemetry is not None:
+            self.telemetry.stop()
+            self.telemetry = None
+        if self.tello is not None:
+            try:
+                self.tello.end()  #Turns the stream off and stops the video reader
+            except Exception as e:
+                print(f"Error closing Tello connection: {e}")
+            self.tello = None
+            self.frame_read = None
+
+
+# Shared by every flight screen run in this process
+session = DroneSession()
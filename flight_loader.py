@@ -0,0 +1,118 @@
+import importlib
+import os
+import subprocess
+import sys
+import threading
+import time
+
+# Everything the flight screen needs that the editor does not, heaviest first
+FLIGHT_MODULES = ("cv2", "av", "djitellopy", "Custom_Video_Player", "user_interface")
+
+
+class StartupTimer:
+
+    def __init__(self):
+        """
+        Times the editor's cold start: named marks since the timer was created (create it before the
+        heavy imports) and how long each lazily loaded module took to import.
+        """
+        self.started = time.perf_counter()
+        self.marks = {}
+        self.imports = {}
+
+    def mark(self, name):
+        """Records the first time name is reached, later calls keep the first time."""
+        self.marks.setdefault(name, time.perf_counter() - self.started)
+
+    def report(self):
+        """Returns the marks and import times in milliseconds."""
+        return {
+            "marks_ms": {name: round(seconds * 1000, 1) for name, seconds in self.marks.items()},
+            "imports_ms": {name: round(seconds * 1000, 1) for name, seconds in self.imports.items()},
+        }
+
+
+class FlightLoader:
+
+    def __init__(self, timer=None):
+        """
+        Imports the flight screen only when it is needed, so the editor window does not wait for
+        djitellopy, OpenCV and PyAV. warm() loads it on a background thread while the program is built,
+        load() returns run_user_interface and waits for a warm up that is still running.
+
+        Parameters:
+            timer (StartupTimer): Optional, the import time of every flight module is recorded on it.
+        """
+        self.timer = timer
+        self._lock = threading.Lock()
+        self._thread = None
+        self._run_user_interface = None
+
+    @property
+    def loaded(self):
+        return self._run_user_interface is not None
+
+    def warm(self):
+        """Starts importing the flight modules on a daemon thread, does nothing if already loaded or warming."""
+        if self.loaded or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._warm, name="flight-warmup", daemon=True)
+        self._thread.start()
+
+    def _warm(self):
+        try:
+            self.load()
+        except Exception as e:
+            # Pressing run will try again and show the error then
+            print(f"Warming up the flight screen failed: {e}")
+
+    def load(self):
+        """Imports the flight modules if needed and returns run_user_interface."""
+        with self._lock:
+            if self._run_user_interface is None:
+                for name in FLIGHT_MODULES:
+                    if name in sys.modules:
+                        continue
+                    start = time.perf_counter()
+                    try:
+                        importlib.import_module(name)
+                    except ImportError:
+                        if name == "user_interface":
+                            raise
+                        continue  # optional on this machine, user_interface decides if it is really needed
+                    if self.timer is not None:
+                        self.timer.imports[name] = time.perf_counter() - start
+                self._run_user_interface = sys.modules["user_interface"].run_user_interface
+            return self._run_user_interface
+
+    def close(self):
+        """Ends the drone session the flight screen kept open, nothing to do if it was never loaded."""
+        if self.loaded:
+            sys.modules["drone_session"].session.close()
+
+
+def connection_errors():
+    """
+    Returns the errors of a flight that could not reach the drone: socket errors, timeouts and djitellopy's
+    TelloException. djitellopy is only imported with the flight screen, before that it is left out.
+    """
+    djitellopy = sys.modules.get("djitellopy")
+    return (OSError, TimeoutError) + ((djitellopy.TelloException,) if djitellopy is not None else ())
+
+
+def import_profile(module, limit=15):
+    """
+    Imports module in a fresh interpreter with -X importtime and returns the slowest imports as
+    (cumulative ms, self ms, name), to compare cold starts between changes.
+    """
+    environment = dict(os.environ, SDL_VIDEODRIVER="dummy", PYGAME_HIDE_SUPPORT_PROMPT="1")
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True, env=environment, cwd=os.path.dirname(os.path.abspath(__file__)))
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us) / 1000, int(self_us) / 1000, name.strip()))
+    rows.sort(reverse=True)
+    return rows[:limit]
@@ -0,0 +1,124 @@
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class FlightTracer:
+
+    def __init__(self, enabled=True, max_events=500000, clock=time.monotonic):
+        """
+        Records what happens during a flight on one monotonic clock: each command's way from the queue
+        to the drone and back, camera frames, telemetry samples and UI frames. Export with
+        write_chrome_trace (open in chrome://tracing or ui.perfetto.dev) or write_jsonl.
+
+        Parameters:
+            enabled (bool): A disabled tracer records nothing, so call sites never need to check.
+            max_events (int): Oldest events are dropped past this, keeps long flights bounded.
+            clock: Time source in seconds, time.monotonic by default.
+        """
+        self.enabled = enabled
+        self.clock = clock
+        self.start = clock()
+        self.events = deque(maxlen=max_events)
+        self._threads = {}
+        self._lock = threading.Lock()
+
+    def _thread(self):
+        thread = threading.current_thread()
+        with self._lock:
+            if thread.ident not in self._threads:
+                self._threads[thread.ident] = (len(self._threads) + 1, thread.name)
+            return self._threads[thread.ident][0]
+
+    def _add(self, phase, name, category, timestamp, duration=None, args=None):
+        event = {"ph": phase, "name": name, "cat": category, "t": timestamp - self.start, "tid": self._thread()}
+        if duration is not None:
+            event["dur"] = duration
+        if args:
+            event["args"] = args
+        self.events.append(event)  # deque appends are thread safe
+
+    def instant(self, name, category, **args):
+        """Records a point in time, such as a command being queued or a camera frame arriving."""
+        if self.enabled:
+            self._add("i", name, category, self.clock(), args=args)
+
+    def complete(self, name, category, start, end=None, **args):
+        """Records something that ran from start until end (or now), both on the tracer's clock."""
+        if self.enabled:
+            end = self.clock() if end is None else end
+            self._add("X", name, category, start, end - start, args)
+
+    @contextmanager
+    def span(self, name, category, **args):
+        """Records the time spent inside the with block."""
+        if not self.enabled:
+            yield
+            return
+        start = self.clock()
+        try:
+            yield
+        finally:
+            self._add("X", name, category, start, self.clock() - start, args)
+
+    def counter(self, name, category, **values):
+        """Records values that change over time, like battery or speed, shown as a graph in the trace viewer."""
+        if self.enabled:
+            self._add("C", name, category, self.clock(), args=values)
+
+    def write_chrome_trace(self, path):
+        """Writes the trace in Chrome's trace event format."""
+        events = []
+        for ident, (tid, thread_name) in list(self._threads.items()):
+            events.append({"ph": "M", "name": "thread_name", "pid": 1, "tid": tid, "args": {"name": thread_name}})
+        for event in list(self.events):
+            chrome = {"ph": event["ph"], "name": event["name"], "cat": event["cat"], "pid": 1, "tid": event["tid"],
+                      "ts": round(event["t"] * 1e6, 1)}
+            if "dur" in event:
+                chrome["dur"] = round(event["dur"] * 1e6, 1)
+            if event["ph"] == "i":
+                chrome["s"] = "t"
+            if "args" in event:
+                chrome["args"] = event["args"]
+            events.append(chrome)
+        with open(path, "w") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file, default=str)
+
+    def write_jsonl(self, path):
+        """Writes one JSON object per event, times in seconds since the tracer started."""
+        names = {tid: thread_name for tid, thread_name in self._threads.values()}
+        with open(path, "w") as file:
+            for event in list(self.events):
+                file.write(json.dumps(dict(event, thread=names.get(event["tid"])), default=str) + "\n")
+
+    def summary(self):
+        """Returns total seconds per category and name of the recorded spans, longest first."""
+        totals = {}
+        for event in list(self.events):
+            if event["ph"] == "X":
+                key = f"{event['cat']}/{event['name']}"
+                totals[key] = totals.get(key, 0.0) + event["dur"]
+        return dict(sorted(totals.items(), key=lambda item: -item[1]))
+
+
+class TracedDrone:
+
+    def __init__(self, drone, tracer):
+        """
+        Wraps a Tello so every call DroneFlight makes is recorded as a span from the moment the command
+        is sent until the drone acknowledged it. Everything else is passed straight through.
+        """
+        self._drone = drone
+        self._tracer = tracer
+
+    def __getattr__(self, name):
+        attribute = getattr(self._drone, name)
+        if not callable(attribute) or name.startswith("get_"):
+            return attribute  # state reads come from the state packets, they are not commands
+
+        def traced(*args, **kwargs):
+            with self._tracer.span(name, "drone", args=list(args)):
+                return attribute(*args, **kwargs)
+        return traced
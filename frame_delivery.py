@@ -0,0 +1,141 @@
+import threading
+import time
+
+
+class FrameSlot:
+
+    def __init__(self):
+        """
+        Holds only the latest frame together with a sequence number that goes up by one per frame.
+        Consumers wait on a condition variable until a frame newer than the one they last saw arrives,
+        so they wake once per new frame instead of polling on a timer.
+        """
+        self._condition = threading.Condition()
+        self._frame = None
+        self._sequence = 0
+        self._closed = False
+
+    def publish(self, frame):
+        """Replaces the frame in the slot, wakes every waiting consumer and returns the new sequence number."""
+        with self._condition:
+            self._sequence += 1
+            self._frame = frame
+            self._condition.notify_all()
+            return self._sequence
+
+    def latest(self):
+        """Returns (sequence, frame) without waiting, sequence is 0 before the first frame."""
+        with self._condition:
+            return self._sequence, self._frame
+
+    def wait_newer(self, sequence, timeout=None):
+        """
+        Waits until the slot holds a frame newer than sequence and returns (sequence, frame).
+        Returns the unchanged sequence and None on timeout or once the slot is closed.
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._sequence > sequence or self._closed, timeout)
+            if self._sequence > sequence:
+                return self._sequence, self._frame
+            return sequence, None
+
+    def close(self):
+        """Wakes every waiting consumer for good, used when shutting down."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+
+class FrameSubscriber:
+
+    def __init__(self, slot):
+        """
+        One consumer's view of a FrameSlot, it only hands out frames this consumer has not seen yet.
+
+        Attributes:
+            delivered (int): Frames handed to this consumer.
+            dropped (int): Frames that were replaced in the slot before this consumer got to them.
+        """
+        self.slot = slot
+        self.sequence = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    def _accept(self, sequence, frame):
+        if frame is None or sequence == self.sequence:
+            return None
+        self.dropped += sequence - self.sequence - 1
+        self.sequence = sequence
+        self.delivered += 1
+        return frame
+
+    def wait(self, timeout=None):
+        """Blocks until there is an unseen frame and returns it, or None on timeout."""
+        return self._accept(*self.slot.wait_newer(self.sequence, timeout))
+
+    def poll(self):
+        """Returns an unseen frame if there is one, otherwise None. Never blocks."""
+        return self._accept(*self.slot.latest())
+
+    def stats(self):
+        return {"delivered": self.delivered, "dropped": self.dropped}
+
+
+class FramePump:
+
+    def __init__(self, get_frame, slot, poll_interval=0.005):
+        """
+        Moves frames from a source that can only be read, such as djitellopy's BackgroundFrameRead.frame,
+        into a FrameSlot. The source has no way to announce a new frame, so the pump checks it every
+        poll_interval and only publishes when the frame object changed. Downstream threads wait on
+        the slot and never see the same frame twice.
+
+        Parameters:
+            get_frame: Callable returning the source's current frame or None.
+            slot (FrameSlot): Where new frames are published.
+            poll_interval (float): Seconds between source checks, bounds the added latency.
+
+        Attributes:
+            published (int): Frames published to the slot.
+            duplicates (int): Source checks that returned the frame that was already published.
+        """
+        self.get_frame = get_frame
+        self.slot = slot
+        self.poll_interval = poll_interval
+        self.published = 0
+        self.duplicates = 0
+        self._running = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._running.set()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=2):
+        self._running.clear()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout=timeout)
+        self.slot.close()
+
+    def _run(self):
+        last_frame = None
+        while self._running.is_set():
+            try:
+                frame = self.get_frame()
+            except Exception as e:
+                print(f"Error reading frame: {e}")
+                frame = None
+
+            if frame is not None and frame is last_frame:
+                self.duplicates += 1
+            elif frame is not None:
+                last_frame = frame
+                self.slot.publish(frame)
+                self.published += 1
+
+            time.sleep(self.poll_interval)
+
+    def stats(self):
+        return {"published": self.published, "duplicates_skipped": self.duplicates}
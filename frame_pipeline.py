@@ -0,0 +1,107 @@
+import time
+import threading
+
+import cv2
+import numpy as np
+import pygame
+
+
+class StageTimer:
+
+    def __init__(self):
+        """
+        Thread safe per-stage counters for the camera pipeline.
+        Each stage records how many times it ran, how long it took and how many full frame copies it made.
+        """
+        self._lock = threading.Lock()
+        self._stages = {}  # name -> [calls, seconds, copies]
+
+    def record(self, stage, seconds, copies=0):
+        with self._lock:
+            counters = self._stages.setdefault(stage, [0, 0.0, 0])
+            counters[0] += 1
+            counters[1] += seconds
+            counters[2] += copies
+
+    def report(self):
+        """Returns {stage: {"calls", "total_ms", "avg_ms", "copies"}} for every stage seen so far."""
+        with self._lock:
+            return {
+                stage: {
+                    "calls": calls,
+                    "total_ms": 1000 * seconds,
+                    "avg_ms": 1000 * seconds / calls if calls else 0.0,
+                    "copies": copies,
+                }
+                for stage, (calls, seconds, copies) in self._stages.items()
+            }
+
+
+class FrameTransformer:
+    # Full frame copies the old rotate -> resize -> flip -> make_surface chain made for every frame
+    LEGACY_COPIES_PER_FRAME = 4
+
+    def __init__(self, display_size=(1040, 585), buffers=3):
+        """
+        Fused camera frame stage: one resize straight into a preallocated buffer that the UI wraps without copying.
+
+        The old chain rotated the Tello frame 90 degrees counter clockwise, flipped it vertically
+        and handed it to pygame.surfarray, which reads arrays as (x, y). Rotating and flipping is a
+        transpose and surfarray transposes again, so the picture on screen is just the camera frame
+        scaled to the display size. Resizing the untouched frame into a row major buffer and wrapping
+        it with pygame.image.frombuffer shows the same picture with a single pass over the pixels.
+
+        Parameters:
+            display_size (tuple): The (width, height) of the video on screen.
+            buffers (int): Number of output buffers used in rotation, the UI shows one while the next is written.
+
+        Attributes:
+            timer (StageTimer): Per-stage time and copy counters.
+        """
+        self.display_size = display_size
+        width, height = display_size
+        self.buffers = [np.empty((height, width, 3), dtype=np.uint8) for _ in range(buffers)]
+        self.next_buffer = 0
+        self.timer = StageTimer()
+
+    def transform(self, frame):
+        """Resizes a camera frame into the next output buffer and returns that buffer."""
+        start = time.perf_counter()
+        buffer = self.buffers[self.next_buffer]
+        self.next_buffer = (self.next_buffer + 1) % len(self.buffers)
+        cv2.resize(frame, self.display_size, dst=buffer)
+        self.timer.record("resize", time.perf_counter() - start, copies=1)
+        return buffer
+
+    def to_surface(self, buffer):
+        """Wraps an output buffer as a pygame surface without copying its pixels."""
+        start = time.perf_counter()
+        surface = pygame.image.frombuffer(buffer, self.display_size, "RGB")
+        self.timer.record("wrap", time.perf_counter() - start)
+        return surface
+
+    def recording_frame(self, buffer):
+        """
+        Returns the frame in the portrait (585 x 1040) layout the video writer has always received.
+        This is the only copy left in the pipeline and it is only made while recording.
+        """
+        start = time.perf_counter()
+        frame = np.ascontiguousarray(buffer.transpose(1, 0, 2))
+        self.timer.record("record_copy", time.perf_counter() - start, copies=1)
+        return frame
+
+    def recording_size(self):
+        """Returns the (width, height) of the frames from recording_frame."""
+        return self.display_size[1], self.display_size[0]
+
+    def report(self):
+        """Returns the stage counters plus the average copies per frame against the old chain."""
+        stages = self.timer.report()
+        frames = stages.get("resize", {}).get("calls", 0)
+        copies = sum(stage["copies"] for stage in stages.values())
+        return {
+            "frames": frames,
+            "stages": stages,
+            "copies_per_frame": copies / frames if frames else 0.0,
+            "legacy_copies_per_frame": self.LEGACY_COPIES_PER_FRAME,
+        }
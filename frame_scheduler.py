@@ -0,0 +1,102 @@
+import threading
+import time
+from collections import deque
+
+import pygame
+
+from text_cache import render_text
+
+
+class FrameScheduler:
+
+    def __init__(self, target_fps=60, idle_fps=5, idle_after=2.0, overlay=False):
+        """
+        Paces a pygame main loop so it does not spin a whole core.
+        The loop runs at target_fps while there is activity and drops to idle_fps once nothing
+        has happened for idle_after seconds. An idle wait ends as soon as a pygame event arrives
+        or another thread calls wake, so input never waits for the slow rate.
+
+        Parameters:
+            target_fps (float): Frame rate while active.
+            idle_fps (float): Frame rate while idle.
+            idle_after (float): Seconds without activity before going idle.
+            overlay (bool): Start with the fps overlay shown, F3 toggles it.
+        """
+        self.target_fps = target_fps
+        self.idle_fps = idle_fps
+        self.idle_after = idle_after
+        self.overlay = overlay
+        self.frame_times = deque(maxlen=60)  # seconds between ticks
+        self.work_times = deque(maxlen=60)  # seconds spent between the end of one wait and the next tick
+        self._last_activity = time.perf_counter()
+        self._frame_start = time.perf_counter()
+        self._wake = threading.Event()
+
+    @property
+    def idle(self):
+        return time.perf_counter() - self._last_activity > self.idle_after
+
+    def notify_activity(self):
+        """Marks the current frame as active, call it for input, new frames or changed telemetry."""
+        self._last_activity = time.perf_counter()
+
+    def wake(self):
+        """Ends an idle wait early. Safe to call from any thread."""
+        self.notify_activity()
+        self._wake.set()
+
+    def handle_event(self, event):
+        """Toggles the overlay with F3, every event counts as activity."""
+        self.notify_activity()
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+            self.overlay = not self.overlay
+
+    def budget(self):
+        """Returns the time one frame may take at the current rate."""
+        return 1 / (self.idle_fps if self.idle else self.target_fps)
+
+    def tick(self):
+        """
+        Waits out the rest of the frame budget. Call once per loop iteration after drawing.
+        Returns the seconds spent waiting.
+        """
+        now = time.perf_counter()
+        self.work_times.append(now - self._frame_start)
+        deadline = self._frame_start + self.budget()
+
+        if self.idle:
+            # Short slices so a new event or a wake from another thread is picked up at once
+            while now < deadline and not self._wake.is_set() and not pygame.event.peek():
+                time.sleep(min(0.01, deadline - now))
+                now = time.perf_counter()
+        elif now < deadline:
+            time.sleep(deadline - now)
+        self._wake.clear()
+
+        end = time.perf_counter()
+        self.frame_times.append(end - self._frame_start)
+        waited = end - now
+        self._frame_start = end
+        return waited
+
+    def fps(self):
+        """Returns the measured frame rate over the last frames."""
+        if not self.frame_times:
+            return 0.0
+        return len(self.frame_times) / sum(self.frame_times)
+
+    def draw_overlay(self, screen, position=(10, 10)):
+        """
+        Draws the measured fps and frame work time against the budget if the overlay is on.
+        Returns the rectangle that was drawn, or None, so dirty rectangle loops can push it.
+        """
+        if not self.overlay:
+            return None
+        work_ms = 1000 * sum(self.work_times) / len(self.work_times) if self.work_times else 0.0
+        mode = "idle" if self.idle else "active"
+        text = f"{self.fps():5.1f} fps  {work_ms:5.1f} / {1000 * self.budget():.1f} ms  {mode}"
+        label = render_text(text, 20, (255, 255, 0))
+        rect = label.get_rect(topleft=position).inflate(8, 6)
+        screen.fill((0, 0, 0), rect)
+        screen.blit(label, label.get_rect(center=rect.center))
+        return rect
@@ -0,0 +1,240 @@
+import math
+import threading
+import time
+
+from program_optimizer import optimize, Step
+from take_commands import DroneFlight
+from trajectory_compiler import DurationModel, compile_program, primitive_segments
+
+
+class VirtualClock:
+
+    def __init__(self, speed=None):
+        """
+        Time source for simulated flights.
+
+        Parameters:
+            speed (float): How many times faster than real time the clock runs. 1 is real time,
+                None fast-forwards, every sleep returns at once and only moves the clock.
+        """
+        self.speed = speed
+        self._now = 0.0
+        self._lock = threading.Lock()
+
+    def now(self):
+        return self._now
+
+    def sleep(self, seconds):
+        if seconds <= 0:
+            return
+        if self.speed:
+            time.sleep(seconds / self.speed)
+        with self._lock:
+            self._now += seconds
+
+
+class SimulatedDrone:
+
+    def __init__(self, clock=None, model=None, drain_per_second=0.13, drain_per_cm=0.002, battery=100.0):
+        """
+        Kinematic stand-in for djitellopy's Tello with the calls DroneFlight and the flight screen use.
+        It keeps a pose and velocity, takes the time the DurationModel predicts for each command on a
+        VirtualClock and drains the battery while airborne. Problems a real flight would run into are
+        collected in warnings instead of raised, so a whole program can be checked in one go.
+
+        Parameters:
+            clock (VirtualClock): Clock the flight runs on, fast-forward if not given.
+            model (DurationModel): Gives the duration of every command.
+            drain_per_second (float): Battery percent used per second in the air.
+            drain_per_cm (float): Extra battery percent used per centimetre flown.
+            battery (float): Battery percent at the start.
+
+        Attributes:
+            position (list): x, y, z in cm from the start, x is the starting heading, y left, z up.
+            yaw (float): Heading in degrees, counter clockwise positive.
+            log (list): (clock time, command, position, yaw) after every command.
+            warnings (list): Problems found during the flight.
+        """
+        self.clock = clock or VirtualClock()
+        self.model = model or DurationModel()
+        self.drain_per_second = drain_per_second
+        self.drain_per_cm = drain_per_cm
+        self.battery = battery
+        self.position = [0.0, 0.0, 0.0]
+        self.yaw = 0.0
+        self.velocity = (0.0, 0.0, 0.0)
+        self.flying = False
+        self.distance_flown = 0.0
+        self.log = []
+        self.warnings = []
+
+    def _record(self, command):
+        self.log.append((round(self.clock.now(), 3), command, tuple(round(p, 1) for p in self.position), round(self.yaw, 1)))
+
+    def _spend(self, seconds, offset=(0.0, 0.0, 0.0), command=""):
+        distance = math.dist((0, 0, 0), offset)
+        if seconds > 0:
+            self.velocity = tuple(o / seconds for o in offset)
+        self.clock.sleep(seconds)
+        self.velocity = (0.0, 0.0, 0.0)
+        self.position = [p + o for p, o in zip(self.position, offset)]
+        self.distance_flown += distance
+        if self.flying:
+            self.battery -= seconds * self.drain_per_second + distance * self.drain_per_cm
+        if self.battery <= 0:
+            self.battery = 0.0
+            self.warnings.append(f"{command}: battery empty at {self.clock.now():.1f}s")
+        if self.position[2] < 0:
+            self.warnings.append(f"{command}: would fly {-self.position[2]:.0f} cm into the ground")
+            self.position[2] = 0.0
+        self._record(command)
+
+    def _to_world(self, vector):
+        heading = math.radians(self.yaw)
+        x, y, z = vector
+        return (x * math.cos(heading) - y * math.sin(heading), x * math.sin(heading) + y * math.cos(heading), z)
+
+    def _move(self, command, vector, seconds):
+        if not self.flying:
+            self.warnings.append(f"{command}: the drone has not taken off")
+            self._record(command)
+            return
+        self._spend(seconds, self._to_world(vector), command)
+
+    def _primitive_move(self, command, unit, distance):
+        self._move(f"{command} {distance}", tuple(distance * u for u in unit), self.model.primitive("fly_forward", distance))
+
+    # Movement, named like djitellopy's Tello
+    def takeoff(self):
+        if self.flying:
+            self.warnings.append("takeoff: already flying")
+        self.flying = True
+        self._spend(self.model.takeoff, (0.0, 0.0, 80.0), "takeoff")
+
+    def land(self):
+        if not self.flying:
+            self.warnings.append("land: the drone has not taken off")
+        self._spend(self.model.land, (0.0, 0.0, -self.position[2]), "land")
+        self.flying = False
+
+    def move_forward(self, x):
+        self._primitive_move("forward", (1, 0, 0), x)
+
+    def move_back(self, x):
+        self._primitive_move("back", (-1, 0, 0), x)
+
+    def move_left(self, x):
+        self._primitive_move("left", (0, 1, 0), x)
+
+    def move_right(self, x):
+        self._primitive_move("right", (0, -1, 0), x)
+
+    def move_up(self, x):
+        self._primitive_move("up", (0, 0, 1), x)
+
+    def move_down(self, x):
+        self._primitive_move("down", (0, 0, -1), x)
+
+    def rotate_clockwise(self, x):
+        self._turn(f"cw {x}", -x)
+
+    def rotate_counter_clockwise(self, x):
+        self._turn(f"ccw {x}", x)
+
+    def _turn(self, command, degrees):
+        if not self.flying:
+            self.warnings.append(f"{command}: the drone has not taken off")
+        seconds = self.model.primitive("rotate_left", abs(degrees))
+        self.yaw = (self.yaw + degrees + 180) % 360 - 180
+        self._spend(seconds, command=command)
+
+    def go_xyz_speed(self, x, y, z, speed):
+        seconds = self.model.stop_overhead + math.dist((0, 0, 0), (x, y, z)) / speed
+        self._move(f"go {x} {y} {z} {speed}", (x, y, z), seconds)
+
+    def curve_xyz_speed(self, x1, y1, z1, x2, y2, z2, speed):
+        length = math.dist((0, 0, 0), (x1, y1, z1)) + math.dist((x1, y1, z1), (x2, y2, z2))
+        self._move(f"curve {x1} {y1} {z1} {x2} {y2} {z2} {speed}", (x2, y2, z2), self.model.stop_overhead + length / speed)
+
+    def hover(self, seconds):
+        """Waits in place, DroneFlight uses this as its sleep so hover blocks drain the battery too."""
+        self._spend(seconds, command=f"hover {seconds}")
+
+    def send_rc_control(self, left_right, forward_back, up_down, yaw):
+        pass
+
+    # State, in the units djitellopy returns
+    def get_battery(self):
+        return int(self.battery)
+
+    def get_temperature(self):
+        return 61.0
+
+    def get_height(self):
+        return int(self.position[2])
+
+    def get_speed_x(self):
+        return round(self.velocity[0] / 10)
+
+    def get_speed_y(self):
+        return round(self.velocity[1] / 10)
+
+    def get_speed_z(self):
+        return round(self.velocity[2] / 10)
+
+
+def dry_run(commands, execution_mode="primitive", optimize_program=True, speed=None):
+    """
+    Flies a block program on a SimulatedDrone through DroneFlight, the way run_user_interface would.
+
+    Parameters:
+        commands (list): Command names as exported by ProgramModel.
+        execution_mode (str): "primitive" or "compiled", see run_user_interface.
+        optimize_program (bool): Merge neighbouring blocks first.
+        speed (float): Clock speed, None fast-forwards.
+
+    Returns:
+        dict: Flight time, battery used, distance, final pose, warnings and the command log.
+    """
+    drone = SimulatedDrone(VirtualClock(speed))
+    flight = DroneFlight(drone, sleep=drone.hover)
+    if optimize_program or execution_mode == "compiled":
+        steps = optimize(commands, flight.distance, flight.rotate, flight.hover)
+    else:
+        steps = [Step(command, None, (index,)) for index, command in enumerate(commands)]
+    plan = compile_program(steps) if execution_mode == "compiled" else primitive_segments(steps)
+    for segment in plan:
+        if segment.kind != "skip":
+            flight.compiled_command(segment)
+
+    if drone.flying:
+        drone.warnings.append("program ends with the drone still in the air")
+    return {
+        "seconds": round(drone.clock.now(), 2),
+        "battery_used": round(100.0 - drone.battery, 2),
+        "distance_cm": round(drone.distance_flown),
+        "final_position": [round(p) for p in drone.position],
+        "final_yaw": round(drone.yaw),
+        "warnings": drone.warnings,
+        "log": drone.log,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Dry run block programs on a simulated drone")
+    parser.add_argument("programs", help="JSON file with a list of programs, each a list of command names")
+    parser.add_argument("--mode", choices=("primitive", "compiled"), default="primitive")
+    parser.add_argument("--no-optimize", action="store_true")
+    args = parser.parse_args()
+
+    with open(args.programs) as file:
+        programs = json.load(file)
+    start = time.perf_counter()
+    for index, program in enumerate(programs):
+        result = dry_run(program, args.mode, not args.no_optimize)
+        status = "; ".join(result["warnings"]) or "ok"
+        print(f"{index}: {result['seconds']:.1f}s, battery -{result['battery_used']:.1f}%, ends at {result['final_position']} - {status}")
+    print(f"Checked {len(programs)} programs in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,130 @@
+from collections import Counter
+from itertools import count
+
+
+class ProgramModel:
+
+    def __init__(self, commands=()):
+        """
+        Ordered command sequence behind the block editor, kept separate from the pygame sprites.
+        Every entry gets a stable id when it is inserted. Counters for each action and an
+        id -> index table are updated on every insert, delete and move, so the validation
+        checks and lookups never have to scan the program.
+
+        Parameters:
+            commands: Optional actions to start the program with.
+
+        Attributes:
+            counts (Counter): Number of entries for each action.
+        """
+        self._ids = []  # entry ids in program order
+        self._actions = {}  # entry id -> action
+        self._index = {}  # entry id -> position in the program
+        self._next_id = count()
+        self._exported = None  # cached export, cleared on every change
+        self.counts = Counter()
+
+        for action in commands:
+            self.insert(action)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __iter__(self):
+        return (self._actions[entry_id] for entry_id in self._ids)
+
+    @property
+    def has_takeoff(self):
+        return self.counts["takeoff"] > 0
+
+    @property
+    def has_land(self):
+        return self.counts["land"] > 0
+
+    def first(self):
+        """Returns the first action of the program, or None if it is empty."""
+        return self._actions[self._ids[0]] if self._ids else None
+
+    def last(self):
+        """Returns the last action of the program, or None if it is empty."""
+        return self._actions[self._ids[-1]] if self._ids else None
+
+    def action_of(self, entry_id):
+        return self._actions[entry_id]
+
+    def index_of(self, entry_id):
+        return self._index[entry_id]
+
+    def id_at(self, index):
+        return self._ids[index]
+
+    def _reindex(self, start, stop=None):
+        # Only the entries between the changed positions move
+        stop = len(self._ids) if stop is None else stop
+        for index in range(start, stop):
+            self._index[self._ids[index]] = index
+        self._exported = None
+
+    def insert(self, action, index=None):
+        """
+        Inserts an action at index (appends by default) and returns the id of the new entry.
+        """
+        index = len(self._ids) if index is None else max(0, min(index, len(self._ids)))
+        entry_id = next(self._next_id)
+        self._ids.insert(index, entry_id)
+        self._actions[entry_id] = action
+        self.counts[action] += 1
+        self._reindex(index)
+        return entry_id
+
+    def delete(self, entry_id):
+        """Removes an entry from the program and returns its action."""
+        index = self._index.pop(entry_id)
+        del self._ids[index]
+        action = self._actions.pop(entry_id)
+        self.counts[action] -= 1
+        self._reindex(index)
+        return action
+
+    def move(self, entry_id, index):
+        """Moves an entry to a new position in the program."""
+        old_index = self._index[entry_id]
+        index = max(0, min(index, len(self._ids) - 1))
+        if index == old_index:
+            return
+        del self._ids[old_index]
+        self._ids.insert(index, entry_id)
+        self._reindex(min(old_index, index), max(old_index, index) + 1)
+
+    def check_add(self, action):
+        """
+        Returns why an action can not be added to the program, or None if it can.
+        """
+        if action == "takeoff" and self.has_takeoff:
+            return "Already have takeoff"
+        if action == "land" and self.has_land:
+            return "Already have land"
+        if action != "takeoff" and not self.has_takeoff:
+            return "Need to takeoff first"
+        return None
+
+    def validate(self):
+        """
+        Returns why the program can not be executed, or None if it is ready to fly.
+        Only looks at the counters and the two ends of the program.
+        """
+        if not self._ids:
+            return "Program is empty"
+        if self.first() != "takeoff":
+            return "Needs to start with a takeoff block!"
+        if self.last() != "land":
+            return "Still needs a land block!"
+        if self.counts["takeoff"] > 1 or self.counts["land"] > 1:
+            return "Only one takeoff and one land block allowed!"
+        return None
+
+    def export(self):
+        """Returns the program as a list of actions in execution order."""
+        if self._exported is None:
+            self._exported = tuple(self)
+        return list(self._exported)
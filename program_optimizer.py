@@ -0,0 +1,98 @@
+from collections import namedtuple
+
+# One drone call. amount is centimetres for moves, degrees for rotations and seconds for hover,
+# None for takeoff and land. command is None when the blocks cancel out and nothing has to be flown.
+# sources are the indices of the blocks in the original program this step stands for, in order.
+Step = namedtuple("Step", "command amount sources")
+
+# SDK limits for a single call
+MOVE_LIMIT = 500  # cm
+ROTATE_LIMIT = 360  # degrees
+
+# Blocks on the same axis can be merged, opposite directions cancel each other
+AXES = {
+    "fly_forward": ("forward", 1),
+    "fly_backward": ("forward", -1),
+    "fly_left": ("left", 1),
+    "fly_right": ("left", -1),
+    "fly_up": ("up", 1),
+    "fly_down": ("up", -1),
+    "rotate_left": ("rotate", 1),
+    "rotate_right": ("rotate", -1),
+}
+
+# The command used for the merged result of an axis depending on which way it points
+AXIS_COMMANDS = {
+    "forward": ("fly_forward", "fly_backward"),
+    "left": ("fly_left", "fly_right"),
+    "up": ("fly_up", "fly_down"),
+    "rotate": ("rotate_left", "rotate_right"),
+}
+
+
+def _axis_step(axis, net, sources):
+    if net == 0:
+        return Step(None, 0, tuple(sources))
+    positive, negative = AXIS_COMMANDS[axis]
+    return Step(positive if net > 0 else negative, abs(net), tuple(sources))
+
+
+def optimize(commands, distance=95, rotate=45, hover=3):
+    """
+    Peephole pass over an exported program that merges neighbouring blocks into fewer drone calls.
+    Runs of moves on the same axis become one move of the summed distance, rotations are summed,
+    opposite blocks cancel out and back to back hovers become one longer hover. A merged move never
+    goes past the SDK's MOVE_LIMIT or ROTATE_LIMIT, longer runs are split into several steps.
+
+    Parameters:
+        commands (list): Command names in program order, as exported by ProgramModel.
+        distance (int): Centimetres a single move block flies.
+        rotate (int): Degrees a single rotate block turns.
+        hover (float): Seconds a single hover block waits.
+
+    Returns:
+        list: Steps that together cover every block exactly once and in order.
+    """
+    steps = []
+    axis = None
+    net = 0
+    sources = []
+
+    def flush():
+        nonlocal axis, net, sources
+        if sources:
+            if axis == "hover":
+                steps.append(Step("hover", net, tuple(sources)))
+            else:
+                steps.append(_axis_step(axis, net, sources))
+        axis, net, sources = None, 0, []
+
+    for index, command in enumerate(commands):
+        name = command.lower()
+        if name in AXES:
+            block_axis, sign = AXES[name]
+            delta = sign * (rotate if block_axis == "rotate" else distance)
+            limit = ROTATE_LIMIT if block_axis == "rotate" else MOVE_LIMIT
+            if block_axis != axis or abs(net + delta) > limit:
+                flush()
+            axis = block_axis
+            net += delta
+            sources.append(index)
+        elif name == "hover":
+            if axis != "hover":
+                flush()
+            axis = "hover"
+            net += hover
+            sources.append(index)
+        else:
+            # Takeoff and land are never merged
+            flush()
+            steps.append(Step(name, None, (index,)))
+    flush()
+    return steps
+
+
+def describe(commands, steps):
+    """Returns a one line summary of how much a plan saved, used in the console output."""
+    calls = sum(1 for step in steps if step.command is not None)
+    return f"Optimized program: {len(commands)} blocks -> {calls} drone calls"
@@ -1,7 +1,17 @@
 # Importing the library
+from flight_loader import FlightLoader, StartupTimer, connection_errors, import_profile
+startup = StartupTimer()  # Cold start timing begins here, before the heavy imports
 import pygame
 import os
-from user_interface import run_user_interface
+from collections import OrderedDict
+from command_canvas import CommandCanvas
+from program_model import ProgramModel
+from block_layout import StackLayout, SpatialGrid
+from text_cache import render_text
+from asset_atlas import assets
+from frame_scheduler import FrameScheduler
+# The flight screen (djitellopy, OpenCV, PyAV) is only imported through FlightLoader when it is needed
+startup.mark("imports")
  
 class Button:
     def __init__(self, x, y, width, height, text, color, hover_color):
@@ -12,14 +22,14 @@ class Button:
 
     def blit(self, screen):
         pygame.draw.rect(screen, self.color, self.rect, border_radius=10)
-        font = pygame.font.SysFont('Arial', 20).render(self.text, True, (0, 0, 0))
-        screen.blit(font, font.get_rect(center=self.rect.center))
+        label = render_text(self.text, 20, (0, 0, 0), face='Arial')
+        screen.blit(label, label.get_rect(center=self.rect.center))
 
     def check_click(self, event):
         return event.type == pygame.MOUSEBUTTONDOWN and self.rect.collidepoint(event.pos)
 
 class Interface:
-    def __init__(self):
+    def __init__(self, dirty_rects=True, show_fps=False, warm_flight=True, execution_mode="primitive", trace_path=None):
         """
         Initializes the programming interface for the drone blocks application.
         This method sets up the Pygame environment, initializes the display window,
@@ -30,46 +40,46 @@ class Interface:
           screen (pygame.Surface): The display surface for the application.
           background_color (tuple): The RGB color value for the background.
           blocks (list): A list of Block objects representing drone commands.
+          dirty_rects (bool): Only repaint and push the parts of the screen that changed between frames.
+          scheduler (FrameScheduler): Paces the main loop, show_fps starts it with the fps overlay on (F3 toggles it).
+          flight_loader (FlightLoader): Imports the flight screen, warm_flight starts that in the background after the first frame.
+          execution_mode (str): How Execute flies the program, "primitive" (one drone call per step) or "compiled" (go/curve segments).
+          trace_path (str): Records every flight, the nth Execute run writes <trace_path>.<n>.trace.json and .jsonl. None turns tracing off.
         """
         pygame.init()
         self.running = True
 
         self.SIZE = (1280, 700)
         self.screen = pygame.display.set_mode(self.SIZE)
+        startup.mark("window")
         self.background_color = (0, 0, 50)
 
         # relative path to icon folder
         self.icons_path = os.path.join(os.path.dirname(__file__), 'icons') 
 
-        # dictionary of icons for each block paired with their action name and relative path to icon folder
+        self.std_block_size = (120, 120)
+
+        # dictionary of icons for each block, scaled to the block size, from the shared asset atlas
         self.icons = {
-            "rotate_left": pygame.image.load(os.path.join(self.icons_path, "rotate_left_red.png")),
-            "rotate_right": pygame.image.load(os.path.join(self.icons_path, "rotate_right_red.png")),
-            "fly_forward": pygame.image.load(os.path.join(self.icons_path, "fly_forward_red.png")),
-            "fly_backward": pygame.image.load(os.path.join(self.icons_path, "fly_backward_red.png")),
-            "fly_left": pygame.image.load(os.path.join(self.icons_path, "fly_left_red.png")),
-            "fly_right": pygame.image.load(os.path.join(self.icons_path, "fly_right_red.png")),
-            "fly_up": pygame.image.load(os.path.join(self.icons_path, "fly_up_red.png")),
-            "fly_down": pygame.image.load(os.path.join(self.icons_path, "fly_down_red.png")),
-            "hover": pygame.image.load(os.path.join(self.icons_path, "hover_red.png")),
-            "takeoff": pygame.image.load(os.path.join(self.icons_path, "takeoff_red.png")),
-            "land": pygame.image.load(os.path.join(self.icons_path, "land_red.png")),
+            "rotate_left": assets.image(os.path.join(self.icons_path, "rotate_left_red.png"), self.std_block_size, smooth=False),
+            "rotate_right": assets.image(os.path.join(self.icons_path, "rotate_right_red.png"), self.std_block_size, smooth=False),
+            "fly_forward": assets.image(os.path.join(self.icons_path, "fly_forward_red.png"), self.std_block_size, smooth=False),
+            "fly_backward": assets.image(os.path.join(self.icons_path, "fly_backward_red.png"), self.std_block_size, smooth=False),
+            "fly_left": assets.image(os.path.join(self.icons_path, "fly_left_red.png"), self.std_block_size, smooth=False),
+            "fly_right": assets.image(os.path.join(self.icons_path, "fly_right_red.png"), self.std_block_size, smooth=False),
+            "fly_up": assets.image(os.path.join(self.icons_path, "fly_up_red.png"), self.std_block_size, smooth=False),
+            "fly_down": assets.image(os.path.join(self.icons_path, "fly_down_red.png"), self.std_block_size, smooth=False),
+            "hover": assets.image(os.path.join(self.icons_path, "hover_red.png"), self.std_block_size, smooth=False),
+            "takeoff": assets.image(os.path.join(self.icons_path, "takeoff_red.png"), self.std_block_size, smooth=False),
+            "land": assets.image(os.path.join(self.icons_path, "land_red.png"), self.std_block_size, smooth=False),
         }
 
 
-        # scrollable command surface to place blocks
-        self.COMMAND_SIZE = (self.SIZE[0] // 2, self.SIZE[1] + 3000) # creating a big scrollable surface
-        self.command_scroll_y = self.SIZE[1]
-        self.command_surface = pygame.Surface((self.COMMAND_SIZE[0], self.COMMAND_SIZE[1]))
-
-        # TEMPORARY GRADIENT - FOR DEMONSTRATION
-        for y in range(self.COMMAND_SIZE[1]):
-            color = (
-          255 * (self.COMMAND_SIZE[1] - y) // self.COMMAND_SIZE[1],  # Red component
-          0,  # Green component
-          255 * y // self.COMMAND_SIZE[1]  # Blue component
-            )
-            pygame.draw.line(self.command_surface, color, (0, y), (self.COMMAND_SIZE[0], y))
+        # scrollable command surface to place blocks, built in tiles as the program grows
+        self.COMMAND_SIZE = (self.SIZE[0] // 2, self.SIZE[1])
+        self.scroll_offset = 0 # how far the program side is scrolled up, applied to the canvas and blocks when drawn
+        self.scroll_step = 30
+        self.command_canvas = CommandCanvas(self.COMMAND_SIZE[0], self.SIZE[1], gradient_span=self.SIZE[1] + 3000)
 
         # Run Button initialization
         self.run_button = Button(self.SIZE[0] // 2 + 250, self.SIZE[1] - 120, 180, 80, "Execute", (100, 200, 100), (150, 255, 150))
@@ -89,19 +99,37 @@ class Interface:
             Block(280, 520, 'land', icon=self.icons["land"])
         ]
 
-        # Blocks that are currently on the programming side
+        # Blocks that are currently on the programming side, in the same order as the program model
+        self.program = ProgramModel()
         self.used_blocks = []
         self.current_block = None
-        self.has_land = False
-        self.has_takeoff = False
 
-        self.std_block_size = (120, 120)
+
+        # Dirty rectangle rendering, the first frame always draws everything
+        self.dirty_rects = dirty_rects
+        self._full_redraw = True
+        self._last_scene = {}
+
+        # 60 fps while the user is doing something, 5 fps once the editor has been left alone
+        self.scheduler = FrameScheduler(target_fps=60, idle_fps=5, overlay=show_fps)
+
+        self.warm_flight = warm_flight
+        self.execution_mode = execution_mode
+        self.trace_path = trace_path
+        self.flights = 0
+        self.flight_loader = FlightLoader(startup)
 
         # The y axis coordiante of the block when it's at the bottom
         self.block_bottom = self.SIZE[1]-self.std_block_size[1]
         # Using list so that the values can be changed easily
         self.next_position = [self.COMMAND_SIZE[0], self.block_bottom]
 
+        # Hit testing: placed blocks by arithmetic on the stack layout, the palette through a grid
+        self.stack_layout = StackLayout(self.COMMAND_SIZE[0] + 20, self.std_block_size, spacing=10)
+        self.palette_index = SpatialGrid(cell_size=160)
+        for block in self.blocks:
+            self.palette_index.insert(block, block.surface_rectangle)
+
     def run(self):
         """
         Main loop for running the program interface.
@@ -123,129 +151,179 @@ class Interface:
             
             # EVENT HANDLING
             for event in pygame.event.get():
-
-                if event.type == pygame.QUIT:
-                    self.running = False #to actually exit the loop
-
-                if event.type == pygame.MOUSEMOTION:
-                    # validate and update takeoff/land status
-                    actions = [block.action for block in self.used_blocks]
-                    self.has_land = True if "land" in actions else False
-                    self.has_takeoff = True if "takeoff" in actions else False
-
-                # dragging blocks
-                if event.type == pygame.MOUSEBUTTONDOWN and self.current_block is None:
-                    for block in self.blocks:
-                        if block.surface_rectangle.collidepoint(event.pos):
-
-                            # error handling to require takeoff/land and prevent multiple takeoff/land 
-                            if block.action == "takeoff" and self.has_takeoff:
-                                print("Already have takeoff")
-                                continue
-                            if block.action == "land" and self.has_land:
-                                print("Already have land")
-                                continue
-                            if block.action != "takeoff" and not self.has_takeoff:
-                                print("Need to takeoff first")
-                                continue
-
-                            # validate and update takeoff/land status
-                            actions = [block.action for block in self.used_blocks]
-                            self.has_land = True if "land" in actions else False
-                            self.has_takeoff = True if "takeoff" in actions else False
-
-                            # NOTE: Creates a copy and adds it to the in use blocks
-                            copy = block.copy()
-                            self.current_block = copy
-                    
-                    for block in self.used_blocks:
-                        if block.surface_rectangle.collidepoint(event.pos):
-                            self.current_block = block
-                            self.current_block.dragging = True
-
-                elif event.type == pygame.MOUSEBUTTONDOWN and self.current_block is not None:
-                    # Makes sure that the block gets placed on the program side (right)
-                    if event.pos[0] >= self.COMMAND_SIZE[0]+self.current_block.width//2:
-
-                        self.current_block.x = self.COMMAND_SIZE[0]
-                        self.current_block.y = self.block_bottom
-                        
-                        self.used_blocks.append(self.current_block.copy(drag=False, id=len(self.used_blocks)))
-
-                        self.current_block.dragging = False
-                        self.current_block = None
-
-                    else:
-                        self.current_block.dragging = False 
-                        self.current_block = None
-
-                    # Events for already placed blocks
-                    for block in self.used_blocks:
-                        if block.surface_rectangle.collidepoint(event.pos):
-                            if event.pos[0] < self.COMMAND_SIZE[0]+block.width//2:
-                                id = block.id
-                                for subset_block in self.used_blocks[block.id:]:
-                                    subset_block.id -=1
-
-                                del self.used_blocks[id]
-
-                            block.dragging = False
-
-                    print(f"Number of placed blocks: {len(self.used_blocks)}")
-
-
-                elif event.type == pygame.MOUSEMOTION:
-                    for block in self.used_blocks:
-                        if block.dragging:
-                            mouse_x, mouse_y = event.pos
-                            block.x = mouse_x - block.width // 2
-                            block.y = mouse_y - block.height // 2
-                            block.surface_rectangle.topleft = (block.x, block.y)
-                            # print(block.x, block.y)
-
-                    if self.current_block:
-                        mouse_x, mouse_y = event.pos
-                        self.current_block.x = mouse_x - self.std_block_size[0] // 2
-                        self.current_block.y = mouse_y - self.std_block_size[1] // 2
-
-                # scrolling command surface
-                elif event.type == pygame.MOUSEWHEEL:
-                    if self.used_blocks:
-                        self.used_blocks[0].y += event.y*20   
-
-                    if event.y > 0: # scroll up
-                        self.command_scroll_y = max(self.command_scroll_y - 30, 0 + self.SIZE[1])
-                    elif event.y < 0: # scroll down
-                      self.command_scroll_y = min(self.command_scroll_y + 30, self.COMMAND_SIZE[1])
-
-
-                if self.run_button.check_click(event):
-                    commands = [block.action for block in sorted(self.used_blocks, key=lambda b: b.y, reverse=True)]
-                    if commands[-1] == 'land':
-                        print("Calling run_user_interface")
-                        run_user_interface(commands) #Runs user_interface module
-                    else:
-                        print("Still needs a land block!")
+                overlay = self.scheduler.overlay
+                self.scheduler.handle_event(event)
+                if overlay and not self.scheduler.overlay:
+                    self.request_full_redraw()  # paint over the overlay that was just hidden
+                self.handle_event(event)
 
             # BLITTING
-            self.draw()
-
+            if self.draw():
+                self.scheduler.notify_activity()
+            overlay_rect = self.scheduler.draw_overlay(self.screen)
+            if overlay_rect is not None:
+                pygame.display.update(overlay_rect)
+            if "first frame" not in startup.marks:
+                startup.mark("first frame")
+                if self.warm_flight:
+                    self.flight_loader.warm()  # import the flight screen while the program is being built
+
+            # Sleeps out the rest of the frame, wakes early for new events
+            self.scheduler.tick()
+
+        self.flight_loader.close()  # the drone link stays open between runs, end it with the editor
         pygame.quit()
 
-    def draw(self):
+    def handle_event(self, event):
         """
-        Draws the current state of the screen, uses blit method of the block class to draw each block. As well as the command surface and run button.
-        This method fills the screen with the background color, draws a divider between commands and control area.
+        Handles a single pygame event for the editor, see run for the events that are used.
         """
-        self.screen.fill(self.background_color)
+        if event.type == pygame.QUIT:
+            self.running = False #to actually exit the loop
+
+        # the window contents may have been lost, repaint everything
+        if event.type in (pygame.VIDEORESIZE, pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+            self.request_full_redraw()
+
+        # dragging blocks
+        if event.type == pygame.MOUSEBUTTONDOWN and self.current_block is None:
+            block = self.hit_test(event.pos)
+
+            if block is not None and block.id is None:
+                # error handling to require takeoff/land and prevent multiple takeoff/land 
+                error = self.program.check_add(block.action)
+                if error:
+                    print(error)
+                else:
+                    # NOTE: Creates a copy and adds it to the in use blocks
+                    self.current_block = block.copy()
+
+            elif block is not None:
+                self.current_block = block
+                self.current_block.dragging = True
+
+        elif event.type == pygame.MOUSEBUTTONDOWN and self.current_block is not None:
+            on_program_side = event.pos[0] >= self.COMMAND_SIZE[0]+self.current_block.width//2
+            is_placed = self.current_block.id is not None
+
+            # Makes sure that the block gets placed on the program side (right)
+            if on_program_side and is_placed:
+                self.move_block(self.current_block, self.slot_at(event.pos[1]))
+            elif on_program_side:
+                self.place_block(self.current_block)
+            elif is_placed:
+                # Placed blocks dropped back on the palette side are deleted
+                self.remove_block(self.current_block)
+
+            self.current_block.dragging = False
+            self.current_block = None
+
+            print(f"Number of placed blocks: {len(self.used_blocks)}")
+
+
+        elif event.type == pygame.MOUSEMOTION:
+            if self.current_block:
+                mouse_x, mouse_y = event.pos
+                self.current_block.x = mouse_x - self.std_block_size[0] // 2
+                self.current_block.y = mouse_y - self.std_block_size[1] // 2
+                self.current_block.surface_rectangle.topleft = (self.current_block.x, self.current_block.y)
+
+        # scrolling command surface
+        elif event.type == pygame.MOUSEWHEEL:
+            self.request_full_redraw()
+            # scrolling up reveals the later blocks higher in the stack
+            self.scroll_offset += event.y * self.scroll_step
+            self.scroll_offset = max(0, min(self.scroll_offset, self.command_canvas.max_offset()))
+
+
+        if self.run_button.check_click(event):
+            error = self.program.validate()
+            if error is None:
+                print("Calling run_user_interface")
+                try:
+                    run_user_interface = self.flight_loader.load()  # waits for the warm up if it is still running
+                    self.flights += 1
+                    trace_path = f"{self.trace_path}.{self.flights}" if self.trace_path else None
+                    run_user_interface(self.program.export(), execution_mode=self.execution_mode, trace_path=trace_path) #Runs user_interface module
+                except connection_errors() as e:
+                    # the drone could not be reached, the program stays in the editor for the next try
+                    print(f"Could not run the program: {e}")
+                self.request_full_redraw()
+            else:
+                print(error)
+
+    def place_block(self, block, index=None):
+        """
+        Adds a copy of a block to the program at index (the top of the stack by default) and returns the copy.
+        """
+        placed = block.copy(drag=False)
+        placed.id = self.program.insert(block.action, index)
+        self.used_blocks.insert(self.program.index_of(placed.id), placed)
+        return placed
+
+    def remove_block(self, block):
+        """Removes a placed block from the program."""
+        index = self.program.index_of(block.id)
+        self.program.delete(block.id)
+        del self.used_blocks[index]
+        self.clamp_scroll()
+
+    def move_block(self, block, index):
+        """Moves a placed block to another position in the program."""
+        old_index = self.program.index_of(block.id)
+        self.program.move(block.id, index)
+        self.used_blocks.insert(self.program.index_of(block.id), self.used_blocks.pop(old_index))
+
+    def clamp_scroll(self):
+        """
+        Fits the canvas to the program and keeps the scroll offset inside it, a shorter program can not
+        stay scrolled past its end or the blocks would drift away from the canvas.
+        """
+        # the canvas grows with the program instead of having a fixed height,
+        # enough to scroll the last block to the top of the window
+        self.command_canvas.ensure_height(len(self.used_blocks) * self.stack_layout.pitch)
+        offset = max(0, min(self.scroll_offset, self.command_canvas.max_offset()))
+        if offset != self.scroll_offset:
+            self.scroll_offset = offset
+            self.request_full_redraw()  # the canvas moves with the offset
+
+    def stack_origin(self):
+        """Returns the y coordinate of the bottom block of the stack, which moves when scrolling."""
+        return self.block_bottom + self.scroll_offset
+
+    def visible_blocks(self):
+        """Returns the placed blocks whose stack slot intersects the window, dragged blocks are left out."""
+        visible = self.stack_layout.visible_range(self.stack_origin(), 0, self.SIZE[1], len(self.used_blocks))
+        return [block for block in self.used_blocks[visible.start:visible.stop] if not block.dragging]
+
+    def slot_at(self, y):
+        """Returns the program index of the stack slot closest to the screen y coordinate."""
+        return self.stack_layout.nearest_slot(y, self.stack_origin(), len(self.used_blocks))
+
+    def hit_test(self, pos):
+        """
+        Returns the block under a screen position without scanning the blocks: the palette grid first,
+        then the placed stack. Only runs while nothing is dragged, and a dropped block always ends up
+        placed or deleted, so there are no loose blocks to look for.
+        """
+        block = self.palette_index.item_at(pos)
+        if block is not None:
+            return block
 
-        pygame.draw.rect(self.screen, (255, 255, 255), pygame.Rect(self.SIZE[0]//2 - 2, 0, 1, self.SIZE[1])) # divider between blocks and control area
-        
-        self.screen.blit(self.command_surface, (self.SIZE[0]//2, self.command_scroll_y - self.COMMAND_SIZE[1]))
+        index = self.stack_layout.index_at(pos, self.stack_origin(), len(self.used_blocks))
+        if index is not None:
+            return self.used_blocks[index]
+        return None
 
-        self.run_button.blit(self.screen) 
-        
+    def request_full_redraw(self):
+        """Makes the next draw repaint and flip the whole window instead of only the changed areas."""
+        self._full_redraw = True
 
+    def layout(self):
+        """
+        Positions the placed blocks and updates which palette blocks are active.
+        Called by draw before anything is painted.
+        """
         # Used originally for grid formatted blocks
         """for block in self.used_blocks:
             if not block.dragging and not block.scrolling:
@@ -256,34 +334,105 @@ class Interface:
                 block.x = self.COMMAND_SIZE[0] + ( (block.id+1)//7 ) * block.width"""
         
         # Used for scrollable blocks
-        # All block placements are based on the previous block
-        # The 0th index block retains it's own position which is changed by scrolling
-        for i in range(len(self.used_blocks)):
+        # Block placement is based on the program index and the scroll offset,
+        # only the blocks inside the window are positioned
+        self.clamp_scroll()
+        origin_y = self.stack_origin()
+        visible = self.stack_layout.visible_range(origin_y, 0, self.SIZE[1], len(self.used_blocks))
+        for i in visible:
             block = self.used_blocks[i]
-                        
             if not block.dragging:
-                if block.id == 0:
-                    if len(self.used_blocks) == 1:
-                        block.y = self.block_bottom - (i * (block.height + 10))
-                        block.x = self.COMMAND_SIZE[0] + 20
-                        continue
-                    else:
-                        block.x = self.COMMAND_SIZE[0] + 20
-                        continue
-
-                else:
-                    block.y = self.used_blocks[i-1].y - block.height - 10
-                    block.x = self.COMMAND_SIZE[0] + 20
+                block.x = self.stack_layout.x
+                block.y = self.stack_layout.y_for(i, origin_y)
 
-        starts_with_takeoff = len(self.used_blocks)>0
-        if starts_with_takeoff:
-            starts_with_takeoff = self.used_blocks[0].action == 'takeoff'
+        starts_with_takeoff = self.program.first() == 'takeoff'
 
         for block in self.blocks:
             block.active= starts_with_takeoff or block.action == 'takeoff'
 
+    def draw(self):
+        """
+        Draws the current state of the screen, uses blit method of the block class to draw each block. As well as the command surface and run button.
+        In dirty rectangle mode only the areas of blocks and buttons that changed since the last frame are repainted
+        and pushed with pygame.display.update, nothing is pushed when nothing changed.
+        Returns True if anything was pushed to the display.
+        """
+        self.layout()
+
+        if not self.dirty_rects:
+            self.paint()
+            pygame.display.flip() # updates whole screen
+            return True
+
+        scene = self.scene_state()
+        previous_scene, self._last_scene = self._last_scene, scene
+
+        if self._full_redraw:
+            self._full_redraw = False
+            self.paint()
+            pygame.display.flip()
+            return True
+
+        # A changed item needs both the area it left and the area it now covers repainted
+        dirty = []
+        for key, state in scene.items():
+            old_state = previous_scene.get(key)
+            if old_state != state:
+                dirty.append(pygame.Rect(state[0]))
+                if old_state is not None:
+                    dirty.append(pygame.Rect(old_state[0]))
+        for key, old_state in previous_scene.items():
+            if key not in scene:
+                dirty.append(pygame.Rect(old_state[0]))
+
+        if not dirty:
+            return False
+
+        for rect in dirty:
+            self.screen.set_clip(rect)
+            self.paint()
+        self.screen.set_clip(None)
+
+        pygame.display.update(dirty) # updates only the given portions of the screen
+        return True
+
+    def scene_state(self):
+        """
+        Returns what every drawn item looks like this frame, keyed by item.
+        Each value is (rect, appearance), draw compares it with the previous frame to find dirty areas.
+        """
+        mouse_pos = pygame.mouse.get_pos()
+        scene = {("run_button",): (tuple(self.run_button.rect), None)}
+
+        for i, block in enumerate(self.blocks):
+            block.surface_rectangle.topleft = (block.x, block.y)
+            scene[("palette", i)] = (tuple(block.surface_rectangle), (block.active, block.check_hover(mouse_pos)))
 
-        for rect in self.blocks+self.used_blocks:
+        for block in self.visible_blocks():
+            block.surface_rectangle.topleft = (block.x, block.y)
+            scene[("placed", id(block))] = (tuple(block.surface_rectangle), (block.active, block.check_hover(mouse_pos)))
+
+        if self.current_block:
+            block = self.current_block
+            block.surface_rectangle.topleft = (block.x, block.y)
+            scene[("current",)] = (tuple(block.surface_rectangle), (id(block), block.action, block.check_hover(mouse_pos)))
+
+        return scene
+
+    def paint(self):
+        """
+        Paints the whole scene onto the screen surface without pushing it to the display.
+        Respects the screen clip so it can repaint a single dirty area.
+        """
+        self.screen.fill(self.background_color)
+
+        pygame.draw.rect(self.screen, (255, 255, 255), pygame.Rect(self.SIZE[0]//2 - 2, 0, 1, self.SIZE[1])) # divider between blocks and control area
+        
+        self.command_canvas.draw(self.screen, (self.SIZE[0]//2, 0), self.scroll_offset)
+
+        self.run_button.blit(self.screen) 
+
+        for rect in self.blocks+self.visible_blocks():
             
             rect.blit(self.screen)
 
@@ -291,11 +440,97 @@ class Interface:
         if self.current_block:
             self.current_block.blit(self.screen)
 
+class BlockRenderCache:
+    # hover_fill matches fill so blocks look the same as before, pass a different color to highlight hovered blocks
+    DEFAULT_THEME = {
+        "fill": (100, 100, 200),
+        "hover_fill": (100, 100, 200),
+        "label_color": (0, 0, 0),
+        "label_font": ("Arial", 14),
+    }
 
-        # pygame.display.update() # updates portion of screen if given arguments, else updates whole screen
-        pygame.display.flip() # updates whole screen
+    def __init__(self, max_entries=64, theme=None):
+        """
+        Shared cache of fully composed block images so that drawing a block is a single blit.
+        Entries are keyed by (action, size, active, hovered) and hold the background fill, the
+        action label and the pre-scaled icon already converted to the display format.
+
+        Parameters:
+            max_entries (int): Maximum number of composed images kept before the least recently used is dropped.
+            theme (dict): Optional overrides for the colors and label font in DEFAULT_THEME.
+
+        Attributes:
+            theme (dict): The colors and font used to compose blocks.
+            size (tuple): The block size the cached entries were rendered for.
+            hits (int): Number of lookups served from the cache.
+            misses (int): Number of lookups that had to compose a new image.
+        """
+        self.max_entries = max_entries
+        self.theme = dict(self.DEFAULT_THEME, **(theme or {}))
+        self.size = None
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def set_theme(self, **theme):
+        """Updates theme values and throws away every cached image."""
+        self.theme.update(theme)
+        self.invalidate()
+
+    def invalidate(self):
+        """Empties the cache, the next lookups compose their images again."""
+        self._entries.clear()
+
+    def get(self, action, icon, size, active, hovered):
+        """
+        Returns the composed image for a block, building it on the first request.
+
+        Parameters:
+            action (str): The action name drawn as the block label.
+            icon (pygame.Surface): The icon for the action, may be None.
+            size (tuple): The (width, height) of the block.
+            active (bool): Whether the icon is drawn over the block.
+            hovered (bool): Whether the mouse is over the block.
+        """
+        # Every entry shares the same size, a new block size makes the old entries useless
+        if size != self.size:
+            self.invalidate()
+            self.size = size
+
+        key = (action, size, active, hovered)
+        image = self._entries.get(key)
+        if image is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return image
+
+        self.misses += 1
+        image = self._compose(action, icon, size, active, hovered)
+        self._entries[key] = image
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return image
+
+    def _compose(self, action, icon, size, active, hovered):
+        image = pygame.Surface(size, pygame.SRCALPHA)
+        image.fill(self.theme["hover_fill"] if hovered else self.theme["fill"])
+
+        face, font_size = self.theme["label_font"]
+        image.blit(render_text(action, font_size, self.theme["label_color"], face=face), (5, 5))
+
+        if icon and active:
+            scaled_icon = pygame.transform.scale(icon, size)
+            image.blit(scaled_icon, scaled_icon.get_rect(center=(size[0] // 2, size[1] // 2)))
+
+        # convert_alpha needs a display mode, skip it when composing before the window exists
+        if pygame.display.get_surface() is not None:
+            image = image.convert_alpha()
+        return image
 
 class Block:
+    # Shared by every block and all of their copies
+    render_cache = BlockRenderCache()
+
     def __init__(self, x: int, y: int, action: str, id=None, icon = None):
         """
         Initializes a new Block object for the drone programming interface.
@@ -312,7 +547,7 @@ class Block:
             height (int): The height of the block.
             action (str): The action or command represented by the block.
             dragging (bool): A flag indicating whether the block is being dragged.
-            surface (pygame.Surface): The surface representing the block.
+            hovered (bool): A flag indicating whether the mouse was over the block when last drawn.
             surface_rectangle (pygame.Rect): The rectangle defining the block's position and size.
         """
         self.x = x
@@ -321,54 +556,39 @@ class Block:
         self.action = action
         self.active = True
         self.dragging = False
+        self.hovered = False
         self.id = id
         self.scrolling = False
         self.icon = icon
 
-        self.surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA)  # Enables transparency
-        self.surface.fill((200, 200, 200))
-
-        self.surface_rectangle = self.surface.get_rect() # drawing rectangle exactly to the surface to enable interactivity like collidepoint
-        self.surface_rectangle.topleft = (self.x, self.y) 
+        # rectangle matching the block to enable interactivity like collidepoint
+        self.surface_rectangle = pygame.Rect(self.x, self.y, self.width, self.height)
 
     def blit(self, screen: pygame.Surface):
         """
-        Blits the block's surface onto the screen at its (x, y) coordinates.
-        Displays the block's action name when hovered.
+        Blits the block's cached image onto the screen at its (x, y) coordinates.
+        The image holds the action name, and the icon when the block is active.
         
         Parameters:
           screen (pygame.Surface): The surface to draw the block on.
         """
         self.surface_rectangle.topleft = (self.x, self.y) 
-        screen.blit(self.surface, (self.x, self.y))
-
-        # Draws the icons dynamically
-        if self.icon and self.active:
-            scaled_icon = pygame.transform.scale(self.icon, (self.width, self.height))  # Scale icon
-            icon_rect = scaled_icon.get_rect(center=(self.x + self.width // 2, self.y + self.height // 2))  # Center icon
-            screen.blit(scaled_icon, icon_rect.topleft)  # Blit icon at new position
-
         self.check_hover(pygame.mouse.get_pos())
 
-        self.surface.fill((100,100,200))
-            
-
-        # temporary font so that we can see the names of the blocks
-        temp_font = pygame.font.SysFont('Arial', 14).render(self.action, True, (0, 0, 0))
-        self.surface.blit(temp_font, (5, 5))
+        image = Block.render_cache.get(self.action, self.icon, (self.width, self.height),
+                                       bool(self.icon) and self.active, self.hovered)
+        screen.blit(image, (self.x, self.y))
         
     #The rect.collidepoint() method is used to check if a point is inside a rectangle, can use it for highlighting detection
     def check_hover(self, mouse_pos):
         """ 
-        Checks if the mouse is hovering over the block and changes its color accordingly. 
+        Checks if the mouse is hovering over the block, the cached image for that state is used when drawing. 
         
         Parameters:
           mouse_pos (tuple): The current position of the mouse (x, y).
         """
-        if self.surface_rectangle.collidepoint(mouse_pos):
-            self.surface.fill((200, 200, 200))
-        else:
-            self.surface.fill((255, 255, 255))
+        self.hovered = self.surface_rectangle.collidepoint(mouse_pos)
+        return self.hovered
 
     def check_click(self, mouse_pos):
         """
@@ -390,6 +610,27 @@ class Block:
         self.x, self.y = pos
 
 if __name__ == "__main__":
-    interface = Interface()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Drone blocks programming interface")
+    parser.add_argument("--no-warm", action="store_true", help="only import the flight screen when run is pressed")
+    parser.add_argument("--startup-report", action="store_true", help="print cold start timings on exit")
+    parser.add_argument("--import-profile", action="store_true", help="print the slowest imports of the editor and the flight screen and exit")
+    parser.add_argument("--execution-mode", choices=("primitive", "compiled"), default="primitive",
+                        help="fly one drone call per step, or compile runs of moves into go/curve segments")
+    parser.add_argument("--trace", metavar="PATH", default=None,
+                        help="record every flight, writes PATH.<n>.trace.json (Chrome trace) and PATH.<n>.jsonl")
+    args = parser.parse_args()
+
+    if args.import_profile:
+        for module in ("programming_interface", "user_interface"):
+            print(f"Slowest imports of {module} (cumulative ms, self ms):")
+            for cumulative, own, name in import_profile(module):
+                print(f"  {cumulative:8.1f} {own:8.1f}  {name}")
+        raise SystemExit
+
+    interface = Interface(warm_flight=not args.no_warm, execution_mode=args.execution_mode, trace_path=args.trace)
 
     interface.run()
+    if args.startup_report:
+        print(f"Startup: {startup.report()}")
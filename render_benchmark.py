@@ -0,0 +1,236 @@
+"""
+Headless benchmark for the rendering hot paths.
+
+Runs the block editor (programming_interface.Interface) and the in-flight command list
+(ScrollableCommandList) under SDL's dummy video driver with synthetic programs, times
+layout, event handling and draw separately and writes the results as JSON.
+
+Usage:
+    python render_benchmark.py --output bench.json
+    python render_benchmark.py --compare bench.json   (exits with 1 if a phase got slower than --threshold)
+"""
+import os
+
+# Must be set before pygame creates a window
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import pygame
+
+from programming_interface import Interface
+from ScrollableCommandList import ScrollableCommandList
+
+PROGRAM_SIZES = (10, 100, 1000)
+QUEUE_SIZES = (100, 1000, 10000)
+MOVES = ["fly_forward", "fly_up", "rotate_left", "fly_right", "hover", "fly_down", "rotate_right", "fly_backward", "fly_left"]
+
+
+def make_program(length):
+    """Returns a valid program of the given length, takeoff first and land last."""
+    middle = [MOVES[i % len(MOVES)] for i in range(max(0, length - 2))]
+    return ["takeoff"] + middle + ["land"]
+
+
+def populate(interface, actions):
+    """Places a block for every action on the program side of the editor, like dropping them one by one."""
+    palette = {block.action: block for block in interface.blocks}
+    for action in actions:
+        interface.place_block(palette[action])
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(samples):
+    """Turns a list of frame times in seconds into millisecond statistics."""
+    return {
+        "frames": len(samples),
+        "mean_ms": 1000 * sum(samples) / len(samples),
+        "p50_ms": 1000 * percentile(samples, 0.50),
+        "p95_ms": 1000 * percentile(samples, 0.95),
+        "p99_ms": 1000 * percentile(samples, 0.99),
+    }
+
+
+def measure(step, frames, warmup=5):
+    """
+    Calls step(frame) once per frame and returns its timing statistics.
+    A second, separate pass runs under tracemalloc so tracing overhead does not skew the times.
+    """
+    for frame in range(warmup):
+        step(frame)
+
+    samples = []
+    for frame in range(frames):
+        start = time.perf_counter()
+        step(frame)
+        samples.append(time.perf_counter() - start)
+    stats = summarize(samples)
+
+    alloc_frames = min(frames, 50)
+    peaks = []
+    blocks = []
+    tracemalloc.start()
+    for frame in range(alloc_frames):
+        tracemalloc.reset_peak()
+        before_size, _ = tracemalloc.get_traced_memory()
+        before_blocks = sys.getallocatedblocks()
+        step(frame)
+        _, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - before_size)
+        blocks.append(sys.getallocatedblocks() - before_blocks)
+    tracemalloc.stop()
+    stats["alloc_peak_bytes_per_frame"] = sum(peaks) / alloc_frames
+    stats["net_alloc_blocks_per_frame"] = sum(blocks) / alloc_frames
+    return stats
+
+
+def motion_event(frame):
+    x = 700 + (frame * 7) % 400
+    y = 100 + (frame * 11) % 500
+    return pygame.event.Event(pygame.MOUSEMOTION, pos=(x, y), rel=(7, 11), buttons=(0, 0, 0))
+
+
+def bench_interface(program_length, frames):
+    results = []
+    interface = Interface()
+    populate(interface, make_program(program_length))
+
+    def record(phase, step):
+        stats = measure(step, frames)
+        stats.update({"target": "Interface", "phase": phase, "size": program_length})
+        results.append(stats)
+
+    record("layout", lambda frame: interface.layout())
+
+    # Hover moves and a scroll every tenth frame, the common idle-editing input
+    def events(frame):
+        interface.handle_event(motion_event(frame))
+        if frame % 10 == 0:
+            interface.handle_event(pygame.event.Event(pygame.MOUSEWHEEL, x=0, y=1 if frame % 20 else -1, flipped=False))
+    record("events", events)
+
+    interface.dirty_rects = False
+    record("draw_full", lambda frame: interface.draw())
+
+    interface.dirty_rects = True
+    interface.request_full_redraw()
+    interface.draw()
+    record("draw_idle", lambda frame: interface.draw())
+
+    # A block dragged around the palette side, the dirty renderer's worst steady case
+    interface.current_block = interface.blocks[1].copy()
+    def drag(frame):
+        interface.current_block.x = (frame * 13) % 500
+        interface.current_block.y = (frame * 17) % 560
+        interface.draw()
+    record("draw_drag", drag)
+
+    return results
+
+
+def bench_command_list(queue_length, frames):
+    screen = pygame.display.set_mode((1280, 700))
+    command_list = ScrollableCommandList(make_program(queue_length), screen, widthRatio=0.12, height=400, x=120, y=190)
+    results = []
+
+    def record(phase, step):
+        stats = measure(step, frames)
+        stats.update({"target": "ScrollableCommandList", "phase": phase, "size": queue_length})
+        results.append(stats)
+
+    record("draw", lambda frame: command_list.draw())
+
+    def scroll(frame):
+        command_list.handle_scroll("down" if frame % 4 < 2 else "up")
+        command_list.draw()
+    record("scroll_draw", scroll)
+
+    # Dequeue as execution would, refilling so every frame has work
+    def dequeue(frame):
+        command_list.commandQueue.append(command_list.dequeue_command())
+        command_list.draw()
+    record("dequeue_draw", dequeue)
+
+    return results
+
+
+def run(program_sizes, queue_sizes, frames):
+    pygame.init()
+    results = []
+    for size in program_sizes:
+        results.extend(bench_interface(size, frames))
+    for size in queue_sizes:
+        results.extend(bench_command_list(size, frames))
+    pygame.quit()
+
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "video_driver": os.environ.get("SDL_VIDEODRIVER"),
+            "frames": frames,
+        },
+        "results": results,
+    }
+
+
+def compare(report, baseline, threshold):
+    """Prints the p50 ratio of every phase against a previous run and returns the phases that regressed."""
+    previous = {(r["target"], r["phase"], r["size"]): r for r in baseline["results"]}
+    regressions = []
+    for result in report["results"]:
+        key = (result["target"], result["phase"], result["size"])
+        if key not in previous or previous[key]["p50_ms"] <= 0:
+            continue
+        ratio = result["p50_ms"] / previous[key]["p50_ms"]
+        flag = "  REGRESSION" if ratio > threshold else ""
+        print(f"{key[0]:>22} {key[1]:>12} {key[2]:>6}: {previous[key]['p50_ms']:8.3f} -> {result['p50_ms']:8.3f} ms ({ratio:.2f}x){flag}")
+        if ratio > threshold:
+            regressions.append(key)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless rendering benchmark for the editor and the command list")
+    parser.add_argument("--frames", type=int, default=200, help="timed frames per phase")
+    parser.add_argument("--program-sizes", type=int, nargs="+", default=list(PROGRAM_SIZES))
+    parser.add_argument("--queue-sizes", type=int, nargs="+", default=list(QUEUE_SIZES))
+    parser.add_argument("--output", help="write the JSON report to this file")
+    parser.add_argument("--compare", help="previous JSON report to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="p50 ratio that counts as a regression")
+    args = parser.parse_args()
+
+    report = run(args.program_sizes, args.queue_sizes, args.frames)
+
+    for result in report["results"]:
+        print(f"{result['target']:>22} {result['phase']:>12} {result['size']:>6}: "
+              f"p50 {result['p50_ms']:8.3f} ms  p95 {result['p95_ms']:8.3f} ms  p99 {result['p99_ms']:8.3f} ms  "
+              f"peak alloc {result['alloc_peak_bytes_per_frame']:10.0f} B")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"Wrote {args.output}")
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        if compare(report, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+from text_cache import render_text
+
+
+class StartupTask:
+
+    def __init__(self, name, function, requires, label):
+        """
+        One piece of startup work and what happened to it.
+
+        Attributes:
+            state (str): "waiting" for its requirements, "queued" for a worker, "running", "done" or "failed".
+            ready, start, end (float): When it could run, started and finished, on the orchestrator's clock.
+        """
+        self.name = name
+        self.function = function
+        self.requires = requires
+        self.label = label
+        self.state = "waiting"
+        self.result = None
+        self.error = None
+        self.ready = None
+        self.start = None
+        self.end = None
+
+    @property
+    def finished(self):
+        return self.state in ("done", "failed")
+
+
+class StartupOrchestrator:
+
+    def __init__(self, max_workers=4, tracer=None, clock=time.monotonic):
+        """
+        Runs the flight screen's startup work (drone connection, stream start, sound decoding, image
+        loading) on a thread pool instead of one after another. Every task starts as soon as the tasks
+        it requires are done and is called with their results, so waits on the network and the disk
+        overlap. A failed task fails everything that requires it.
+
+        Parameters:
+            max_workers (int): Tasks that can run at the same time.
+            tracer (FlightTracer): Optional, each task is recorded on it as a span.
+            clock: Time source in seconds, the tracer's clock when tracing.
+        """
+        self.max_workers = max_workers
+        self.tracer = tracer
+        self.clock = tracer.clock if tracer is not None else clock
+        self.tasks = {}
+        self.started = None
+        self._pool = None
+        self._closing = False
+        self._condition = threading.Condition()
+
+    def add(self, name, function, requires=(), label=None):
+        """
+        Adds a task, requirements must have been added before it. label is shown under the progress bar
+        while the task runs.
+        """
+        if name in self.tasks:
+            raise ValueError(f"Startup task {name} was added twice")
+        for requirement in requires:
+            if requirement not in self.tasks:
+                raise ValueError(f"Startup task {name} requires {requirement}, add it first")
+        self.tasks[name] = StartupTask(name, function, tuple(requires), label or name)
+        return self
+
+    def start(self):
+        self.started = self.clock()
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="startup")
+        with self._condition:
+            for task in self.tasks.values():
+                if not task.requires:
+                    self._submit(task)
+        return self
+
+    def _submit(self, task):
+        task.state = "queued"
+        task.ready = self.clock()
+        self._pool.submit(self._run, task)
+
+    def _run(self, task):
+        with self._condition:
+            task.state = "running"
+            task.start = self.clock()
+            arguments = [self.tasks[requirement].result for requirement in task.requires]
+        try:
+            result, error = task.function(*arguments), None
+        except Exception as e:
+            result, error = None, e
+            print(f"Startup task {task.name} failed: {e}")
+        with self._condition:
+            task.end = self.clock()
+            task.result, task.error = result, error
+            task.state = "failed" if error is not None else "done"
+            self._settle(task)
+            if self._closing and self.finished:
+                self._pool.shutdown(wait=False)
+            self._condition.notify_all()
+        if self.tracer is not None:
+            self.tracer.complete(task.name, "startup", task.start, task.end,
+                                 waited=task.start - task.ready, failed=error is not None)
+
+    def _settle(self, finished):
+        """Queues the tasks that were only waiting for finished, or fails them if it failed."""
+        for task in self.tasks.values():
+            if task.state != "waiting" or finished.name not in task.requires:
+                continue
+            if finished.state == "failed":
+                task.state = "failed"
+                task.error = RuntimeError(f"{task.name} was not run, {finished.name} failed: {finished.error}")
+                task.end = self.clock()
+                self._settle(task)
+            elif all(self.tasks[requirement].state == "done" for requirement in task.requires):
+                self._submit(task)
+
+    @property
+    def finished(self):
+        return all(task.finished for task in self.tasks.values())
+
+    def progress(self):
+        """Returns the share of tasks that finished, between 0 and 1."""
+        if not self.tasks:
+            return 1.0
+        return sum(task.finished for task in self.tasks.values()) / len(self.tasks)
+
+    def result(self, name, timeout=None):
+        """Waits for a task and returns what it returned, raises its error if it failed."""
+        task = self.tasks[name]
+        with self._condition:
+            if not self._condition.wait_for(lambda: task.finished, timeout):
+                raise TimeoutError(f"Startup task {name} did not finish in {timeout}s")
+        if task.error is not None:
+            raise task.error
+        return task.result
+
+    def wait(self, timeout=None):
+        """Waits for every task, returns False if some are still running after timeout."""
+        with self._condition:
+            return self._condition.wait_for(lambda: self.finished, timeout)
+
+    def draw_progress(self, screen):
+        """Draws a progress bar with the running tasks at the bottom of the screen, nothing once all are done."""
+        if self.finished:
+            return
+        width, height = 420, 14
+        bar = pygame.Rect((screen.get_width() - width) // 2, screen.get_height() - 70, width, height)
+        pygame.draw.rect(screen, (30, 30, 60), bar)
+        pygame.draw.rect(screen, (100, 200, 100), (bar.x, bar.y, int(width * self.progress()), height))
+        pygame.draw.rect(screen, (255, 255, 255), bar, 1)
+
+        running = dict.fromkeys(task.label for task in self.tasks.values() if task.state in ("queued", "running"))
+        label = render_text(", ".join(running) or "Starting", 20, (255, 255, 255))
+        screen.blit(label, label.get_rect(midtop=(bar.centerx, bar.bottom + 6)))
+
+    def wait_with_progress(self, screen, background=None, fps=30):
+        """
+        Shows the progress bar until every task finished, keeping the window responsive. Input is
+        dropped like during the intro clip. Returns True as soon as the window is closed, the tasks
+        keep running.
+        """
+        clock = pygame.time.Clock()
+        while not self.finished:
+            if background is not None:
+                screen.blit(background, (0, 0))
+            else:
+                screen.fill((0, 0, 0))
+            self.draw_progress(screen)
+            pygame.display.flip()
+            if any(event.type == pygame.QUIT for event in pygame.event.get()):
+                return True
+            clock.tick(fps)
+        return False
+
+    def shutdown(self):
+        """
+        Lets the pool go once every task finished. Tasks still waiting for their requirements are
+        queued as usual until then, so shutting down early does not strand them.
+        """
+        if self._pool is None:
+            return
+        with self._condition:
+            self._closing = True
+            if not self.finished:
+                return  #The last task to finish shuts the pool down
+        self._pool.shutdown(wait=False)
+
+    def timings(self):
+        """Returns per task, in milliseconds since start: when it started and ended, how long it waited for a worker and ran."""
+        timings = {}
+        for task in self.tasks.values():
+            if task.start is None:
+                timings[task.name] = {"state": task.state}
+                continue
+            timings[task.name] = {
+                "state": task.state,
+                "start_ms": round((task.start - self.started) * 1000, 1),
+                "end_ms": round((task.end - self.started) * 1000, 1) if task.end is not None else None,
+                "waited_ms": round((task.start - task.ready) * 1000, 1),
+                "ran_ms": round((task.end - task.start) * 1000, 1) if task.end is not None else None,
+            }
+        return timings
+
+    def critical_path(self):
+        """
+        Returns the chain of tasks that decided when startup finished: the last task to end, then
+        whichever of its requirements ended last, and so on.
+        """
+        ran = [task for task in self.tasks.values() if task.start is not None and task.end is not None]
+        if not ran:
+            return []
+        path = [max(ran, key=lambda task: task.end)]
+        while path[-1].requires:
+            requirements = [self.tasks[name] for name in path[-1].requires if self.tasks[name].end is not None]
+            if not requirements:
+                break
+            path.append(max(requirements, key=lambda task: task.end))
+        return [task.name for task in reversed(path)]
+
+    def report(self):
+        """Returns the total startup time, what running the tasks one by one would have taken, per task timings and the critical path."""
+        ran = [task for task in self.tasks.values() if task.start is not None and task.end is not None]
+        total = max((task.end for task in ran), default=self.started) - self.started if self.started is not None else 0.0
+        return {
+            "total_ms": round(total * 1000, 1),
+            "serial_ms": round(sum(task.end - task.start for task in ran) * 1000, 1),
+            "tasks": self.timings(),
+            "critical_path": self.critical_path(),
+        }
@@ -1,15 +1,19 @@
 import time
+from trajectory_compiler import to_sdk
 
 class DroneFlight():
 
     # drone being the drone we set up with someone's flight controller
-    def __init__(self, drone):
+    # sleep is what hover waits with, a simulated drone passes its virtual clock here
+    def __init__(self, drone, sleep=time.sleep):
 
         self.drone = drone
+        self.sleep = sleep
 
         # set speed and time flying
         self.distance = 95
         self.rotate = 45
+        self.hover = 3
 
     """
     
@@ -30,29 +34,30 @@ class DroneFlight():
     """
 
     # Take command from our list and make drone do it
-    def drone_command(self, command):
+    # amount overrides the distance, angle or hover time of one block, used for merged steps
+    def drone_command(self, command, amount=None):
 
         # Cardinal Directions
         if command.lower() == "fly_forward":
-            self.drone.move_forward(self.distance)
+            self.drone.move_forward(self.distance if amount is None else amount)
         elif command.lower() == "fly_backward":
-            self.drone.move_back(self.distance)
+            self.drone.move_back(self.distance if amount is None else amount)
         elif command.lower() == "fly_left":
-            self.drone.move_left(self.distance)
+            self.drone.move_left(self.distance if amount is None else amount)
         elif command.lower() == "fly_right":
-            self.drone.move_right(self.distance)
+            self.drone.move_right(self.distance if amount is None else amount)
 
         # Up / Down
         elif command.lower() == "fly_up":
-            self.drone.move_up(self.distance)
+            self.drone.move_up(self.distance if amount is None else amount)
         elif command.lower() == "fly_down":
-            self.drone.move_down(self.distance)
+            self.drone.move_down(self.distance if amount is None else amount)
 
         # Rotate
         elif command.lower() == "rotate_right":
-            self.drone.rotate_clockwise(self.rotate)
+            self.drone.rotate_clockwise(self.rotate if amount is None else amount)
         elif command.lower() == "rotate_left":
-            self.drone.rotate_counter_clockwise(self.rotate)
+            self.drone.rotate_counter_clockwise(self.rotate if amount is None else amount)
 
         # Takeoff / Land
         elif command.lower() == "takeoff":
@@ -62,32 +67,48 @@ class DroneFlight():
 
         # Hover
         else:
-            time.sleep(3)
+            self.sleep(self.hover if amount is None else amount)
+
+    # Fly one segment from trajectory_compiler, go and curve keep the drone moving between blocks
+    # test only prints the SDK command
+    def compiled_command(self, segment, test=False):
+
+        if test and segment.kind == "primitive":
+            self.test_command(*segment.args)
+        elif test:
+            print(to_sdk(segment))
+        elif segment.kind == "go":
+            self.drone.go_xyz_speed(*segment.args)
+        elif segment.kind == "curve":
+            self.drone.curve_xyz_speed(*segment.args)
+        elif segment.kind == "primitive":
+            self.drone_command(*segment.args)
 
     # testing
-    def test_command(self, command):
+    def test_command(self, command, amount=None):
+        amounts = () if amount is None else (amount,)  # the amount is only printed when there is one
 
         # Cardinal Directions
         if command.lower() == "fly_forward":
-            print("forward")
+            print("forward", *amounts)
         elif command.lower() == "fly_backward":
-            print("backward")
+            print("backward", *amounts)
         elif command.lower() == "fly_left":
-            print("left")
+            print("left", *amounts)
         elif command.lower() == "fly_right":
-            print("right")
+            print("right", *amounts)
 
         # Up / Down
         elif command.lower() == "fly_up":
-            print("up")
+            print("up", *amounts)
         elif command.lower() == "fly_down":
-            print("down")
+            print("down", *amounts)
 
         # Rotate
         elif command.lower() == "rotate_right":
-            print("cw")
+            print("cw", *amounts)
         elif command.lower() == "rotate_left":
-            print("ccw")
+            print("ccw", *amounts)
 
         # Takeoff / Land
         elif command.lower() == "takeoff":
@@ -97,4 +118,4 @@ class DroneFlight():
 
         # Hover
         else:
-            time.sleep(3)
\ No newline at end of file
+            self.sleep(self.hover if amount is None else amount)
\ No newline at end of file
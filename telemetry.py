@@ -0,0 +1,136 @@
+import math
+import threading
+import time
+from collections import namedtuple
+
+# A single value and the time.monotonic() it was read at, updated is None if it was never read
+TelemetryReading = namedtuple("TelemetryReading", "value updated")
+
+
+class TelemetrySnapshot(namedtuple("TelemetrySnapshot", "battery temperature speed taken stale")):
+    """
+    Immutable set of drone readings published by TelemetryPoller.
+    battery, temperature and speed are TelemetryReadings, taken is when the snapshot was made
+    and stale is the set of readings that have not updated within the poller's stale_after.
+    """
+    FORMATS = {
+        "battery": "{}%",
+        "temperature": "{} °C",
+        "speed": "{} m/s",
+    }
+
+    def text(self, name):
+        """Returns the HUD text for a reading, "na" when it is missing or stale."""
+        reading = getattr(self, name)
+        if reading.value is None or name in self.stale:
+            return "na"
+        return self.FORMATS[name].format(reading.value)
+
+
+EMPTY_READING = TelemetryReading(None, None)
+EMPTY_SNAPSHOT = TelemetrySnapshot(EMPTY_READING, EMPTY_READING, EMPTY_READING, 0.0, frozenset(("battery", "temperature", "speed")))
+
+
+class TelemetryPoller:
+
+    def __init__(self, drone, rate_hz=5.0, stale_after=2.0, tracer=None, clock=time.monotonic):
+        """
+        Samples the drone's state on its own thread and publishes TelemetrySnapshots.
+        The render loop reads the latest snapshot instead of calling the drone every frame.
+
+        djitellopy's getters return the last state packet and never fail when the packets stop, so a
+        reading is dated by when its packet arrived, not by when it was polled. Every packet replaces
+        the dict get_current_state returns, a new dict means a new packet.
+
+        Parameters:
+            drone: The Tello (or anything with get_battery, get_temperature and get_speed_x/y/z).
+                Without get_current_state every successful read counts as new.
+            rate_hz (float): Samples per second.
+            stale_after (float): Seconds without a new state packet before a reading is flagged stale.
+            tracer (FlightTracer): Optional, every sample is recorded as a counter.
+            clock: Time source in seconds, time.monotonic by default.
+
+        Attributes:
+            snapshot (TelemetrySnapshot): The latest snapshot, replaced as a whole on every sample.
+            version (int): Goes up by one every time a snapshot with different values is published.
+        """
+        self.drone = drone
+        self.rate_hz = rate_hz
+        self.stale_after = stale_after
+        self.tracer = tracer
+        self.clock = clock
+        self.snapshot = EMPTY_SNAPSHOT
+        self.version = 0
+        self._state = None  # the last state packet seen
+        self._state_received = None  # when it was first seen
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=2):
+        self._stopped.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout=timeout)
+
+    def _read(self, name):
+        if name == "battery":
+            return self.drone.get_battery()
+        if name == "temperature":
+            return self.drone.get_temperature()
+        speed_x = self.drone.get_speed_x()
+        speed_y = self.drone.get_speed_y()
+        speed_z = self.drone.get_speed_z()
+        speed = math.sqrt(speed_x**2 + speed_y**2 + speed_z**2)  #Calculate magnitude
+        return round(speed, 2)
+
+    def _received(self, now):
+        """Returns when the state the getters read from arrived, None if no state packet arrived yet."""
+        get_state = getattr(self.drone, "get_current_state", None)
+        if get_state is None:
+            return now
+        state = get_state()
+        if not state:
+            return None
+        if state is not self._state:
+            self._state, self._state_received = state, now
+        return self._state_received
+
+    def sample(self):
+        """Reads every value once and publishes a new snapshot. Called by the poller thread."""
+        previous = self.snapshot
+        now = self.clock()
+        received = self._received(now)
+        readings = {}
+        stale = set()
+        for name in ("battery", "temperature", "speed"):
+            try:
+                if received is None:
+                    raise LookupError("no state packet yet")
+                readings[name] = TelemetryReading(self._read(name), received)
+            except Exception:
+                # Keep the last good value so the HUD can decide what to show
+                readings[name] = getattr(previous, name)
+            updated = readings[name].updated
+            if updated is None or now - updated > self.stale_after:
+                stale.add(name)
+
+        snapshot = TelemetrySnapshot(readings["battery"], readings["temperature"], readings["speed"], now, frozenset(stale))
+        changed = any(getattr(snapshot, name).value != getattr(previous, name).value for name in ("battery", "temperature", "speed"))
+        if changed or snapshot.stale != previous.stale:
+            self.version += 1
+        self.snapshot = snapshot
+        if self.tracer is not None:
+            self.tracer.counter("telemetry", "telemetry", **{name: getattr(snapshot, name).value for name in ("battery", "temperature", "speed") if getattr(snapshot, name).value is not None})
+        return snapshot
+
+    def _run(self):
+        interval = 1 / self.rate_hz
+        while not self._stopped.is_set():
+            start = self.clock()
+            self.sample()
+            self._stopped.wait(max(0.0, interval - (self.clock() - start)))
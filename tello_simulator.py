@@ -0,0 +1,409 @@
+import math
+import os
+import queue
+import random
+import socket
+import threading
+import time
+from fractions import Fraction
+
+import numpy as np
+
+# Only needed for the video stream, the simulator still answers commands without it
+try:
+    import av
+except ImportError:
+    av = None
+
+# Port the simulator answers commands on. djitellopy binds 8889 on every interface for its replies,
+# so the simulator can not use the real drone's port on the same machine.
+SIM_CONTROL_PORT = 9889
+STATE_PORT = 8890
+VIDEO_PORT = 11111
+VIDEO_PACKET_SIZE = 1460
+
+
+class TelloSimulator:
+
+    def __init__(self, host="127.0.0.1", control_port=SIM_CONTROL_PORT, state_port=STATE_PORT, video_port=VIDEO_PORT,
+                 latency=0.05, jitter=0.02, flight_speed=None, error_rate=0.0, state_hz=10,
+                 video=True, video_size=(960, 720), fps=30, seed=None):
+        """
+        Stands in for a Tello on this machine. It speaks the SDK's text protocol over UDP, sends the
+        state packets djitellopy reads the HUD values from and streams a synthetic H.264 video, so the
+        flight screen can run and be load tested without a drone. Point a Tello at it with create_tello.
+
+        Parameters:
+            host (str): Address the simulator listens on and sends state and video to.
+            control_port (int): Port commands are received on.
+            state_port (int): Port the state packets are sent to.
+            video_port (int): Port the video stream is sent to.
+            latency (float): Seconds before a command is acknowledged.
+            jitter (float): Up to this many seconds are randomly added to or taken from latency.
+            flight_speed (float): If set, moves take distance / flight_speed seconds like on the drone (cm/s).
+            error_rate (float): Share of control commands answered with "error".
+            state_hz (float): State packets per second.
+            video (bool): Stream video after "streamon", needs PyAV.
+            video_size (tuple): Size of the video frames.
+            fps (int): Video frames per second.
+            seed (int): Seed for the jitter and error randomness.
+        """
+        self.host = host
+        self.control_port = control_port
+        self.state_port = state_port
+        self.video_port = video_port
+        self.latency = latency
+        self.jitter = jitter
+        self.flight_speed = flight_speed
+        self.error_rate = error_rate
+        self.state_hz = state_hz
+        self.video = video
+        self.video_size = video_size
+        self.fps = fps
+        self.random = random.Random(seed)
+
+        # Simulated drone
+        self.position = [0.0, 0.0, 0.0]  # cm, x forward at start, y left, z up
+        self.yaw = 0.0
+        self.velocity = (0.0, 0.0, 0.0)
+        self.speed = 100
+        self.battery = 100.0
+        self.flying = False
+        self.started = time.monotonic()
+
+        self.commands = 0
+        self.errors = 0
+        self.ack_seconds = 0.0
+        self.frames_sent = 0
+        self.video_bytes = 0
+
+        self._socket = None
+        self._running = threading.Event()
+        self._streaming = threading.Event()
+        self._interrupt = threading.Event()  # set by "stop" and "emergency", ends the move in progress
+        self._flight_commands = queue.Queue()
+        self._threads = []
+
+    def start(self):
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.bind((self.host, self.control_port))
+        self._socket.settimeout(0.2)
+        self._running.set()
+        for target in (self._serve_commands, self._fly_commands, self._send_state, self._send_video):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        print(f"Tello simulator listening on {self.host}:{self.control_port}")
+        return self
+
+    def stop(self, timeout=2):
+        self._running.clear()
+        self._streaming.clear()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _serve_commands(self):
+        while self._running.is_set():
+            try:
+                data, sender = self._socket.recvfrom(1024)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            command = data.decode("utf-8", errors="replace").strip()
+            name = command.split()[0] if command else ""
+            # Like the drone, reads, rc and the stops are taken while a move is still flying
+            if name in ("stop", "emergency", "rc") or name.endswith("?"):
+                self._answer(command, sender)
+            else:
+                self._flight_commands.put((command, sender))
+
+    def _fly_commands(self):
+        while self._running.is_set():
+            try:
+                command, sender = self._flight_commands.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            self._interrupt.clear()
+            self._answer(command, sender)
+
+    def _answer(self, command, sender):
+        start = time.monotonic()
+        reply = self.handle(command)
+        if reply is None:
+            return  # rc commands are not answered
+        delay = max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+        time.sleep(delay)
+        try:
+            self._socket.sendto(reply.encode("utf-8"), sender)
+        except (OSError, AttributeError):
+            return  # stopped
+        self.ack_seconds += time.monotonic() - start
+
+    def handle(self, command):
+        """Runs one SDK command against the simulated drone and returns the reply text, None for no reply."""
+        self.commands += 1
+        if not command:
+            return "error"
+        name, *args = command.split()
+        values = [float(a) for a in args if _is_number(a)]
+
+        # Read commands
+        if name.endswith("?"):
+            return self._read(name[:-1])
+        if name == "rc":
+            return None
+        if self.error_rate and self.random.random() < self.error_rate:
+            self.errors += 1
+            return "error"
+
+        if name in ("command", "keepalive", "motoron", "motoroff", "wifi", "ap", "mon", "moff", "mdirection", "setfps", "setbitrate", "setresolution"):
+            return "ok"
+        if name == "takeoff":
+            self._fly((0, 0, 80), 80)
+            self.flying = True
+            return "ok"
+        if name == "stop":
+            self._interrupt.set()  # hover where the drone is
+            return "ok"
+        if name in ("land", "emergency"):
+            if name == "emergency":
+                self._interrupt.set()
+            self._fly((0, 0, -self.position[2]), self.position[2] if name == "land" else 0)
+            self.flying = False
+            return "ok"
+        if name == "streamon":
+            self._streaming.set()
+            return "ok"
+        if name == "streamoff":
+            self._streaming.clear()
+            return "ok"
+        if name == "speed" and values:
+            self.speed = values[0]
+            return "ok"
+
+        if not self.flying:
+            return "error Not joystick"
+        moves = {"forward": (1, 0, 0), "back": (-1, 0, 0), "left": (0, 1, 0), "right": (0, -1, 0), "up": (0, 0, 1), "down": (0, 0, -1)}
+        if name in moves and values:
+            distance = values[0]
+            self._fly(self._to_world(tuple(distance * v for v in moves[name])), distance)
+            return "ok"
+        if name in ("cw", "ccw") and values:
+            self._turn(values[0] if name == "ccw" else -values[0])
+            return "ok"
+        if name == "go" and len(values) >= 4:
+            vector = tuple(values[:3])
+            self._fly(self._to_world(vector), math.dist((0, 0, 0), vector), values[3])
+            return "ok"
+        if name == "curve" and len(values) >= 7:
+            first, end = tuple(values[:3]), tuple(values[3:6])
+            length = math.dist((0, 0, 0), first) + math.dist(first, end)
+            self._fly(self._to_world(end), length, values[6])
+            return "ok"
+        return "error"
+
+    def _read(self, name):
+        if name == "battery":
+            return str(int(self.battery))
+        if name == "speed":
+            return str(int(self.speed))
+        if name == "time":
+            return f"{int(time.monotonic() - self.started)}s"
+        if name == "temp":
+            return "60~62C"
+        if name == "height":
+            return f"{int(self.position[2])}dm"
+        if name in ("wifi", "sdk", "sn"):
+            return {"wifi": "90", "sdk": "20", "sn": "0TQSIMULATOR"}[name]
+        return "error"
+
+    def _to_world(self, vector):
+        heading = math.radians(self.yaw)
+        x, y, z = vector
+        return (x * math.cos(heading) - y * math.sin(heading), x * math.sin(heading) + y * math.cos(heading), z)
+
+    def _fly(self, offset, distance, speed=None):
+        duration = distance / (speed or self.flight_speed) if self.flight_speed and distance else 0.0
+        share = 1.0
+        if duration:
+            self.velocity = tuple(v / duration for v in offset)
+            share = self._wait_interruptible(duration)
+            self.velocity = (0.0, 0.0, 0.0)
+        self.position = [p + o * share for p, o in zip(self.position, offset)]
+        self.battery = max(0.0, self.battery - 0.002 * distance * share)
+
+    def _turn(self, degrees):
+        share = self._wait_interruptible(abs(degrees) / 90) if self.flight_speed else 1.0
+        self.yaw = (self.yaw + degrees * share + 180) % 360 - 180
+
+    def _wait_interruptible(self, duration):
+        """Waits out a move, returns the share of it that was flown before a stop cut it short."""
+        start = time.monotonic()
+        if self._interrupt.wait(duration):
+            return min(1.0, (time.monotonic() - start) / duration)
+        return 1.0
+
+    def state_text(self):
+        """Returns one state packet in the format the Tello sends."""
+        vgx, vgy, vgz = (round(v / 10) for v in self.velocity)  # dm/s like the drone
+        flight_time = int(time.monotonic() - self.started) if self.flying else 0
+        return (f"mid:-1;x:-100;y:-100;z:-100;mpry:0,0,0;pitch:0;roll:0;yaw:{int(self.yaw)};"
+                f"vgx:{vgx};vgy:{vgy};vgz:{vgz};templ:60;temph:62;tof:{int(self.position[2]) + 10};h:{int(self.position[2])};"
+                f"bat:{int(self.battery)};baro:0.00;time:{flight_time};agx:0.00;agy:0.00;agz:-1000.00;\r\n")
+
+    def _send_state(self):
+        sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sender.bind((self.host, 0))
+        interval = 1 / self.state_hz
+        while self._running.is_set():
+            try:
+                sender.sendto(self.state_text().encode("ascii"), (self.host, self.state_port))
+            except OSError:
+                pass
+            time.sleep(interval)
+        sender.close()
+
+    def synthetic_frame(self, index):
+        """Returns an RGB test frame that changes every frame, with the simulated heading drawn as a bar."""
+        width, height = self.video_size
+        frame = np.empty((height, width, 3), dtype=np.uint8)
+        frame[:, :, 0] = (np.arange(width, dtype=np.uint16)[None, :] + index * 4) % 256
+        frame[:, :, 1] = (np.arange(height, dtype=np.uint16)[:, None] // 3) % 256
+        frame[:, :, 2] = int(self.battery * 2.55)
+        bar = int((self.yaw + 180) / 360 * (width - 20))
+        frame[height // 2 - 10:height // 2 + 10, bar:bar + 20] = 255
+        return frame
+
+    def _open_encoder(self):
+        codec = av.CodecContext.create("libx264", "w")
+        codec.width, codec.height = self.video_size
+        codec.pix_fmt = "yuv420p"
+        codec.time_base = Fraction(1, self.fps)
+        codec.framerate = Fraction(self.fps, 1)
+        codec.gop_size = self.fps  # a key frame every second so a late reader can start decoding
+        codec.options = {"preset": "ultrafast", "tune": "zerolatency"}
+        return codec
+
+    def _send_video(self):
+        if not self.video:
+            return
+        if av is None:
+            print("Tello simulator: PyAV is not installed, no video stream")
+            return
+        sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sender.bind((self.host, 0))
+        interval = 1 / self.fps
+        index = 0
+        encoder = None
+        while self._running.is_set():
+            if not self._streaming.wait(0.2):
+                encoder = None  # start with a fresh key frame on the next streamon
+                continue
+            if encoder is None:
+                encoder = self._open_encoder()
+            start = time.monotonic()
+            frame = av.VideoFrame.from_ndarray(self.synthetic_frame(index), format="rgb24")
+            frame.pts = index
+            index += 1
+            for packet in encoder.encode(frame):
+                data = bytes(packet)
+                # The Tello sends the raw H.264 stream split into datagrams
+                for offset in range(0, len(data), VIDEO_PACKET_SIZE):
+                    try:
+                        sender.sendto(data[offset:offset + VIDEO_PACKET_SIZE], (self.host, self.video_port))
+                    except OSError:
+                        pass
+                self.video_bytes += len(data)
+            self.frames_sent += 1
+            time.sleep(max(0.0, interval - (time.monotonic() - start)))
+        sender.close()
+
+    def stats(self):
+        return {
+            "commands": self.commands,
+            "errors": self.errors,
+            "mean_ack_seconds": self.ack_seconds / self.commands if self.commands else 0.0,
+            "frames_sent": self.frames_sent,
+            "video_bytes": self.video_bytes,
+            "position": [round(p) for p in self.position],
+            "yaw": round(self.yaw),
+            "battery": round(self.battery, 1),
+        }
+
+
+def _is_number(text):
+    try:
+        float(text)
+        return True
+    except ValueError:
+        return False
+
+
+# Simulator started by create_tello, kept so it is only started once per process
+_simulator = None
+
+
+def create_tello():
+    """
+    Returns the Tello the flight screens use. Normally that is the real drone, but when the
+    DRONEBLOCKS_SIMULATOR environment variable is set the Tello talks to a TelloSimulator instead:
+    "1" starts one inside this process, "host:port" uses one that is already running
+    (python tello_simulator.py). The simulator has to send to the same machine, djitellopy
+    listens for state and video on fixed local ports.
+    """
+    from djitellopy import Tello
+
+    setting = os.environ.get("DRONEBLOCKS_SIMULATOR")
+    if not setting:
+        return Tello()
+
+    global _simulator
+    if ":" in setting:
+        host, port = setting.rsplit(":", 1)
+        address = (host, int(port))
+    else:
+        if _simulator is None:
+            _simulator = TelloSimulator().start()
+        address = (_simulator.host, _simulator.control_port)
+
+    # djitellopy matches replies to drones by IP, so the host is given here and only the port is changed after
+    tello = Tello(host=address[0])
+    tello.address = address
+    return tello
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Local Tello SDK simulator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=SIM_CONTROL_PORT)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--flight-speed", type=float, default=None, help="cm/s, moves take real time when set")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--no-video", action="store_true")
+    parser.add_argument("--fps", type=int, default=30)
+    args = parser.parse_args()
+
+    simulator = TelloSimulator(host=args.host, control_port=args.port, latency=args.latency, jitter=args.jitter,
+                               flight_speed=args.flight_speed, error_rate=args.error_rate,
+                               video=not args.no_video, fps=args.fps).start()
+    print(f"Set DRONEBLOCKS_SIMULATOR={args.host}:{args.port} to fly against it")
+    try:
+        while True:
+            time.sleep(5)
+            print(simulator.stats())
+    except KeyboardInterrupt:
+        simulator.stop()
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The modules live at the top of the project, not in a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# No window or sound card needed for surfaces and fonts
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
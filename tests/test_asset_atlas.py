@@ -0,0 +1,106 @@
+import os
+
+import pygame
+import pytest
+
+from asset_atlas import ROOT, AssetStore, _key, build_atlas
+
+
+def save_image(path, colour, size=(8, 6)):
+    image = pygame.Surface(size, pygame.SRCALPHA)
+    image.fill(colour)
+    pygame.image.save(image, str(path))
+    return str(path)
+
+
+@pytest.fixture
+def display():
+    pygame.display.init()
+    pygame.display.set_mode((16, 16))
+    yield
+    pygame.display.quit()
+
+
+@pytest.fixture
+def bundle(tmp_path, display):
+    red = save_image(tmp_path / "red.png", (255, 0, 0, 255))
+    blue = save_image(tmp_path / "blue.png", (0, 0, 255, 128))
+    manifest = [(red, (4, 3), True), (blue, None, False)]
+    atlas_path, index_path = str(tmp_path / "atlas.rgba"), str(tmp_path / "atlas.json")
+    return red, blue, manifest, atlas_path, index_path
+
+
+def test_keys_are_relative_to_the_project():
+    absolute = os.path.join(ROOT, "icons", "takeoff.png")
+    assert _key("icons/takeoff.png", (90, 90), True) == "icons/takeoff.png|90x90|smooth"
+    assert _key(absolute, (90, 90), True) == _key("icons/takeoff.png", (90, 90), True)
+    assert _key("icons/takeoff.png", None, False) == "icons/takeoff.png|native|fast"
+
+
+def test_images_come_from_the_atlas(bundle):
+    red, blue, manifest, atlas_path, index_path = bundle
+    build_atlas(manifest, atlas_path, index_path)
+    store = AssetStore(atlas_path, index_path, manifest)
+    store.read([red, blue])
+
+    small_red = store.image(red, (4, 3))
+    assert small_red.get_size() == (4, 3)
+    assert small_red.get_at((1, 1)) == (255, 0, 0, 255)
+    assert store.image(blue, smooth=False).get_at((0, 0)) == (0, 0, 255, 128)
+    assert store.image(red, (4, 3)) is small_red
+    assert store.stats() == {"atlas": True, "atlas_hits": 2, "file_loads": 0}
+
+
+def test_an_out_of_date_atlas_is_rebuilt_on_first_use(bundle):
+    red, blue, manifest, atlas_path, index_path = bundle
+    build_atlas(manifest, atlas_path, index_path)
+    save_image(red, (0, 255, 0, 255))
+
+    store = AssetStore(atlas_path, index_path, manifest)
+    assert store.image(red, (4, 3)).get_at((0, 0)) == (0, 255, 0, 255)
+    assert store.stats() == {"atlas": True, "atlas_hits": 1, "file_loads": 0}
+
+    # The next start reads the rebuilt atlas
+    assert AssetStore(atlas_path, index_path, manifest).image(red, (4, 3)).get_at((0, 0)) == (0, 255, 0, 255)
+
+
+def test_an_out_of_date_atlas_falls_back_to_the_files_without_a_display(bundle):
+    red, blue, manifest, atlas_path, index_path = bundle
+    build_atlas(manifest, atlas_path, index_path)
+    save_image(red, (0, 255, 0, 255))
+    pygame.display.quit()
+
+    store = AssetStore(atlas_path, index_path, manifest)
+    assert store.image(red, (4, 3)).get_at((0, 0)) == (0, 255, 0, 255)
+    assert store.stats() == {"atlas": False, "atlas_hits": 0, "file_loads": 1}
+
+
+def test_a_missing_atlas_is_built_on_first_use(bundle):
+    red, blue, manifest, atlas_path, index_path = bundle
+    store = AssetStore(atlas_path, index_path, manifest)
+    store.read([red, blue])  # on a worker this finds no atlas and reads the files
+
+    assert store.image(blue, smooth=False).get_at((0, 0)) == (0, 0, 255, 128)
+    assert os.path.exists(atlas_path) and os.path.exists(index_path)
+    assert store.stats() == {"atlas": True, "atlas_hits": 1, "file_loads": 0}
+
+
+def test_a_failed_build_falls_back_to_the_files(bundle, tmp_path):
+    red, blue, manifest, atlas_path, index_path = bundle
+    store = AssetStore(atlas_path, index_path, manifest + [(str(tmp_path / "missing.png"), None, True)])
+    assert store.image(red, (4, 3)).get_at((0, 0)) == (255, 0, 0, 255)
+    assert store.stats() == {"atlas": False, "atlas_hits": 0, "file_loads": 1}
+
+
+def test_read_keeps_files_that_are_not_in_the_atlas(bundle, tmp_path):
+    red, blue, manifest, atlas_path, index_path = bundle
+    build_atlas(manifest, atlas_path, index_path)
+    green = save_image(tmp_path / "green.png", (0, 255, 0, 255))
+    store = AssetStore(atlas_path, index_path, manifest)
+    store.read([red, green])
+    os.remove(green)
+
+    assert store.image(green).get_at((0, 0)) == (0, 255, 0, 255)
+    assert store.stats() == {"atlas": True, "atlas_hits": 0, "file_loads": 1}
+    with pytest.raises(FileNotFoundError):
+        store.image(str(tmp_path / "missing.png"))
@@ -0,0 +1,157 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from async_executor import CommandExecutor
+from telemetry import TelemetryReading
+
+
+class StubDrone:
+    """Records which thread made each call. A move in the air ends early once "stop" arrives."""
+
+    def __init__(self):
+        self.calls = []
+        self.responses = []
+        self.stopped = threading.Event()
+        self.telemetry = None
+        self.is_flying = False
+
+    def _record(self, name):
+        self.calls.append((name, threading.current_thread().name))
+
+    def fly(self, seconds):
+        self._record(f"fly {seconds}")
+        self.stopped.wait(seconds)
+
+    def send_command_without_return(self, command):
+        self._record(command)
+        if command == "stop":
+            self.stopped.set()
+            if self.telemetry is not None:
+                self.telemetry.snapshot = SimpleNamespace(speed=TelemetryReading(0, time.monotonic()))
+
+    def get_own_udp_object(self):
+        return {"responses": self.responses}
+
+    def takeoff(self, seconds):
+        self._record("takeoff")
+        time.sleep(seconds)  # djitellopy only marks the drone flying once the reply arrives
+        self.is_flying = True
+
+    def land(self):
+        self._record("land")
+        self.is_flying = False
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def drone():
+    return StubDrone()
+
+
+@pytest.fixture
+def executor(drone):
+    executor = CommandExecutor(drone).start()
+    yield executor
+    executor.shutdown()
+
+
+def test_plan_is_flown_in_order_on_the_link_thread(drone, executor):
+    done = []
+    program = executor.run_plan([0.01, 0.02], drone.fly, lambda segment, seconds: done.append(segment))
+    assert program.result(timeout=5) is True
+    assert done == [0.01, 0.02]
+    assert all(thread.startswith("drone-link") for _, thread in drone.calls)
+
+
+def test_only_one_program_at_a_time(drone, executor):
+    executor.run_plan([1], drone.fly)
+    wait_for(lambda: drone.calls)
+    with pytest.raises(RuntimeError):
+        executor.run_plan([1], drone.fly)
+    executor.emergency_stop().result(timeout=5)
+
+
+def test_emergency_stop_halts_the_move_and_lands_after_it(drone, executor):
+    program = executor.run_plan([5, 5], drone.fly)
+    wait_for(lambda: drone.calls)
+    record = executor.emergency_stop().result(timeout=5)
+
+    assert program.cancelled()
+    names = [name for name, _ in drone.calls]
+    assert names == ["fly 5", "stop", "land"]  # the second segment is never flown
+    threads = dict((name, thread) for name, thread in drone.calls)
+    assert threads["stop"].startswith("drone-estop")
+    assert threads["land"].startswith("drone-link")  # nobody else waits for replies
+    assert record["reason"] == "stop button"
+    assert record["stop_sent_seconds"] < 1
+    assert record["preempt_seconds"] == record["land_seconds"]  # no telemetry to see the drone stop
+    assert executor.stop_stats()["stops"] == 1
+
+
+def test_preempt_is_measured_until_telemetry_shows_zero_velocity(drone):
+    telemetry = SimpleNamespace(snapshot=SimpleNamespace(speed=TelemetryReading(30, time.monotonic())))
+    drone.telemetry = telemetry
+    executor = CommandExecutor(drone, telemetry=telemetry).start()
+    try:
+        executor.run_plan([5], drone.fly)
+        wait_for(lambda: drone.calls)
+        record = executor.emergency_stop().result(timeout=5)
+    finally:
+        executor.shutdown()
+    assert record["preempt_seconds"] < record["land_seconds"]
+
+
+def test_a_command_past_its_timeout_triggers_the_stop(drone, executor):
+    program = executor.run_plan([5], drone.fly, timeout_for=lambda segment: 0.05)
+    assert program.result(timeout=5) is False
+    wait_for(lambda: executor.stops)
+    assert executor.stops[0]["reason"] == "timeout"
+    assert [name for name, _ in drone.calls] == ["fly 5", "stop", "land"]
+
+
+def test_a_failing_command_triggers_the_stop(drone, executor):
+    def fail(segment):
+        raise OSError("error Not joystick")
+
+    assert executor.run_plan([1], fail).result(timeout=5) is False
+    wait_for(lambda: executor.stops)
+    assert executor.stops[0]["reason"] == "error"
+
+
+def test_late_replies_are_dropped_until_the_link_is_quiet(drone, executor):
+    drone.responses.append(b"ok")
+    threading.Timer(0.05, drone.responses.append, args=(b"ok",)).start()
+    start = time.monotonic()
+    executor._drop_replies(quiet=0.1, limit=1.0)
+    assert drone.responses == []
+    assert time.monotonic() - start >= 0.15
+
+
+def test_shutdown_lands_a_flying_drone(drone):
+    drone.is_flying = True
+    CommandExecutor(drone).start().shutdown()
+    assert [name for name, _ in drone.calls] == ["stop", "land"]
+    assert not drone.is_flying
+
+
+def test_shutdown_during_takeoff_lands_once_the_drone_is_up(drone):
+    executor = CommandExecutor(drone).start()
+    executor.run_plan([0.2], drone.takeoff)
+    wait_for(lambda: drone.calls)
+    executor.shutdown()
+    assert [name for name, _ in drone.calls] == ["takeoff", "stop", "land"]
+    assert not drone.is_flying
+
+
+def test_shutdown_leaves_a_landed_drone_alone(drone):
+    CommandExecutor(drone).start().shutdown()
+    assert drone.calls == []
@@ -0,0 +1,80 @@
+from types import SimpleNamespace
+
+import pytest
+
+import drone_session
+from drone_session import SOUNDS, DroneSession
+
+
+class FakeTello:
+
+    def __init__(self):
+        self.connects = 0
+        self.streams = 0
+
+    def connect(self):
+        self.connects += 1
+
+    def streamon(self):
+        self.streams += 1
+
+    def get_frame_read(self):
+        return "frame reader"
+
+
+class FakeTelemetry:
+
+    def __init__(self, tello, rate_hz):
+        self.snapshot = SimpleNamespace(stale=set())
+
+    def start(self):
+        return self
+
+    def stop(self):
+        pass
+
+
+@pytest.fixture
+def session(monkeypatch):
+    tellos = []
+    monkeypatch.setattr(drone_session, "create_tello", lambda: tellos.append(FakeTello()) or tellos[-1])
+    monkeypatch.setattr(drone_session, "TelemetryPoller", FakeTelemetry)
+    session = DroneSession()
+    # Only the link is under test, the sounds and images count as loaded
+    session.sounds = dict.fromkeys(SOUNDS)
+    session.images = {"background": None}
+    session.tellos = tellos
+    yield session
+    session.startup.shutdown()
+
+
+def start(session):
+    startup = session.start()
+    assert startup.wait(timeout=5)
+    session.wait(*startup.tasks)
+    return startup
+
+
+def test_the_first_flight_connects(session):
+    assert session.link_lost
+    assert set(start(session).tasks) == {"connect", "telemetry", "stream"}
+    assert session.frame_read == "frame reader"
+    assert not session.link_lost
+    assert session.connects == 1
+
+
+def test_a_second_flight_reuses_the_link(session):
+    start(session)
+    assert "connect" not in start(session).tasks
+    assert session.connects == 1
+    assert session.tellos[0].streams == 1
+
+
+def test_a_lost_link_is_made_again(session):
+    start(session)
+    session.telemetry.snapshot.stale = {"battery"}  # the state packets stopped
+    assert session.link_lost
+    assert "connect" in start(session).tasks
+    assert session.connects == 2
+    assert len(session.tellos) == 1  # the same drone object connects again
+    assert session.tellos[0].connects == 2
@@ -0,0 +1,63 @@
+import os
+import subprocess
+import sys
+import types
+
+from flight_loader import FlightLoader, StartupTimer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_editor_import_leaves_the_flight_screen_out():
+    environment = dict(os.environ, SDL_VIDEODRIVER="dummy", PYGAME_HIDE_SUPPORT_PROMPT="1")
+    check = "import sys, programming_interface; print(sorted({'cv2', 'av', 'djitellopy', 'user_interface'} & set(sys.modules)))"
+    result = subprocess.run([sys.executable, "-c", check], capture_output=True, text=True, env=environment, cwd=ROOT)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "[]"
+
+
+def test_load_imports_once_and_times_each_module(monkeypatch):
+    def run_user_interface(commands):
+        pass
+
+    imported = []
+    monkeypatch.setattr("flight_loader.FLIGHT_MODULES", ("json", "user_interface"))
+    monkeypatch.delitem(sys.modules, "json", raising=False)
+    monkeypatch.setitem(sys.modules, "user_interface", types.SimpleNamespace(run_user_interface=run_user_interface))
+    monkeypatch.setattr("flight_loader.importlib.import_module", lambda name: imported.append(name) or __import__(name))
+
+    timer = StartupTimer()
+    loader = FlightLoader(timer)
+    assert not loader.loaded
+    assert loader.load() is run_user_interface
+    assert loader.load() is run_user_interface
+    assert imported == ["json"]
+    assert set(timer.imports) == {"json"}
+
+
+def test_warm_loads_in_the_background(monkeypatch):
+    def run_user_interface(commands):
+        pass
+
+    monkeypatch.setattr("flight_loader.FLIGHT_MODULES", ("user_interface",))
+    monkeypatch.setitem(sys.modules, "user_interface", types.SimpleNamespace(run_user_interface=run_user_interface))
+    loader = FlightLoader()
+    loader.warm()
+    loader._thread.join(timeout=5)
+    assert loader.loaded
+    assert loader.load() is run_user_interface
+
+
+def test_missing_optional_modules_are_skipped(monkeypatch):
+    monkeypatch.setattr("flight_loader.FLIGHT_MODULES", ("no_such_module_here", "user_interface"))
+    monkeypatch.setitem(sys.modules, "user_interface", types.SimpleNamespace(run_user_interface=print))
+    assert FlightLoader().load() is print
+
+
+def test_timer_keeps_the_first_mark():
+    timer = StartupTimer()
+    timer.mark("window")
+    first = timer.marks["window"]
+    timer.mark("window")
+    assert timer.marks["window"] == first
+    assert set(timer.report()) == {"marks_ms", "imports_ms"}
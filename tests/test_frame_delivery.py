@@ -0,0 +1,96 @@
+import threading
+import time
+
+from frame_delivery import FramePump, FrameSlot, FrameSubscriber
+
+
+def test_slot_keeps_only_the_latest_frame():
+    slot = FrameSlot()
+    assert slot.latest() == (0, None)
+    assert slot.publish("a") == 1
+    assert slot.publish("b") == 2
+    assert slot.latest() == (2, "b")
+
+
+def test_subscriber_counts_frames_replaced_before_it_got_to_them():
+    slot = FrameSlot()
+    frames = FrameSubscriber(slot)
+    assert frames.poll() is None
+
+    slot.publish("a")
+    assert frames.poll() == "a"
+    assert frames.poll() is None  # never the same frame twice
+
+    for frame in "bcd":
+        slot.publish(frame)
+    assert frames.poll() == "d"
+    assert frames.stats() == {"delivered": 2, "dropped": 2}
+
+
+def test_every_subscriber_sees_each_frame_once():
+    slot = FrameSlot()
+    first, second = FrameSubscriber(slot), FrameSubscriber(slot)
+    slot.publish("a")
+    assert first.poll() == "a"
+    assert second.poll() == "a"
+    assert first.poll() is None
+
+
+def test_wait_wakes_on_a_new_frame_from_another_thread():
+    slot = FrameSlot()
+    frames = FrameSubscriber(slot)
+    threading.Timer(0.05, slot.publish, args=("a",)).start()
+    start = time.monotonic()
+    assert frames.wait(timeout=2) == "a"
+    assert time.monotonic() - start < 1
+
+
+def test_wait_times_out_and_close_wakes_waiters():
+    slot = FrameSlot()
+    frames = FrameSubscriber(slot)
+    assert frames.wait(timeout=0.01) is None
+
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(frames.wait()))
+    waiter.start()
+    time.sleep(0.05)
+    slot.close()
+    waiter.join(timeout=2)
+    assert results == [None]
+
+
+def test_pump_publishes_only_new_source_frames():
+    source = {"frame": None}
+    slot = FrameSlot()
+    pump = FramePump(lambda: source["frame"], slot, poll_interval=0.001).start()
+    frames = FrameSubscriber(slot)
+    try:
+        source["frame"] = object()
+        first = frames.wait(timeout=2)
+        assert first is source["frame"]
+        time.sleep(0.02)  # the same frame is polled again and skipped
+        assert frames.poll() is None
+
+        source["frame"] = object()
+        assert frames.wait(timeout=2) is source["frame"]
+    finally:
+        pump.stop()
+    assert pump.published == 2
+    assert pump.duplicates > 0
+
+
+def test_pump_survives_a_failing_source():
+    calls = []
+
+    def get_frame():
+        calls.append(1)
+        if len(calls) == 1:
+            raise OSError("no stream yet")
+        return "frame"
+
+    slot = FrameSlot()
+    pump = FramePump(get_frame, slot, poll_interval=0.001).start()
+    try:
+        assert FrameSubscriber(slot).wait(timeout=2) == "frame"
+    finally:
+        pump.stop()
@@ -0,0 +1,57 @@
+import pytest
+
+from kinematic_sim import SimulatedDrone, VirtualClock, dry_run
+
+
+def test_a_simple_program_flies_and_lands_where_expected():
+    result = dry_run(["takeoff", "fly_forward", "land"])
+    assert result["final_position"] == [95, 0, 0]
+    assert result["warnings"] == []
+    assert result["seconds"] == pytest.approx(6 + 1 + 95 / 70 + 4, abs=0.01)
+    assert result["battery_used"] > 0
+    assert [entry[1] for entry in result["log"]] == ["takeoff", "forward 95", "land"]
+
+
+def test_moves_follow_the_heading():
+    result = dry_run(["takeoff", "rotate_left", "rotate_left", "fly_forward", "land"])
+    assert result["final_yaw"] == 90
+    assert result["final_position"] == [0, 95, 0]
+
+
+def test_compiled_reaches_the_same_point_sooner():
+    program = ["takeoff", "fly_forward", "fly_left", "land"]
+    primitive = dry_run(program, "primitive")
+    compiled = dry_run(program, "compiled")
+    assert compiled["final_position"] == primitive["final_position"] == [95, 95, 0]
+    assert compiled["seconds"] < primitive["seconds"]
+    assert any(entry[1].startswith("curve") for entry in compiled["log"])
+
+
+def test_unoptimized_runs_one_call_per_block():
+    program = ["takeoff", "fly_forward", "fly_forward", "land"]
+    assert len(dry_run(program, optimize_program=False)["log"]) == 4
+    assert len(dry_run(program)["log"]) == 3
+
+
+def test_problems_are_collected_as_warnings():
+    assert dry_run(["takeoff", "fly_forward"])["warnings"] == ["program ends with the drone still in the air"]
+    assert dry_run(["fly_forward", "land"])["warnings"] == [
+        "forward 95: the drone has not taken off",
+        "land: the drone has not taken off",
+    ]
+    below = dry_run(["takeoff", "fly_down", "land"])["warnings"]
+    assert below == ["down 95: would fly 15 cm into the ground"]
+
+
+def test_the_battery_runs_out():
+    drone = SimulatedDrone(battery=0.5)
+    drone.takeoff()
+    assert drone.battery == 0.0
+    assert drone.warnings == ["takeoff: battery empty at 6.0s"]
+
+
+def test_virtual_clock_fast_forwards():
+    clock = VirtualClock()
+    clock.sleep(3600)
+    clock.sleep(-1)
+    assert clock.now() == 3600
@@ -0,0 +1,85 @@
+from program_model import ProgramModel
+
+
+def test_insert_appends_and_keeps_ids_stable():
+    program = ProgramModel(["takeoff", "land"])
+    forward = program.insert("fly_forward", 1)
+    first = program.insert("hover", 0)
+
+    assert program.export() == ["hover", "takeoff", "fly_forward", "land"]
+    assert program.index_of(first) == 0
+    assert program.index_of(forward) == 2
+    assert program.id_at(2) == forward
+    assert program.action_of(forward) == "fly_forward"
+
+
+def test_insert_clamps_the_index():
+    program = ProgramModel(["takeoff"])
+    program.insert("land", 99)
+    program.insert("hover", -5)
+    assert program.export() == ["hover", "takeoff", "land"]
+
+
+def test_delete_reindexes_the_entries_after_it():
+    program = ProgramModel()
+    ids = [program.insert(action) for action in ("takeoff", "fly_up", "fly_down", "land")]
+
+    assert program.delete(ids[1]) == "fly_up"
+    assert program.export() == ["takeoff", "fly_down", "land"]
+    assert [program.index_of(entry_id) for entry_id in (ids[0], ids[2], ids[3])] == [0, 1, 2]
+    assert program.counts["fly_up"] == 0
+    assert len(program) == 3
+
+
+def test_move_in_both_directions():
+    program = ProgramModel()
+    ids = [program.insert(action) for action in ("a", "b", "c", "d")]
+
+    program.move(ids[0], 2)
+    assert program.export() == ["b", "c", "a", "d"]
+    program.move(ids[3], 0)
+    assert program.export() == ["d", "b", "c", "a"]
+    program.move(ids[2], 10)
+    assert program.export() == ["d", "b", "a", "c"]
+    assert [program.index_of(entry_id) for entry_id in ids] == [2, 1, 3, 0]
+
+
+def test_counts_follow_every_change():
+    program = ProgramModel(["takeoff", "fly_forward", "fly_forward", "land"])
+    assert program.counts["fly_forward"] == 2
+    assert program.has_takeoff and program.has_land
+
+    program.delete(program.id_at(0))
+    assert not program.has_takeoff
+    assert program.counts["takeoff"] == 0
+
+
+def test_check_add():
+    program = ProgramModel()
+    assert program.check_add("fly_forward") == "Need to takeoff first"
+    assert program.check_add("takeoff") is None
+
+    program.insert("takeoff")
+    assert program.check_add("takeoff") == "Already have takeoff"
+    assert program.check_add("land") is None
+
+    program.insert("land")
+    assert program.check_add("land") == "Already have land"
+
+
+def test_validate():
+    assert ProgramModel().validate() == "Program is empty"
+    assert ProgramModel(["fly_up", "land"]).validate() == "Needs to start with a takeoff block!"
+    assert ProgramModel(["takeoff", "fly_up"]).validate() == "Still needs a land block!"
+    assert ProgramModel(["takeoff", "land", "takeoff", "land"]).validate() == "Only one takeoff and one land block allowed!"
+    assert ProgramModel(["takeoff", "fly_up", "land"]).validate() is None
+
+
+def test_export_is_a_fresh_list_and_follows_changes():
+    program = ProgramModel(["takeoff", "land"])
+    exported = program.export()
+    exported.append("fly_up")
+    assert program.export() == ["takeoff", "land"]
+
+    program.insert("hover", 1)
+    assert program.export() == ["takeoff", "hover", "land"]
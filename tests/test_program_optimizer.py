@@ -0,0 +1,68 @@
+from program_optimizer import MOVE_LIMIT, ROTATE_LIMIT, Step, describe, optimize
+from take_commands import DroneFlight
+
+
+def covers_every_block(commands, steps):
+    return [index for step in steps for index in step.sources] == list(range(len(commands)))
+
+
+def test_neighbouring_moves_on_one_axis_are_merged():
+    commands = ["takeoff", "fly_forward", "fly_forward", "fly_right", "land"]
+    assert optimize(commands) == [
+        Step("takeoff", None, (0,)),
+        Step("fly_forward", 190, (1, 2)),
+        Step("fly_right", 95, (3,)),
+        Step("land", None, (4,)),
+    ]
+
+
+def test_opposite_blocks_cancel_out():
+    steps = optimize(["takeoff", "fly_up", "fly_down", "land"])
+    assert steps[1] == Step(None, 0, (1, 2))
+
+
+def test_mixed_directions_keep_the_net_move():
+    steps = optimize(["fly_left", "fly_right", "fly_right"])
+    assert steps == [Step("fly_right", 95, (0, 1, 2))]
+
+
+def test_long_runs_are_split_at_the_move_limit():
+    commands = ["takeoff"] + ["fly_forward"] * 6 + ["land"]
+    steps = optimize(commands)
+    assert steps[1] == Step("fly_forward", 475, (1, 2, 3, 4, 5))
+    assert steps[2] == Step("fly_forward", 95, (6,))
+    assert all(step.amount <= MOVE_LIMIT for step in steps if step.amount is not None)
+    assert covers_every_block(commands, steps)
+
+
+def test_rotations_are_summed_up_to_a_full_turn():
+    steps = optimize(["rotate_left"] * 9)
+    assert steps == [Step("rotate_left", ROTATE_LIMIT, tuple(range(8))), Step("rotate_left", 45, (8,))]
+
+
+def test_hovers_are_merged_and_break_move_runs():
+    steps = optimize(["fly_up", "hover", "hover", "fly_up"], hover=2)
+    assert steps == [Step("fly_up", 95, (0,)), Step("hover", 4, (1, 2)), Step("fly_up", 95, (3,))]
+
+
+def test_takeoff_and_land_are_never_merged():
+    steps = optimize(["takeoff", "takeoff", "land"])
+    assert [step.command for step in steps] == ["takeoff", "takeoff", "land"]
+
+
+def test_block_amounts_and_case():
+    steps = optimize(["Fly_Forward", "fly_forward", "Rotate_Right"], distance=30, rotate=90)
+    assert steps == [Step("fly_forward", 60, (0, 1)), Step("rotate_right", 90, (2,))]
+
+
+def test_describe_counts_only_calls_that_fly():
+    commands = ["takeoff", "fly_up", "fly_down", "land"]
+    assert describe(commands, optimize(commands)) == "Optimized program: 4 blocks -> 2 drone calls"
+
+
+def test_test_command_prints_the_amount_only_when_there_is_one(capsys):
+    flight = DroneFlight(drone=None)
+    flight.test_command("fly_forward")
+    flight.test_command("fly_forward", 190)
+    flight.test_command("rotate_left", 90)
+    assert capsys.readouterr().out == "forward\nforward 190\nccw 90\n"
@@ -0,0 +1,105 @@
+import djitellopy
+import pygame
+import pytest
+
+from programming_interface import Interface
+
+
+@pytest.fixture
+def interface(monkeypatch):
+    monkeypatch.setattr(pygame.mouse, "set_cursor", lambda *args: None)
+    interface = Interface(warm_flight=False)
+    yield interface
+    pygame.quit()
+
+
+def palette_block(interface, action):
+    return next(block for block in interface.blocks if block.action == action)
+
+
+def build(interface, count):
+    interface.place_block(palette_block(interface, "takeoff"))
+    for index in range(count - 1):
+        interface.place_block(palette_block(interface, "fly_up"), index=len(interface.used_blocks))
+
+
+def test_only_blocks_inside_the_window_are_drawn(interface):
+    build(interface, 30)
+    interface.draw()
+    visible = interface.visible_blocks()
+    assert 0 < len(visible) < 30
+    assert all(block.y + block.height > 0 and block.y < interface.SIZE[1] for block in visible)
+
+
+def test_scroll_stays_inside_the_canvas_after_blocks_are_removed(interface):
+    build(interface, 30)
+    interface.draw()
+    interface.scroll_offset = interface.command_canvas.max_offset()
+    interface.draw()
+
+    for block in list(interface.used_blocks[5:]):
+        interface.remove_block(block)
+    assert 0 <= interface.scroll_offset <= interface.command_canvas.max_offset()
+
+    interface.draw()
+    # The stack and the canvas behind it agree on the offset, the blocks stay in view
+    assert len(interface.visible_blocks()) == 5
+    assert interface.used_blocks[0].y == interface.block_bottom + interface.scroll_offset
+
+
+def test_scrolling_is_clamped_to_the_program(interface):
+    build(interface, 3)
+    interface.draw()
+    interface.handle_event(pygame.event.Event(pygame.MOUSEWHEEL, x=0, y=50))
+    assert interface.scroll_offset == interface.command_canvas.max_offset()
+    interface.handle_event(pygame.event.Event(pygame.MOUSEWHEEL, x=0, y=-100))
+    assert interface.scroll_offset == 0
+
+
+def test_hit_test_finds_placed_and_palette_blocks(interface):
+    build(interface, 3)
+    interface.draw()
+    placed = interface.used_blocks[1]
+    assert interface.hit_test(placed.surface_rectangle.center) is placed
+    takeoff = palette_block(interface, "takeoff")
+    assert interface.hit_test(takeoff.surface_rectangle.center) is takeoff
+
+
+def test_execute_numbers_the_trace_of_every_flight(interface, monkeypatch):
+    flights = []
+    monkeypatch.setattr(interface.flight_loader, "load", lambda: lambda commands, **options: flights.append(options))
+    interface.trace_path = "flight"
+    interface.place_block(palette_block(interface, "takeoff"))
+    interface.place_block(palette_block(interface, "land"), index=1)
+    click = pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=interface.run_button.rect.center, button=1)
+
+    interface.handle_event(click)
+    interface.handle_event(click)
+    assert [options["trace_path"] for options in flights] == ["flight.1", "flight.2"]
+
+    interface.trace_path = None
+    interface.handle_event(click)
+    assert flights[-1]["trace_path"] is None
+
+
+@pytest.mark.parametrize("error", [OSError("no route"), TimeoutError("no reply"), djitellopy.TelloException("no state")])
+def test_a_drone_that_cannot_be_reached_keeps_the_editor(interface, monkeypatch, error):
+    def run_user_interface(commands, **options):
+        raise error
+
+    monkeypatch.setattr(interface.flight_loader, "load", lambda: run_user_interface)
+    interface.place_block(palette_block(interface, "takeoff"))
+    interface.place_block(palette_block(interface, "land"), index=1)
+    interface.handle_event(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=interface.run_button.rect.center, button=1))
+    assert len(interface.used_blocks) == 2
+
+
+def test_a_bug_in_the_flight_screen_is_not_swallowed(interface, monkeypatch):
+    def run_user_interface(commands, **options):
+        raise KeyError("background")
+
+    monkeypatch.setattr(interface.flight_loader, "load", lambda: run_user_interface)
+    interface.place_block(palette_block(interface, "takeoff"))
+    interface.place_block(palette_block(interface, "land"), index=1)
+    with pytest.raises(KeyError):
+        interface.handle_event(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=interface.run_button.rect.center, button=1))
@@ -0,0 +1,86 @@
+import json
+import threading
+import time
+
+import pygame
+import pytest
+
+from ScrollableCommandList import ScrollableCommandList
+from flight_trace import FlightTracer
+
+
+class SlowScreen:
+    """Lets other threads run in the middle of a draw, the way a busy UI thread does."""
+
+    def __init__(self, size):
+        self.surface = pygame.Surface(size)
+
+    def get_width(self):
+        return self.surface.get_width()
+
+    def blit(self, image, position):
+        time.sleep(0.0005)
+        return self.surface.blit(image, position)
+
+
+@pytest.fixture
+def screen():
+    pygame.display.init()
+    pygame.display.set_mode((400, 600))
+    yield SlowScreen((400, 600))
+    pygame.display.quit()
+
+
+def test_draw_while_another_thread_dequeues(screen):
+    commands = ["takeoff"] + ["fly_forward", "fly_up"] * 200 + ["land"]
+    command_list = ScrollableCommandList(commands, screen, height=400)
+    errors = []
+
+    def executor():
+        while command_list.dequeue_command() is not None:
+            time.sleep(0.0002)
+
+    thread = threading.Thread(target=executor)
+    thread.start()
+    try:
+        while thread.is_alive():
+            command_list.draw()
+    except RuntimeError as e:
+        errors.append(e)
+    thread.join(timeout=5)
+    assert errors == []
+    assert command_list.is_empty()
+
+
+def test_dequeue_returns_commands_in_order_and_resets_the_scroll(screen):
+    command_list = ScrollableCommandList(["takeoff", "fly_up", "fly_down", "land"], screen, height=100)
+    command_list.handle_scroll("down")
+    assert command_list.get_current_command() == "fly_up"
+
+    assert command_list.dequeue_command() == "takeoff"
+    assert command_list.scrollY == 0
+    assert command_list.get_first_command() == "fly_up"
+    assert [command_list.dequeue_command() for _ in range(4)] == ["fly_up", "fly_down", "land", None]
+
+
+def test_variants_are_preloaded(screen):
+    command_list = ScrollableCommandList(["takeoff", "fly_up", "land"], screen, height=400)
+    command_list.draw()
+    assert command_list.cache_stats()["misses"] == 0
+
+
+def test_dequeues_are_traced_with_the_block_id(screen, tmp_path):
+    tracer = FlightTracer()
+    command_list = ScrollableCommandList(["takeoff", "fly_up", "land"], screen, height=400, tracer=tracer)
+    for source in range(3):
+        command_list.dequeue_command(id=source)
+    tracer.write_jsonl(tmp_path / "flight.jsonl")
+
+    with open(tmp_path / "flight.jsonl") as f:
+        events = [json.loads(line) for line in f]
+    dequeued = [event["args"] for event in events if event["name"] == "dequeued"]
+    assert dequeued == [
+        {"id": 0, "command": "takeoff", "remaining": 2},
+        {"id": 1, "command": "fly_up", "remaining": 1},
+        {"id": 2, "command": "land", "remaining": 0},
+    ]
@@ -0,0 +1,106 @@
+import threading
+import time
+
+import pytest
+
+from startup_orchestrator import StartupOrchestrator
+
+
+def test_tasks_get_their_requirements_results_after_they_finished():
+    release = threading.Event()
+    startup = StartupOrchestrator()
+    startup.add("connect", lambda: release.wait(2) and "drone")
+    startup.add("stream", lambda drone: f"{drone} stream", requires=("connect",))
+    startup.start()
+
+    time.sleep(0.05)
+    assert startup.tasks["stream"].state == "waiting"
+    release.set()
+    assert startup.result("stream", timeout=2) == "drone stream"
+    assert startup.tasks["stream"].start >= startup.tasks["connect"].end
+    startup.shutdown()
+
+
+def test_independent_tasks_overlap():
+    startup = StartupOrchestrator(max_workers=3)
+    for name in ("a", "b", "c"):
+        startup.add(name, lambda: time.sleep(0.1))
+    startup.start()
+    assert startup.wait(timeout=2)
+    report = startup.report()
+    assert report["total_ms"] < report["serial_ms"] * 0.6
+    startup.shutdown()
+
+
+def test_a_failure_fails_everything_that_requires_it():
+    def connect():
+        raise OSError("no drone")
+
+    startup = StartupOrchestrator()
+    startup.add("connect", connect)
+    startup.add("telemetry", lambda drone: drone, requires=("connect",))
+    startup.add("stream", lambda drone: drone, requires=("telemetry",))
+    startup.add("sounds", lambda: "ok")
+    startup.start()
+
+    assert startup.wait(timeout=2)
+    with pytest.raises(OSError):
+        startup.result("connect")
+    with pytest.raises(RuntimeError, match="connect failed"):
+        startup.result("stream")
+    assert startup.result("sounds") == "ok"
+    assert startup.tasks["stream"].start is None
+    startup.shutdown()
+
+
+def test_requirements_must_be_added_first():
+    startup = StartupOrchestrator()
+    startup.add("a", lambda: None)
+    with pytest.raises(ValueError):
+        startup.add("a", lambda: None)
+    with pytest.raises(ValueError):
+        startup.add("b", lambda a: None, requires=("c",))
+
+
+def test_critical_path_follows_the_last_requirement_to_finish():
+    startup = StartupOrchestrator()
+    startup.add("connect", lambda: time.sleep(0.1))
+    startup.add("sounds", lambda: time.sleep(0.02))
+    startup.add("telemetry", lambda _: None, requires=("connect",))
+    startup.add("stream", lambda _: time.sleep(0.05), requires=("connect",))
+    startup.start()
+    assert startup.wait(timeout=2)
+    assert startup.critical_path() == ["connect", "stream"]
+    assert set(startup.timings()) == {"connect", "sounds", "telemetry", "stream"}
+    startup.shutdown()
+
+
+def test_result_times_out():
+    release = threading.Event()
+    startup = StartupOrchestrator()
+    startup.add("slow", lambda: release.wait(2))
+    startup.start()
+    with pytest.raises(TimeoutError):
+        startup.result("slow", timeout=0.01)
+    release.set()
+    startup.shutdown()
+
+
+def test_shutdown_before_the_end_still_runs_waiting_tasks():
+    release = threading.Event()
+    startup = StartupOrchestrator()
+    startup.add("connect", lambda: release.wait(2))
+    startup.add("stream", lambda _: "streaming", requires=("connect",))
+    startup.start()
+    startup.shutdown()
+
+    release.set()
+    assert startup.result("stream", timeout=2) == "streaming"
+
+
+def test_nothing_to_do():
+    startup = StartupOrchestrator().start()
+    assert startup.finished
+    assert startup.progress() == 1.0
+    assert startup.critical_path() == []
+    startup.shutdown()
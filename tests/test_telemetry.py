@@ -0,0 +1,128 @@
+from telemetry import TelemetryPoller
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeDrone:
+    """Answers like djitellopy from the last state packet, a packet replaces the state dict."""
+
+    def __init__(self):
+        self.state = {}
+
+    def packet(self, battery=80, temperature=60, speed=(0, 0, 0)):
+        self.state = {"bat": battery, "temp": temperature, "vgx": speed[0], "vgy": speed[1], "vgz": speed[2]}
+
+    def get_current_state(self):
+        return self.state
+
+    def get_battery(self):
+        return self.state["bat"]
+
+    def get_temperature(self):
+        return self.state["temp"]
+
+    def get_speed_x(self):
+        return self.state["vgx"]
+
+    def get_speed_y(self):
+        return self.state["vgy"]
+
+    def get_speed_z(self):
+        return self.state["vgz"]
+
+
+def test_everything_is_stale_before_the_first_packet():
+    poller = TelemetryPoller(FakeDrone(), clock=FakeClock())
+    snapshot = poller.sample()
+    assert snapshot.stale == {"battery", "temperature", "speed"}
+    assert snapshot.battery.value is None
+    assert snapshot.text("battery") == "na"
+
+
+def test_readings_are_dated_by_packet_arrival():
+    drone, clock = FakeDrone(), FakeClock()
+    poller = TelemetryPoller(drone, stale_after=2.0, clock=clock)
+    drone.packet(battery=80, speed=(3, 4, 0))
+
+    snapshot = poller.sample()
+    assert snapshot.battery.updated == 100.0
+    assert snapshot.speed.value == 5.0
+    assert not snapshot.stale
+    assert snapshot.text("battery") == "80%"
+
+    # The getters keep answering from the old packet, the reading keeps its arrival time
+    clock.now = 101.5
+    assert poller.sample().battery.updated == 100.0
+    clock.now = 102.5
+    snapshot = poller.sample()
+    assert snapshot.stale == {"battery", "temperature", "speed"}
+    assert snapshot.battery.value == 80
+    assert snapshot.text("battery") == "na"
+
+    drone.packet(battery=79)
+    clock.now = 103.0
+    snapshot = poller.sample()
+    assert snapshot.battery == (79, 103.0)
+    assert not snapshot.stale
+
+
+def test_version_only_changes_with_values_or_staleness():
+    drone, clock = FakeDrone(), FakeClock()
+    poller = TelemetryPoller(drone, stale_after=2.0, clock=clock)
+    drone.packet()
+    poller.sample()
+    version = poller.version
+
+    drone.packet()  # new packet, same values
+    clock.now += 0.2
+    poller.sample()
+    assert poller.version == version
+
+    clock.now += 5
+    poller.sample()
+    assert poller.version == version + 1
+
+
+def test_failed_read_keeps_the_last_value():
+    drone, clock = FakeDrone(), FakeClock()
+    poller = TelemetryPoller(drone, clock=clock)
+    drone.packet(temperature=61)
+    poller.sample()
+
+    drone.packet()
+    del drone.state["temp"]
+    clock.now += 0.5
+    snapshot = poller.sample()
+    assert snapshot.temperature == (61, 100.0)
+    assert snapshot.battery.updated == 100.5
+
+
+class NoStateDrone:
+
+    def get_battery(self):
+        return 50
+
+    def get_temperature(self):
+        return 40
+
+    def get_speed_x(self):
+        return 0
+
+    get_speed_y = get_speed_z = get_speed_x
+
+
+def test_reads_without_get_current_state_are_always_fresh():
+    clock = FakeClock()
+    poller = TelemetryPoller(NoStateDrone(), stale_after=2.0, clock=clock)
+    poller.sample()
+    clock.now += 10
+    snapshot = poller.sample()
+    assert snapshot.battery == (50, 110.0)
+    assert not snapshot.stale
@@ -0,0 +1,84 @@
+import socket
+
+import pytest
+
+from tello_simulator import TelloSimulator, create_tello
+
+
+def free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+@pytest.fixture
+def simulator():
+    return TelloSimulator(latency=0, jitter=0, video=False, seed=1)
+
+
+def test_moves_need_a_takeoff(simulator):
+    assert simulator.handle("command") == "ok"
+    assert simulator.handle("forward 50") == "error Not joystick"
+    assert simulator.handle("takeoff") == "ok"
+    assert simulator.handle("forward 50") == "ok"
+    assert simulator.position == [50, 0, 80]
+    assert simulator.handle("land") == "ok"
+    assert simulator.position[2] == 0
+    assert not simulator.flying
+
+
+def test_moves_follow_the_heading(simulator):
+    simulator.handle("takeoff")
+    simulator.handle("ccw 90")
+    simulator.handle("forward 100")
+    x, y, z = simulator.position
+    assert simulator.yaw == 90
+    assert (round(x), round(y), z) == (0, 100, 80)
+
+
+def test_go_and_curve_end_where_asked(simulator):
+    simulator.handle("takeoff")
+    assert simulator.handle("go 100 50 0 60") == "ok"
+    assert simulator.handle("curve 50 0 0 50 50 0 40") == "ok"
+    assert [round(p) for p in simulator.position] == [150, 100, 80]
+
+
+def test_reads_and_unknown_commands(simulator):
+    assert simulator.handle("battery?") == "100"
+    assert simulator.handle("height?") == "0dm"
+    assert simulator.handle("sdk?") == "20"
+    assert simulator.handle("rc 0 0 0 0") is None
+    simulator.handle("takeoff")
+    assert simulator.handle("flip x") == "error"
+    assert simulator.handle("") == "error"
+
+
+def test_error_rate():
+    simulator = TelloSimulator(error_rate=1.0, video=False)
+    assert simulator.handle("takeoff") == "error"
+    assert simulator.handle("battery?") == "100"  # reads never fail
+    assert simulator.errors == 1
+
+
+def test_state_packet_has_the_fields_djitellopy_reads(simulator):
+    simulator.handle("takeoff")
+    fields = dict(item.split(":") for item in simulator.state_text().strip().rstrip(";").split(";"))
+    assert fields["bat"] == "99"
+    assert fields["h"] == "80"
+    assert {"vgx", "vgy", "vgz", "templ", "temph", "yaw"} <= fields.keys()
+
+
+def test_answers_over_udp():
+    port = free_port()
+    simulator = TelloSimulator(control_port=port, state_port=free_port(), latency=0, jitter=0, video=False)
+    with simulator, socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as client:
+        client.settimeout(2)
+        for command, reply in (("command", "ok"), ("takeoff", "ok"), ("battery?", "99")):
+            client.sendto(command.encode(), ("127.0.0.1", port))
+            assert client.recvfrom(1024)[0].decode() == reply
+    assert simulator.stats()["commands"] == 3
+
+
+def test_create_tello_points_at_a_running_simulator(monkeypatch):
+    monkeypatch.setenv("DRONEBLOCKS_SIMULATOR", "127.0.0.1:9999")
+    assert create_tello().address == ("127.0.0.1", 9999)
@@ -0,0 +1,104 @@
+import pygame
+import pytest
+
+from text_cache import FontRegistry, TextCache
+
+
+class FakeFont:
+    """Renders a 10 pixel high, 32 bit surface 10 pixels wide per character: 400 bytes a character."""
+
+    def __init__(self):
+        self.renders = 0
+
+    def render(self, text, antialias, color):
+        self.renders += 1
+        return pygame.Surface((10 * len(text), 10), depth=32)
+
+
+class FakeFonts:
+
+    def __init__(self):
+        self.font = FakeFont()
+
+    def get(self, face, size):
+        return self.font
+
+
+def test_repeated_text_is_rendered_once():
+    fonts = FakeFonts()
+    cache = TextCache(fonts)
+    first = cache.render("80%", 17, (255, 255, 255))
+    assert cache.render("80%", 17, [255, 255, 255]) is first
+    assert fonts.font.renders == 1
+    assert cache.stats()["hit_rate"] == 0.5
+
+
+def test_every_parameter_is_part_of_the_key():
+    fonts = FakeFonts()
+    cache = TextCache(fonts)
+    cache.render("a", 17, (0, 0, 0))
+    cache.render("a", 18, (0, 0, 0))
+    cache.render("a", 17, (1, 0, 0))
+    cache.render("a", 17, (0, 0, 0), face="Arial")
+    cache.render("a", 17, (0, 0, 0), antialias=False)
+    assert fonts.font.renders == 5
+
+
+def test_least_recently_used_is_evicted_past_the_byte_cap():
+    fonts = FakeFonts()
+    cache = TextCache(fonts, max_bytes=1000)  # room for two one character surfaces
+    cache.render("a", 17, (0, 0, 0))
+    cache.render("b", 17, (0, 0, 0))
+    cache.render("a", 17, (0, 0, 0))  # b is now the oldest
+    cache.render("c", 17, (0, 0, 0))
+
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["bytes"] == 800
+    assert stats["evictions"] == 1
+    renders = fonts.font.renders
+    cache.render("a", 17, (0, 0, 0))
+    assert fonts.font.renders == renders
+    cache.render("b", 17, (0, 0, 0))
+    assert fonts.font.renders == renders + 1
+
+
+def test_newest_entry_is_kept_even_over_the_cap():
+    cache = TextCache(FakeFonts(), max_bytes=1000)
+    cache.render("a", 17, (0, 0, 0))
+    cache.render("too long", 17, (0, 0, 0))  # 3200 bytes on its own
+    assert cache.stats()["entries"] == 1
+    assert cache.bytes == 3200
+
+
+def test_shrinking_the_cap_drops_the_oldest():
+    cache = TextCache(FakeFonts(), max_bytes=10000)
+    for text in "abcd":
+        cache.render(text, 17, (0, 0, 0))
+    cache.set_max_bytes(800)
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["evictions"] == 2
+
+    cache.clear()
+    assert cache.stats()["entries"] == 0
+    assert cache.bytes == 0
+
+
+@pytest.fixture
+def font_module():
+    pygame.font.init()
+    yield
+    pygame.font.quit()
+
+
+def test_font_registry_loads_each_font_once(font_module):
+    fonts = FontRegistry()
+    assert fonts.get(None, 20) is fonts.get(None, 20)
+    assert fonts.get(None, 20) is not fonts.get(None, 21)
+
+
+def test_font_registry_survives_font_quit(font_module):
+    fonts = FontRegistry()
+    fonts.get(None, 20)
+    pygame.font.quit()
+    assert fonts.get(None, 20).render("ok", True, (0, 0, 0)).get_width() > 0
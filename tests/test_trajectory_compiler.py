@@ -0,0 +1,111 @@
+import pytest
+
+from program_optimizer import Step, optimize
+from trajectory_compiler import DurationModel, Segment, compile_program, primitive_segments, to_sdk
+
+
+def test_a_run_of_moves_becomes_one_go():
+    steps = optimize(["takeoff", "fly_forward", "fly_forward", "land"])
+    assert compile_program(steps) == [
+        Segment("primitive", ("takeoff", None), (0,)),
+        Segment("go", (190, 0, 0, 70), (1, 2)),
+        Segment("primitive", ("land", None), (3,)),
+    ]
+
+
+def test_a_corner_becomes_one_curve_at_curve_speed():
+    steps = optimize(["fly_forward", "fly_left"])
+    assert compile_program(steps) == [Segment("curve", (95, 0, 0, 95, 95, 0, 60), (0, 1))]
+    assert compile_program(steps, curves=False) == [
+        Segment("go", (95, 0, 0, 70), (0,)),
+        Segment("go", (0, 95, 0, 70), (1,)),
+    ]
+
+
+def test_tight_corners_are_not_curved():
+    # The circle through a 30 cm corner has a radius of about 21 cm, below the SDK's 50
+    steps = [Step("fly_forward", 30, (0,)), Step("fly_left", 30, (1,))]
+    assert [segment.kind for segment in compile_program(steps)] == ["go", "go"]
+
+
+def test_straight_legs_are_not_curved():
+    steps = [Step("fly_forward", 100, (0,)), Step("fly_forward", 100, (1,))]
+    assert [segment.kind for segment in compile_program(steps)] == ["go", "go"]
+
+
+def test_legs_outside_go_range_fall_back_to_primitives():
+    steps = [Step("fly_up", 15, (0,)), Step("takeoff", None, (1,)), Step("fly_backward", 600, (2,))]
+    assert compile_program(steps) == [
+        Segment("primitive", ("fly_up", 15), (0,)),
+        Segment("primitive", ("takeoff", None), (1,)),
+        Segment("primitive", ("fly_backward", 600), (2,)),
+    ]
+
+
+def test_rotations_split_move_runs():
+    steps = optimize(["fly_forward", "rotate_left", "fly_forward"])
+    assert [segment.kind for segment in compile_program(steps)] == ["go", "primitive", "go"]
+
+
+def test_cancelled_blocks_ride_along_or_skip():
+    steps = [Step(None, 0, (0, 1)), Step("takeoff", None, (2,)), Step("fly_forward", 95, (3,)), Step(None, 0, (4, 5))]
+    assert compile_program(steps) == [
+        Segment("skip", (), (0, 1)),
+        Segment("primitive", ("takeoff", None), (2,)),
+        Segment("go", (95, 0, 0, 70), (3, 4, 5)),
+    ]
+
+
+def test_speed_is_clamped_to_the_sdk_range():
+    steps = optimize(["fly_forward", "fly_forward"])
+    assert compile_program(steps, speed=200)[0].args[-1] == 100
+    assert compile_program(steps, speed=1)[0].args[-1] == 10
+    assert compile_program(optimize(["fly_forward", "fly_left"]), speed=100)[0].args[-1] == 60
+
+
+def test_primitive_segments_wrap_steps_one_to_one():
+    steps = optimize(["takeoff", "fly_up", "fly_down", "land"])
+    assert primitive_segments(steps) == [
+        Segment("primitive", ("takeoff", None), (0,)),
+        Segment("skip", (), (1, 2)),
+        Segment("primitive", ("land", None), (3,)),
+    ]
+
+
+def test_to_sdk():
+    assert to_sdk(Segment("go", (190, 0, 0.4, 70), (0,))) == "go 190 0 0 70"
+    assert to_sdk(Segment("curve", (95, 0, 0, 95, 95, 0, 60), (0,))) == "curve 95 0 0 95 95 0 60"
+    assert to_sdk(Segment("primitive", ("fly_up", 15), (0,))) == "fly_up 15"
+    assert to_sdk(Segment("primitive", ("land", None), (0,))) == "land"
+    assert to_sdk(Segment("skip", (), (0,))) == "skip"
+
+
+def test_duration_model_primitives():
+    model = DurationModel(move_speed=70, rotate_speed=90, stop_overhead=1.0, takeoff=6.0, land=4.0)
+    assert model.primitive("takeoff", None) == 6.0
+    assert model.primitive("land", None) == 4.0
+    assert model.primitive("fly_forward", 140) == pytest.approx(3.0)
+    assert model.primitive("fly_forward", None) == pytest.approx(1 + 95 / 70)
+    assert model.primitive("rotate_left", 90) == pytest.approx(2.0)
+    assert model.primitive("hover", None) == 3
+    assert model.primitive("hover", 5) == 5
+
+
+def test_duration_model_segments():
+    model = DurationModel()
+    assert model.segment(Segment("skip", (), (0,))) == 0.0
+    assert model.segment(Segment("go", (30, 40, 0, 50), (0,))) == pytest.approx(2.0)
+    assert model.segment(Segment("curve", (95, 0, 0, 95, 95, 0, 60), (0,))) == pytest.approx(1 + 190 / 60)
+    assert model.segment(Segment("primitive", ("takeoff", None), (0,))) == 6.0
+
+
+def test_block_by_block_baseline():
+    model = DurationModel()
+    assert model.block_by_block(["Takeoff", "fly_forward", "land"]) == pytest.approx(6 + 1 + 95 / 70 + 4)
+
+
+def test_compiled_plan_is_predicted_faster_than_block_by_block():
+    commands = ["takeoff"] + ["fly_forward", "fly_left"] * 3 + ["land"]
+    model = DurationModel()
+    compiled = sum(model.segment(segment) for segment in compile_program(optimize(commands)))
+    assert compiled < model.block_by_block(commands)
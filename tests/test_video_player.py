@@ -0,0 +1,107 @@
+import threading
+
+import cv2
+import numpy as np
+import pygame
+import pytest
+
+from Custom_Video_Player import ClipDecoder, FrameRing, play_static_video
+
+SIZE = (32, 24)
+
+
+@pytest.fixture
+def clip(tmp_path):
+    path = str(tmp_path / "clip.mp4")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), 30, (64, 48))
+    for value in range(12):
+        writer.write(np.full((48, 64, 3), value * 20, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+@pytest.fixture
+def screen():
+    pygame.display.init()
+    yield pygame.display.set_mode(SIZE)
+    pygame.display.quit()
+
+
+def test_ring_hands_frames_over_in_order():
+    ring = FrameRing(2, (1,))
+    read = []
+
+    def consume():
+        while (buffer := ring.acquire_read()) is not None:
+            read.append(int(buffer[0]))
+            ring.release_read()
+
+    consumer = threading.Thread(target=consume)
+    consumer.start()
+    for value in range(5):
+        ring.acquire_write()[0] = value
+        ring.commit_write()
+    ring.finish()
+    consumer.join(timeout=2)
+    assert read == [0, 1, 2, 3, 4]
+
+
+def test_ring_stop_releases_a_waiting_producer():
+    ring = FrameRing(1, (1,))
+    ring.acquire_write()
+    ring.commit_write()
+    results = []
+    producer = threading.Thread(target=lambda: results.append(ring.acquire_write()))
+    producer.start()
+    ring.stop()
+    producer.join(timeout=2)
+    assert results == [None]
+
+
+def test_decoder_scales_every_frame_and_caches_the_clip(clip, tmp_path):
+    cache_dir = str(tmp_path / ".cache")
+    decoder = ClipDecoder(clip, SIZE, cache_dir=cache_dir).start()
+    frames = [frame.copy() for frame in decoder.frames()]
+    decoder.stop()
+    assert len(frames) == 12
+    assert frames[0].shape == (SIZE[1], SIZE[0], 3)
+    assert not decoder.cached
+
+    cached = ClipDecoder(clip, SIZE, cache_dir=cache_dir).start()
+    assert cached.cached
+    assert np.array_equal(np.stack(list(cached.frames())), np.stack(frames))
+
+
+def test_a_clip_stopped_after_its_last_frame_is_cached(clip, tmp_path, monkeypatch):
+    # The player stops the decoder as soon as the last frame is shown, before the cache is saved
+    finish = FrameRing.finish
+    monkeypatch.setattr(FrameRing, "finish", lambda ring: (finish(ring), ring.stop()))
+    cache_dir = str(tmp_path / ".cache")
+    decoder = ClipDecoder(clip, SIZE, cache_dir=cache_dir).start()
+    list(decoder.frames())
+    decoder.stop()
+    assert ClipDecoder(clip, SIZE, cache_dir=cache_dir).start().cached
+
+
+def test_a_skipped_clip_is_not_cached(clip, tmp_path):
+    cache_dir = str(tmp_path / ".cache")
+    decoder = ClipDecoder(clip, SIZE, depth=2, cache_dir=cache_dir).start()
+    next(decoder.frames())
+    decoder.stop()
+    assert not ClipDecoder(clip, SIZE, cache_dir=cache_dir).start().cached
+
+
+def test_play_reports_how_the_clip_ended(clip, screen):
+    background = pygame.Surface(SIZE, pygame.SRCALPHA)
+    assert play_static_video(clip, screen, *SIZE, background, cache=False) == "finished"
+
+    pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE))
+    assert play_static_video(clip, screen, *SIZE, background, cache=False) == "skipped"
+
+    pygame.event.post(pygame.event.Event(pygame.QUIT))
+    assert play_static_video(clip, screen, *SIZE, background, cache=False) == "quit"
+
+
+def test_a_missing_clip_ends_at_once(tmp_path, screen):
+    background = pygame.Surface(SIZE, pygame.SRCALPHA)
+    assert play_static_video(str(tmp_path / "missing.mp4"), screen, *SIZE, background) == "finished"
@@ -0,0 +1,127 @@
+import os
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from video_recorder import VideoRecorder
+
+SIZE = (64, 48)
+
+
+def frame(value=0):
+    return np.full((SIZE[1], SIZE[0], 3), value, dtype=np.uint8)
+
+
+def held_recorder(tmp_path, release, **options):
+    """A recorder whose writer thread waits for release before it reads the queue."""
+    recorder = VideoRecorder(str(tmp_path), SIZE, fourcc="mp4v", **options)
+    write_frames = recorder._write_frames
+
+    def wait_then_write(*args):
+        release.wait(5)
+        write_frames(*args)
+
+    recorder._write_frames = wait_then_write
+    return recorder
+
+
+def test_frames_are_written_to_a_file(tmp_path):
+    recorder = VideoRecorder(str(tmp_path / "clips"), SIZE, fourcc="mp4v")
+    assert not recorder.submit(frame())  # not recording
+    recorder.start()
+    for value in range(10):
+        assert recorder.submit(frame(value))
+    recorder.stop(wait=True)
+
+    stats = recorder.stats()
+    assert stats["written"] == 10
+    assert stats["dropped"] == 0
+    assert len(stats["segments"]) == 1
+    assert os.path.getsize(stats["segments"][0]) > 0
+
+
+def test_drop_oldest_keeps_the_newest_frames(tmp_path):
+    release = threading.Event()
+    recorder = held_recorder(tmp_path, release, queue_size=2)
+    recorder.start()
+    assert all(recorder.submit(frame(value)) for value in range(5))
+    assert recorder.stats()["dropped"] == 3
+    assert recorder.stats()["queue_depth"] == 2
+    release.set()
+    recorder.stop(wait=True)
+    assert recorder.stats()["written"] == 2
+
+
+def test_drop_newest_refuses_frames_when_full(tmp_path):
+    release = threading.Event()
+    recorder = held_recorder(tmp_path, release, queue_size=2, drop_policy=VideoRecorder.DROP_NEWEST)
+    recorder.start()
+    assert [recorder.submit(frame()) for _ in range(4)] == [True, True, False, False]
+    release.set()
+    recorder.stop(wait=True)
+    assert recorder.stats()["written"] == 2
+
+
+def test_stop_never_blocks_on_a_full_queue(tmp_path):
+    release = threading.Event()
+    recorder = held_recorder(tmp_path, release, queue_size=1, drop_policy=VideoRecorder.BLOCK)
+    recorder.start()
+    recorder.submit(frame())
+
+    start = time.monotonic()
+    recorder.stop()
+    assert time.monotonic() - start < 0.5
+    release.set()
+
+
+def test_blocked_submit_gives_up_once_stopped(tmp_path):
+    release = threading.Event()
+    recorder = held_recorder(tmp_path, release, queue_size=1, drop_policy=VideoRecorder.BLOCK)
+    recorder.start()
+    recorder.submit(frame())
+
+    results = []
+    submitter = threading.Thread(target=lambda: results.append(recorder.submit(frame())))
+    submitter.start()
+    time.sleep(0.05)
+    assert submitter.is_alive()  # waiting for the encoder
+    recorder.stop()
+    submitter.join(timeout=2)
+    assert results == [False]
+    release.set()
+
+
+def test_a_restart_while_flushing_writes_a_new_file(tmp_path):
+    release = threading.Event()
+    recorder = held_recorder(tmp_path, release)
+    recorder.start()
+    recorder.submit(frame())
+    recorder.stop()
+    first = recorder._thread
+
+    recorder._write_frames = VideoRecorder._write_frames.__get__(recorder)
+    recorder.start()
+    recorder.submit(frame())
+    recorder.stop(wait=True)
+    release.set()
+    first.join(timeout=5)
+    assert len(os.listdir(tmp_path)) == 2
+
+
+def test_segments_roll_over_on_capture_time(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("video_recorder.time.monotonic", lambda: now[0])
+    recorder = VideoRecorder(str(tmp_path), SIZE, fourcc="mp4v", segment_seconds=1)
+    recorder.start()
+    recorder.submit(frame())
+    now[0] += 1.5
+    recorder.submit(frame())
+    recorder.stop(wait=True)
+    assert len(recorder.stats()["segments"]) == 2
+
+
+def test_unknown_drop_policy():
+    with pytest.raises(ValueError):
+        VideoRecorder("unused", SIZE, drop_policy="sometimes")
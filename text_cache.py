@@ -0,0 +1,124 @@
+import threading
+from collections import OrderedDict
+
+import pygame
+
+
+class FontRegistry:
+
+    def __init__(self):
+        """
+        Loads every (face, size) font once. Looking up a system font is slow, so fonts are
+        created on first use and kept for the life of the program.
+        """
+        self._fonts = {}
+        self._lock = threading.Lock()
+
+    def get(self, face, size):
+        """
+        Returns the font for a face and size. face is a system font name such as 'Arial',
+        or None for pygame's default font.
+        """
+        key = (face, size)
+        if not pygame.font.get_init():
+            # Fonts from before a pygame.quit() can not be used again
+            with self._lock:
+                self._fonts.clear()
+                pygame.font.init()
+        font = self._fonts.get(key)
+        if font is None:
+            with self._lock:
+                font = self._fonts.get(key)
+                if font is None:
+                    font = pygame.font.Font(None, size) if face is None else pygame.font.SysFont(face, size)
+                    self._fonts[key] = font
+        return font
+
+
+class TextCache:
+
+    def __init__(self, fonts, max_bytes=4 * 1024 * 1024):
+        """
+        Least recently used cache of rendered text surfaces shared by every screen.
+
+        Parameters:
+            fonts (FontRegistry): Where fonts are looked up.
+            max_bytes (int): Memory cap for the cached surfaces' pixels, the oldest are dropped past it.
+
+        Attributes:
+            hits (int): Renders served from the cache.
+            misses (int): Renders that had to draw the text.
+            evictions (int): Surfaces dropped to stay under max_bytes.
+        """
+        self.fonts = fonts
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def render(self, text, size, color, face=None, antialias=True):
+        """Returns the rendered surface for text, drawing it only the first time it is asked for."""
+        key = (face, size, text, tuple(color), antialias)
+        with self._lock:
+            surface = self._entries.get(key)
+            if surface is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return surface
+            self.misses += 1
+
+        surface = self.fonts.get(face, size).render(text, antialias, color)
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = surface
+                self.bytes += self._size_of(surface)
+                self._trim()
+        return surface
+
+    @staticmethod
+    def _size_of(surface):
+        return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+    def _trim(self):
+        # Always keeps the newest entry, even if it is bigger than the cap on its own
+        while self.bytes > self.max_bytes and len(self._entries) > 1:
+            _, surface = self._entries.popitem(last=False)
+            self.bytes -= self._size_of(surface)
+            self.evictions += 1
+
+    def set_max_bytes(self, max_bytes):
+        """Changes the memory cap, dropping the oldest surfaces if it shrank."""
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._trim()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+# Shared by the editor, the flight screen and the command list
+fonts = FontRegistry()
+text_cache = TextCache(fonts)
+
+
+def render_text(text, size, color, face=None):
+    """Returns a cached rendering of text from the shared text cache."""
+    return text_cache.render(text, size, color, face)
@@ -0,0 +1,219 @@
+import math
+from collections import namedtuple
+
+# One drone call of a compiled program.
+#   kind "go":        args is (x, y, z, speed)
+#   kind "curve":     args is (x1, y1, z1, x2, y2, z2, speed)
+#   kind "primitive": args is (command, amount) for DroneFlight.drone_command
+#   kind "skip":      blocks that cancelled out, nothing is flown
+# Coordinates are centimetres relative to the drone: x forward, y left, z up.
+# sources are the indices of the original blocks the segment stands for.
+Segment = namedtuple("Segment", "kind args sources")
+
+# Direction of each move command in the drone's own frame
+MOVE_VECTORS = {
+    "fly_forward": (1, 0, 0),
+    "fly_backward": (-1, 0, 0),
+    "fly_left": (0, 1, 0),
+    "fly_right": (0, -1, 0),
+    "fly_up": (0, 0, 1),
+    "fly_down": (0, 0, -1),
+}
+
+# SDK limits for go and curve
+GO_RANGE = 500  # cm on every axis
+GO_DEADZONE = 20  # go is refused when x, y and z are all within this
+GO_SPEED = (10, 100)  # cm/s
+CURVE_SPEED = (10, 60)  # cm/s
+CURVE_RADIUS = (50, 1000)  # cm
+
+
+def _add(a, b):
+    return tuple(x + y for x, y in zip(a, b))
+
+
+def _go_allowed(vector):
+    return all(abs(v) <= GO_RANGE for v in vector) and any(abs(v) > GO_DEADZONE for v in vector)
+
+
+def _curve_radius(first, second):
+    # Radius of the circle through the start, the corner and the end
+    a = math.dist((0, 0, 0), first)
+    b = math.dist(first, _add(first, second))
+    c = math.dist((0, 0, 0), _add(first, second))
+    cross = (
+        first[1] * second[2] - first[2] * second[1],
+        first[2] * second[0] - first[0] * second[2],
+        first[0] * second[1] - first[1] * second[0],
+    )
+    area = math.dist((0, 0, 0), cross) / 2
+    if area == 0:
+        return None  # the points are on a line, the SDK has no curve for that
+    return a * b * c / (4 * area)
+
+
+def _curve_allowed(first, second):
+    end = _add(first, second)
+    if not (_go_allowed(first) and _go_allowed(end)):
+        return False
+    radius = _curve_radius(first, second)
+    return radius is not None and CURVE_RADIUS[0] <= radius <= CURVE_RADIUS[1]
+
+
+def compile_program(steps, speed=70, curves=True):
+    """
+    Compiles optimizer Steps into go and curve segments so the drone does not stop after every block.
+    Every run of moves between two rotations is turned into legs relative to the drone. A leg becomes
+    one go command. With curves on, two legs that turn a corner become one curve through the corner,
+    so the drone still passes every point the blocks lead to. Rotations, takeoff, land, hover
+    and anything outside the SDK's limits fall back to the primitive calls.
+
+    Parameters:
+        steps (list): Steps from program_optimizer.optimize.
+        speed (int): Flying speed in cm/s, clamped to what go and curve accept.
+        curves (bool): Join corners into curve commands.
+
+    Returns:
+        list: Segments covering every original block exactly once and in order.
+    """
+    segments = []
+    legs = []  # [vector, sources] of the pending run of moves
+    go_speed = min(max(speed, GO_SPEED[0]), GO_SPEED[1])
+    curve_speed = min(max(speed, CURVE_SPEED[0]), CURVE_SPEED[1])
+
+    def flush():
+        i = 0
+        while i < len(legs):
+            vector, sources = legs[i]
+            if curves and i + 1 < len(legs) and _curve_allowed(vector, legs[i + 1][0]):
+                end = _add(vector, legs[i + 1][0])
+                segments.append(Segment("curve", vector + end + (curve_speed,), tuple(sources + legs[i + 1][1])))
+                i += 2
+            elif _go_allowed(vector):
+                segments.append(Segment("go", vector + (go_speed,), tuple(sources)))
+                i += 1
+            else:
+                # Too short or too long for go, fly it as the plain move it came from
+                for command, amount, leg_sources in _split_leg(vector, sources):
+                    segments.append(Segment("primitive", (command, amount), leg_sources))
+                i += 1
+        legs.clear()
+
+    for step in steps:
+        if step.command in MOVE_VECTORS:
+            unit = MOVE_VECTORS[step.command]
+            legs.append([tuple(step.amount * v for v in unit), list(step.sources)])
+        elif step.command is None:
+            if legs:
+                legs[-1][1].extend(step.sources)  # nothing to fly, ride along with the previous leg
+            else:
+                segments.append(Segment("skip", (), step.sources))
+        else:
+            flush()
+            segments.append(Segment("primitive", (step.command, step.amount), step.sources))
+    flush()
+    return segments
+
+
+def primitive_segments(steps):
+    """Wraps Steps one to one as primitive segments, for flying a program without go and curve."""
+    return [Segment("skip", (), step.sources) if step.command is None else Segment("primitive", (step.command, step.amount), step.sources) for step in steps]
+
+
+def _split_leg(vector, sources):
+    for command, unit in MOVE_VECTORS.items():
+        amount = sum(v * u for v, u in zip(vector, unit))
+        if amount > 0:
+            yield command, amount, tuple(sources)
+            return
+
+
+def to_sdk(segment):
+    """Returns the Tello SDK text of a go or curve segment, used for test runs and logs."""
+    if segment.kind in ("go", "curve"):
+        return f"{segment.kind} " + " ".join(str(round(v)) for v in segment.args)
+    if segment.kind == "primitive":
+        command, amount = segment.args
+        return command if amount is None else f"{command} {amount}"
+    return "skip"
+
+
+class DurationModel:
+
+    def __init__(self, move_speed=70, rotate_speed=90, stop_overhead=1.0, takeoff=6.0, land=4.0, distance=95, rotate=45, hover=3):
+        """
+        Rough flight time estimates, good enough to compare a compiled program against the block by block one.
+
+        Parameters:
+            move_speed (float): cm/s of the primitive move commands.
+            rotate_speed (float): Degrees per second of the rotate commands.
+            stop_overhead (float): Seconds every call loses speeding up, stopping and waiting for "ok".
+            takeoff (float): Seconds a takeoff takes.
+            land (float): Seconds a landing takes.
+            distance, rotate, hover: What one block flies, turns or waits, used when a step has no amount.
+        """
+        self.move_speed = move_speed
+        self.rotate_speed = rotate_speed
+        self.stop_overhead = stop_overhead
+        self.takeoff = takeoff
+        self.land = land
+        self.distance = distance
+        self.rotate = rotate
+        self.hover = hover
+
+    def primitive(self, command, amount):
+        if command == "takeoff":
+            return self.takeoff
+        if command == "land":
+            return self.land
+        if command in MOVE_VECTORS:
+            return self.stop_overhead + (self.distance if amount is None else amount) / self.move_speed
+        if command in ("rotate_left", "rotate_right"):
+            return self.stop_overhead + (self.rotate if amount is None else amount) / self.rotate_speed
+        return self.hover if amount is None else amount
+
+    def segment(self, segment):
+        if segment.kind == "skip":
+            return 0.0
+        if segment.kind == "primitive":
+            return self.primitive(*segment.args)
+        if segment.kind == "go":
+            *vector, speed = segment.args
+            return self.stop_overhead + math.dist((0, 0, 0), vector) / speed
+        *points, speed = segment.args
+        first, end = tuple(points[:3]), tuple(points[3:])
+        # The arc is a little longer than its two chords, close enough for an estimate
+        return self.stop_overhead + (math.dist((0, 0, 0), first) + math.dist(first, end)) / speed
+
+    def block_by_block(self, commands):
+        """Predicted time of flying every block with its own call, the way drone_command does."""
+        return sum(self.primitive(command.lower(), None) for command in commands)
+
+
+class DurationReport:
+
+    def __init__(self, model, baseline):
+        """
+        Collects predicted and measured times of the segments that were flown.
+
+        Parameters:
+            model (DurationModel): Gives the predicted time of each segment.
+            baseline (float): Predicted time of the same program flown block by block.
+        """
+        self.model = model
+        self.baseline = baseline
+        self.rows = []  # (sdk text, predicted, actual)
+
+    def record(self, segment, actual):
+        self.rows.append((to_sdk(segment), self.model.segment(segment), actual))
+
+    def summary(self):
+        predicted = sum(row[1] for row in self.rows)
+        actual = sum(row[2] for row in self.rows)
+        lines = [f"{'segment':<40}{'predicted':>10}{'actual':>10}"]
+        for text, row_predicted, row_actual in self.rows:
+            lines.append(f"{text:<40}{row_predicted:>9.1f}s{row_actual:>9.1f}s")
+        lines.append(f"{'total':<40}{predicted:>9.1f}s{actual:>9.1f}s")
+        lines.append(f"Block by block prediction {self.baseline:.1f}s, predicted saving {self.baseline - predicted:.1f}s")
+        return "\n".join(lines)
+
@@ -2,119 +2,132 @@ import pygame
 from ScrollableCommandList import ScrollableCommandList
 from CustomButton import Button
 import threading
-import queue
-from djitellopy import Tello
-import cv2
 from take_commands import DroneFlight
-import math
 from Custom_Video_Player import play_static_video
-import os
+from frame_pipeline import FrameTransformer
+from frame_delivery import FrameSlot, FrameSubscriber, FramePump
+from video_recorder import VideoRecorder
+from text_cache import render_text, text_cache
+from frame_scheduler import FrameScheduler
+from program_optimizer import optimize, describe, Step
+from async_executor import CommandExecutor
+from flight_trace import FlightTracer, TracedDrone
+import drone_session
+from trajectory_compiler import compile_program, primitive_segments, to_sdk, DurationModel, DurationReport
 import time
+import os
 
 
-def run_user_interface(commands):
-    pygame.init()
-    pygame.mixer.init()
-    click_sound = pygame.mixer.Sound("sounds/button_press.wav")
-    alert_sound = pygame.mixer.Sound("sounds/alert.mp3")
-    startup_sound = pygame.mixer.Sound("sounds/startup.mp3")
-    command_executed = pygame.mixer.Sound("sounds/command_executed.mp3")
+def run_user_interface(commands, show_fps=False, optimize_program=True, execution_mode="primitive", test=False, trace_path=None, session=None):
+    """
+    Flight screen. execution_mode picks how the program is flown: "primitive" makes one drone_command
+    call per step, "compiled" flies runs of moves as go/curve segments. test prints the commands
+    instead of flying them. A predicted versus measured duration report is printed at the end.
+    trace_path records the flight and writes <trace_path>.trace.json (Chrome trace) and <trace_path>.jsonl on exit.
+    The drone link, video stream, sounds and images come from session (the shared drone_session.session
+    by default) and stay open after the flight, so does pygame: the editor window keeps running.
+    """
+    session = session or drone_session.session
     
     global camera_toggle
     camera_toggle = True
-    #Drone setup
-    tello = Tello()
-    tello.connect()
+    tracer = FlightTracer(enabled=trace_path is not None)  #Every event of the flight on one clock, no-op unless tracing
+    #Connects, starts the stream and loads sounds and images on the first flight, later flights find them ready
+    startup = session.start(tracer)
+
+    #Colors
+    BACKGROUND_COLOR = (173, 216, 230)
+    TEXT_COLOR = (255, 255, 255)
     
-    #Camera setup
-    tello.streamon()  
-    frame_queue = queue.Queue(maxsize=1)  #Limit queue size to avoid lag
+    #Screen Setup, the editor's window is reused when it has the right size
+    SCREEN_WIDTH, SCREEN_HEIGHT = session.screen_size
+    screen = pygame.display.get_surface()
+    if screen is None or screen.get_size() != session.screen_size:
+        screen = pygame.display.set_mode(session.screen_size)
+    editor_caption = pygame.display.get_caption()
+    pygame.display.set_caption("Drone GUI")
+    
+    camera_slot = FrameSlot()  #Latest frame from the drone, only the newest is kept to avoid lag
+    display_slot = FrameSlot()  #Latest frame ready to be shown
+    frame_pump = FramePump(lambda: session.frame_read.frame, camera_slot)
+    frame_transformer = FrameTransformer((1040, 585))  #Scales frames into reusable buffers the UI shows without copying
+    scheduler = FrameScheduler(target_fps=30, idle_fps=5, overlay=show_fps)  #Camera runs at 30 fps, no point drawing faster
     
     #Thread control flags
     camera_running = threading.Event()
     camera_running.set()
 
-    command_thread_running = threading.Event()
-    command_thread_running.set()
     
-    global recording, video_writer
-    recording = False
-    video_writer = None
+    #Encodes on its own thread, each recording is saved in one minute segments on the Desktop
+    recorder = VideoRecorder(os.path.expanduser("~/Desktop"), frame_transformer.recording_size(), fps=30.0)
     
     def camera_thread():                                                                                                                                    
         """ Thread function to continuously update the camera frame """
-        global recording, video_writer
         
+        camera_frames = FrameSubscriber(camera_slot)
         while camera_running.is_set():
-            frame = tello.get_frame_read().frame
+            frame = camera_frames.wait(timeout=0.1)  #Wakes as soon as a new frame arrives
             if frame is not None:
-                #Rotate frame to match display
-                frame = cv2.rotate(frame, cv2.ROTATE_90_COUNTERCLOCKWISE)
+                transform_start = tracer.clock()
+                #Scale to the display size, replaces rotating, resizing and flipping the frame
                 #frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB) This code changes color of recorded video
-                frame = cv2.resize(frame, (585, 1040))  #Change (width, height)
-                frame = cv2.flip(frame, 0) #Flip about y axis
+                frame = frame_transformer.transform(frame)
     
-                if recording and video_writer is not None:
-                    video_writer.write(frame)
+                if recorder.recording:
+                    recorder.submit(frame_transformer.recording_frame(frame))
                     
-                #Put the frame in the queue (overwrite old frame if queue is full)
-                if frame_queue.full():
-                    frame_queue.get()
-                frame_queue.put(frame)
-                
-            time.sleep(1/30)
+                #Replace the frame waiting to be shown
+                sequence = display_slot.publish(frame)
+                tracer.complete("transform", "camera", transform_start, frame=sequence)
+                scheduler.wake()  #Don't let an idle main loop sit on a new frame
+        print(f"Camera frames: {camera_frames.stats()}")
     
-    #Start the camera thread
     camera_thread = threading.Thread(target=camera_thread, daemon=True)
-    camera_thread.start()
     
 
-    def execute_commands(executor, command_list):
-        """Executes all commands sequentially, ensuring one command finishes before starting the next."""
-        
-        while not command_list.is_empty() and command_thread_running.is_set():  #Run while there are commands left
-                current_command = command_list.get_first_command()  #Get the next command
-                if current_command:
-                    print(f"Executing command: {current_command}")
-                    pygame.mixer.Sound.play(command_executed)
-                    executor.drone_command(current_command)  #Execute the command
-                    #executor.test_command(current_command) #Uncomment and replace above command to run without actually moving drone to test
-                    command_list.dequeue_command()
-                    
-        print("All commands executed.")
+    def fly_segment(segment):
+        """Flies one segment of the plan, runs on the command executor's link thread."""
+        if segment.kind != "skip":  #Blocks that cancel out fly nothing
+            print(f"Executing command: {to_sdk(segment)} (blocks {list(segment.sources)})")
+            pygame.mixer.Sound.play(command_executed)
+            with tracer.span(to_sdk(segment), "command", id=segment.sources[0]):
+                run_step(segment)  #Execute the command
+
+    def segment_done(segment, seconds):
+        """
+        A segment can stand for several blocks, they are all dequeued once it is done so the list keeps
+        highlighting the first block of the segment that is running.
+        """
+        if segment.kind != "skip":
+            report.record(segment, seconds)
+        tracer.instant("completed", "command", id=segment.sources[0])
+        for source in segment.sources:
+            command_list.dequeue_command(id=source)  #Traced as "dequeued" per block
+        scheduler.wake()  #Show the shorter command list straight away
+
+    def program_finished(result):
+        print(report.summary())
+        if not result.cancelled() and result.result():
+            print("All commands executed.")
+        else:
+            print("Program stopped before the end.")
 
         
     def stop_action():
         pygame.mixer.Sound.play(alert_sound)
         print("Stop Button clicked")
-        command_thread_running.clear()  #Stop the command execution thread
-        try:
-            tello.send_rc_control(0, 0, 0, 0)  #Stop all movement (left_right, forward_back, up_down, yaw)
-            tello.land()  #Command the drone to land
-        except Exception as e:
-            print(f"Error during landing: {e}")
+        #Cancels the running command and lands on the executor's priority path, the UI never waits for it
+        command_executor.emergency_stop()
         
     def recording_action():
-        global recording, video_writer
         pygame.mixer.Sound.play(click_sound)
 
-        if not recording:
+        if not recorder.recording:
             print("Starting Recording...")
-
-            # Save file to Desktop
-            desktop_path = os.path.expanduser("~/Desktop")
-            video_path = os.path.join(desktop_path, "drone_footage.mp4")
-
-            # Set up video writer (H.264 codec for MP4)
-            fourcc = cv2.VideoWriter_fourcc(*'H264')  
-            video_writer = cv2.VideoWriter(video_path, fourcc, 30.0, (585, 1040))
-            recording = True
+            recorder.start()
         else:
             print("Stopping Recording...")
-            recording = False
-            if video_writer is not None:
-                video_writer.release()
-                video_writer = None
+            recorder.stop()  #The recorder finishes writing queued frames in the background
         
     def camera_action():
         global camera_toggle
@@ -122,73 +135,94 @@ def run_user_interface(commands):
         camera_toggle = not camera_toggle
         print(f"Camera Toggle {camera_toggle}")
     
-    #Colors
-    BACKGROUND_COLOR = (173, 216, 230)
-    TEXT_COLOR = (255, 255, 255)
-    
-    #Screen Setup
-    SCREEN_WIDTH = 1280
-    SCREEN_HEIGHT = 700
-    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-    pygame.display.set_caption("Drone GUI")
-    
-    background_image = pygame.image.load("icons/background.png")  
-    background_image = pygame.transform.scale(background_image, (SCREEN_WIDTH, SCREEN_HEIGHT))  #Scale it to fit screen
-    
-    icon_height = 32
-    icon_width = 140
-    
-    #Load status icons
-    battery_image = pygame.image.load("icons/BatteryBar.png").convert_alpha()
-    temperature_image = pygame.image.load("icons/TemperatureBar.png").convert_alpha()
-    speed_image = pygame.image.load("icons/SpeedBar.png").convert_alpha()
-    
-    #Resize while maintaining aspect ratio
-    battery_image = pygame.transform.smoothscale(battery_image, (icon_width, icon_height))
-    temperature_image = pygame.transform.smoothscale(temperature_image, (icon_width, icon_height))
-    speed_image = pygame.transform.smoothscale(speed_image, (icon_width, icon_height))
-    
-    #Load button images
-    recording_button_image = "icons/StartRecordingCommandBlock.png"
-    recording_alt_button_image = "icons/RecordingOnCommandBlock.png"
-    stop_button_image = "icons/EStopCommandBlock.png"
-    camera_button_image = "icons/ToggleCameraOnCommandBlock.png"
-    camera_alt_button_image = "icons/ToggleCameraOffCommandBlock.png"
-    
-    #Create button instances
-    
-    stop_button = Button(400, 600, 90, 90, stop_action, stop_button_image)
-    recording_button = Button(525, 600, 90, 90, recording_action, recording_button_image, recording_alt_button_image)
-    camera_button = Button(650, 600, 90, 90, camera_action, camera_button_image, camera_alt_button_image)
-    buttons = [recording_button, stop_button, camera_button] #List of buttons used in mouse hover checking
-    
     def draw_text(text, x, y, color=TEXT_COLOR, size=30):
         """Renders text on the screen."""
-        font = pygame.font.SysFont(None, size)
-        label = font.render(text, True, color)
+        label = render_text(text, size, color)  #Only rendered again when the text changes
         screen.blit(label, (x, y))
     
-    command_list = ScrollableCommandList(commands, screen, widthRatio=0.12, height=400, x=120, y=190)
-    pygame.mixer.Sound.play(startup_sound)
+    try:
+        #The clip needs the background and its sound, everything else keeps loading while it plays
+        session.wait("images", "startup sound")
+        background_image = session.prepare_images()["background"]  #Converted here, the worker only read the files
+        pygame.mixer.Sound.play(session.sounds["startup"])
+        
+        closed = False
+        if "connect" in startup.tasks:
+            #Play the startup video behind the UI while the drone connects, with the startup progress over it
+            closed = play_static_video("media/static.mp4", screen, SCREEN_WIDTH, SCREEN_HEIGHT, background_image, overlay=startup.draw_progress) == "quit"
+            #The progress only shows if the clip was skipped or the drone is slow to answer
+            closed = closed or startup.wait_with_progress(screen, background_image)
+        if not closed:
+            session.wait(*startup.tasks)  #Raises if the drone could not be reached
+    except BaseException:
+        pygame.display.set_caption(*editor_caption)
+        raise
+    finally:
+        startup.shutdown()  #Tasks still running finish on their own, the session picks them up next time
+    if closed:
+        #Closed during the intro: back to the editor before anything flies
+        pygame.display.set_caption(*editor_caption)
+        return
+    if startup.tasks:
+        print(f"Startup: {startup.report()}")
+    session.flights += 1
+    tello = session.tello
+    telemetry = session.telemetry
+    telemetry.tracer = tracer  #Samples of this flight go in its trace
+    click_sound, alert_sound, command_executed = session.sounds["click"], session.sounds["alert"], session.sounds["command_executed"]
+    battery_image, temperature_image, speed_image = session.images["battery"], session.images["temperature"], session.images["speed"]
     
-    #Play the startup video behind the UI
-    play_static_video("media/static.mp4", screen, SCREEN_WIDTH, SCREEN_HEIGHT, background_image)
+    #Create button instances, their images are already in the asset store
+    stop_button = Button(400, 600, 90, 90, stop_action, "icons/EStopCommandBlock.png")
+    recording_button = Button(525, 600, 90, 90, recording_action, "icons/StartRecordingCommandBlock.png", "icons/RecordingOnCommandBlock.png")
+    camera_button = Button(650, 600, 90, 90, camera_action, "icons/ToggleCameraOnCommandBlock.png", "icons/ToggleCameraOffCommandBlock.png")
+    buttons = [recording_button, stop_button, camera_button] #List of buttons used in mouse hover checking
+    command_list = ScrollableCommandList(commands, screen, widthRatio=0.12, height=400, x=120, y=190, tracer=tracer)
+    
+    #Start the camera threads
+    frame_pump.start()
+    camera_thread.start()
     #Create a DroneFlight instance
-    executor = DroneFlight(tello)
+    executor = DroneFlight(TracedDrone(tello, tracer) if tracer.enabled else tello)  #Traced calls show when a command was sent and acknowledged
+    #Merge neighbouring blocks into fewer drone calls, every step remembers the blocks it came from
+    if optimize_program or execution_mode == "compiled":
+        steps = optimize(commands, distance=executor.distance, rotate=executor.rotate, hover=executor.hover)
+    else:
+        steps = [Step(command, None, (index,)) for index, command in enumerate(commands)]  #One call per block
+    print(describe(commands, steps))
+
+    if execution_mode == "compiled":
+        plan = compile_program(steps)  #Fly runs of moves as go/curve segments without stopping in between
+    else:
+        plan = primitive_segments(steps)
+    #Compare the predicted and measured time against flying every block on its own
+    duration_model = DurationModel(distance=executor.distance, rotate=executor.rotate, hover=executor.hover)
+    report = DurationReport(duration_model, duration_model.block_by_block(commands))
+    run_step = lambda segment: executor.compiled_command(segment, test=test)  #test prints the commands without moving the drone
     
-    #Start automatic execution in a background thread
-    command_thread = threading.Thread(target=execute_commands, args=(executor, command_list), daemon=True)
-    command_thread.start()
+    #Start automatic execution, the executor owns the drone link from here on
+    command_executor = CommandExecutor(tello, tracer=tracer, telemetry=telemetry).start()  #Telemetry shows when an emergency stop took effect
+    for segment in plan:
+        tracer.instant("queued", "command", id=segment.sources[0], command=to_sdk(segment))
+    #A command that takes far longer than predicted is treated as stuck and the drone is landed
+    timeout_for = lambda segment: 2 * duration_model.segment(segment) + 10
+    program = command_executor.run_plan(plan, fly_segment, segment_done, timeout_for)
+    program.add_done_callback(program_finished)
     running = True
+    display_frames = FrameSubscriber(display_slot)
+    telemetry_version = telemetry.version
     
     try:
         while running:  
+            frame_start = tracer.clock()
             #Display Video Feed
             if camera_toggle:
-                if not frame_queue.empty():
-                    frame = frame_queue.get()
-                    #Convert the frame to a Pygame surface
-                    webcam_surface = pygame.surfarray.make_surface(frame)
+                frame = display_frames.poll()  #Only frames that have not been shown yet
+                if frame is not None:
+                    scheduler.notify_activity()
+                    #Wrap the frame buffer as a Pygame surface
+                    tracer.instant("displayed", "camera", frame=display_frames.sequence)
+                    webcam_surface = frame_transformer.to_surface(frame)
                     webcam_rect = webcam_surface.get_rect()
                     webcam_rect.center = (840, 365)
                     screen.blit(webcam_surface, webcam_rect)
@@ -205,30 +239,16 @@ def run_user_interface(commands):
             #Get Mouse Position
             mouse_pos = pygame.mouse.get_pos()
             
-            #Get Drone stats
-            try:
-                battery_text = f"{tello.get_battery()}%"
-            except Exception:
-                battery_text = "na"
-            try:
-                temperature_text = f"{tello.get_temperature()} °C"
-            except Exception:
-                temperature_text = "na"
-            try:
-                speed_x = tello.get_speed_x()
-                speed_y = tello.get_speed_y()
-                speed_z = tello.get_speed_z()
-                
-                speed = math.sqrt(speed_x**2 + speed_y**2 + speed_z**2)  #Calculate magnitude
-                speed = round(speed, 2)
-                speed_text = f"{speed} m/s"
-            except Exception:
-                speed_text = "na"
+            #Get Drone stats from the latest telemetry snapshot, the drone itself is never called here
+            snapshot = telemetry.snapshot
+            if telemetry.version != telemetry_version:
+                telemetry_version = telemetry.version
+                scheduler.notify_activity()
                 
             #Draw drone stats
-            draw_text(battery_text, 1175, 61, size=17)
-            draw_text(temperature_text, 1175, 96, size=17)
-            draw_text(speed_text, 1175, 131, size=17)
+            draw_text(snapshot.text("battery"), 1175, 61, size=17)
+            draw_text(snapshot.text("temperature"), 1175, 96, size=17)
+            draw_text(snapshot.text("speed"), 1175, 131, size=17)
             #Check if the cursor should change on button hover
             hovering_over_button = any(button.is_hovered(mouse_pos) for button in buttons)
             if hovering_over_button:
@@ -238,6 +258,7 @@ def run_user_interface(commands):
         
             #Event Handling
             for event in pygame.event.get():
+                scheduler.handle_event(event)
                 if event.type == pygame.QUIT:
                     running = False
                         
@@ -255,33 +276,44 @@ def run_user_interface(commands):
                       
             #Draw Command List
             command_list.draw()
+            scheduler.draw_overlay(screen)
             pygame.display.flip()
+            tracer.complete("frame", "ui", frame_start)  #Long frames here are where the UI stalls
+            scheduler.tick()  #Sleep out the rest of the frame, idles at a low rate when nothing changes
     except KeyboardInterrupt:
         print("Force Quiting Program due to interupt...")
         
     finally:
-        print("Closing program...")
-        #stop threads
+        print("Closing flight screen...")
+        #stop threads, the session's link, stream and telemetry stay open for the next flight
+        telemetry.tracer = None
+        frame_pump.stop()
         camera_running.clear()
-        command_thread_running.clear()
+        recorder.stop(wait=True)
+        command_executor.shutdown()  #Lands if still flying and waits for the command in the air, the next flight gets a clean link
+        print(f"Emergency stops: {command_executor.stop_stats()}")
+        if tracer.enabled:
+            tracer.write_chrome_trace(f"{trace_path}.trace.json")
+            tracer.write_jsonl(f"{trace_path}.jsonl")
+            print(f"Flight trace written to {trace_path}.trace.json, time per span: {tracer.summary()}")
         #Wait for threads to exit
         if camera_thread.is_alive():
             camera_thread.join(timeout=2)  #Max 2 seconds wait
-        
-        if command_thread.is_alive():
-            command_thread.join(timeout=2)
 
-        try:
-            tello.streamoff()
-            tello.end()
-        except Exception as e:
-            print(f"Error closing Tello connection: {e}")
-            
-        pygame.quit()
+
+        print(f"Camera pipeline: {frame_transformer.report()}")
+        print(f"Text cache: {text_cache.stats()}")
+        print(f"Frame delivery: {frame_pump.stats()}, displayed {display_frames.stats()}")
+        print(f"Drone session: {session.flights} flights on {session.connects} connections")
+        pygame.display.set_caption(*editor_caption)  #Back to the editor
         
 if __name__ == "__main__":
     commands = ["takeoff", "fly_forward", "fly_forward", "fly_right", "fly_left", "fly_backward", "fly_backward", "land"]
     #commands = ["takeoff", "fly_forward", "fly_up", "fly_down", "fly_forward", 
     #        "fly_up", "fly_down", "fly_forward", "fly_up", "fly_down", "land"]
-    run_user_interface(commands)
+    try:
+        run_user_interface(commands)
+    finally:
+        drone_session.session.close()
+        pygame.quit()
     
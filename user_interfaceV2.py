@@ -4,10 +4,11 @@ from ScrollableCommandList import ScrollableCommandList
 from CustomButton import Button
 import threading
 import queue
-from djitellopy import Tello
+from tello_simulator import create_tello
 import cv2
 from take_commands import DroneFlight
 from Custom_Video_Player import play_static_video
+from asset_atlas import assets
 import time #needed for time.sleep(1) with autoscroll commands
 
 class DroneControlApp:
@@ -16,7 +17,7 @@ class DroneControlApp:
         self.camera_toggle = True
         self.camera_running = True
         self.frame_queue = queue.Queue(maxsize=1)
-        self.tello = Tello()
+        self.tello = create_tello()  #The real drone, or the simulator when DRONEBLOCKS_SIMULATOR is set
         self.tello.connect()
         self.flight = DroneFlight(self.tello)
         self.tello.streamon()
@@ -30,8 +31,7 @@ class DroneControlApp:
         self.SCREEN_HEIGHT = 700
         self.screen = pygame.display.set_mode((self.SCREEN_WIDTH, self.SCREEN_HEIGHT))
         pygame.display.set_caption("Drone GUI")
-        self.background_image = pygame.image.load("icons/background.png")
-        self.background_image = pygame.transform.scale(self.background_image, (self.SCREEN_WIDTH, self.SCREEN_HEIGHT))
+        self.background_image = assets.image("icons/background.png", (self.SCREEN_WIDTH, self.SCREEN_HEIGHT), smooth=False)
 
         self.command_list = ScrollableCommandList(self.commands, self.screen, widthRatio=0.12, height=400, x=120, y=190)
         pygame.mixer.Sound.play(self.startup_sound)
@@ -72,7 +72,8 @@ class DroneControlApp:
     def run(self):
 
         self.camera_thread.start()
-        play_static_video("media/static.mp4", self.screen, self.SCREEN_WIDTH, self.SCREEN_HEIGHT, self.background_image)
+        if play_static_video("media/static.mp4", self.screen, self.SCREEN_WIDTH, self.SCREEN_HEIGHT, self.background_image) == "quit":
+            self.running = False  #Closed during the intro, go straight to the cleanup
 
         try:
             while self.running:
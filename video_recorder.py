@@ -0,0 +1,176 @@
+import os
+import queue
+import threading
+import time
+
+import cv2
+
+
+class VideoRecorder:
+    DROP_OLDEST = "drop_oldest"  # keep the newest frames, the saved video skips ahead
+    DROP_NEWEST = "drop_newest"  # keep what is queued, new frames are thrown away
+    BLOCK = "block"  # never drop, the camera thread waits for the encoder
+
+    def __init__(self, directory, frame_size, fps=30.0, segment_seconds=60, queue_size=60,
+                 drop_policy=DROP_OLDEST, fourcc="H264", prefix="drone_footage"):
+        """
+        Records camera frames on its own writer thread so encoding never holds up capture or the preview.
+        Frames are handed over through a bounded queue and the output is split into time based
+        segments named <prefix>_<start time>_<segment>.mp4, so no recording overwrites another.
+
+        Parameters:
+            directory (str): Folder the segments are saved in, created if missing.
+            frame_size (tuple): The (width, height) of the submitted frames.
+            fps (float): Frame rate written into the files.
+            segment_seconds (float): Length of a segment before the next file is started.
+            queue_size (int): Most frames waiting for the encoder.
+            drop_policy (str): What submit does when the queue is full, see the class constants.
+            fourcc (str): Codec for cv2.VideoWriter.
+            prefix (str): Start of every file name.
+        """
+        if drop_policy not in (self.DROP_OLDEST, self.DROP_NEWEST, self.BLOCK):
+            raise ValueError(f"Unknown drop policy: {drop_policy}")
+
+        self.directory = directory
+        self.frame_size = frame_size
+        self.fps = fps
+        self.segment_seconds = segment_seconds
+        self.queue_size = queue_size
+        self.drop_policy = drop_policy
+        self.fourcc = fourcc
+        self.prefix = prefix
+
+        self._lock = threading.Lock()
+        self._queue = None
+        self._finish = None
+        self._thread = None
+        self._counts = self._new_counts()
+
+    @staticmethod
+    def _new_counts():
+        """Counters of one recording, its writer thread keeps them even after the next recording started."""
+        return {"submitted": 0, "written": 0, "dropped": 0, "encode_seconds": 0.0, "segments": []}
+
+    @property
+    def recording(self):
+        return self._queue is not None
+
+    def start(self):
+        """Starts a new recording, does nothing if one is already running."""
+        with self._lock:
+            if self._queue is not None:
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            # A previous recording may still be flushing, it keeps its own queue, counters and writer thread
+            self._counts = self._new_counts()
+            self._queue = queue.Queue(maxsize=self.queue_size)
+            self._finish = threading.Event()
+            self._thread = threading.Thread(target=self._write_frames, args=(self._queue, self._finish, self._counts), daemon=True)
+            self._thread.start()
+
+    def stop(self, wait=False, timeout=5):
+        """
+        Stops accepting frames and returns straight away, the writer thread encodes what is still
+        queued and closes the file. Pass wait=True to block until the file is complete.
+        """
+        with self._lock:
+            frames, finish, thread = self._queue, self._finish, self._thread
+            self._queue = None
+        if frames is None:
+            return
+        finish.set()  # never blocks, unlike queueing an end marker behind a full queue
+        if wait:
+            thread.join(timeout=timeout)
+
+    def submit(self, frame):
+        """
+        Queues a frame for encoding and returns True if it was accepted.
+        The recorder keeps the array, so pass a frame the caller will not reuse.
+        """
+        frames, finish, counts = self._queue, self._finish, self._counts
+        if frames is None:
+            return False
+        counts["submitted"] += 1
+        item = (time.monotonic(), frame)
+
+        if self.drop_policy == self.BLOCK:
+            # Wait for the encoder, but not for one that was told to finish and will not read any more
+            while not finish.is_set():
+                try:
+                    frames.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        try:
+            frames.put_nowait(item)
+            return True
+        except queue.Full:
+            pass
+
+        counts["dropped"] += 1
+        if self.drop_policy == self.DROP_NEWEST:
+            return False
+        try:
+            frames.get_nowait()  # make room by throwing away the oldest frame
+        except queue.Empty:
+            pass
+        try:
+            frames.put_nowait(item)
+        except queue.Full:
+            return False
+        return True
+
+    def _open_segment(self, started, segments):
+        now = time.time()
+        #Milliseconds too, a recording started right after another must not write over it while it is still flushing
+        name = f"{self.prefix}_{time.strftime('%Y%m%d-%H%M%S', time.localtime(now))}.{int(now * 1000) % 1000:03d}_{len(segments):03d}.mp4"
+        path = os.path.join(self.directory, name)
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*self.fourcc), self.fps, self.frame_size)
+        segments.append(path)
+        print(f"Recording to {path}")
+        return writer, started
+
+    def _write_frames(self, frames, finish, counts):
+        writer = None
+        segment_start = None
+        while True:
+            try:
+                item = frames.get(timeout=0.1)
+            except queue.Empty:
+                if finish.is_set():
+                    break  # stopped and everything queued is written
+                continue
+            captured, frame = item
+
+            # Roll over on the capture time so segments keep their length even if the encoder falls behind
+            if writer is None or captured - segment_start >= self.segment_seconds:
+                if writer is not None:
+                    writer.release()
+                writer, segment_start = self._open_segment(captured, counts["segments"])
+
+            start = time.perf_counter()
+            writer.write(frame)
+            counts["encode_seconds"] += time.perf_counter() - start
+            counts["written"] += 1
+
+        if writer is not None:
+            writer.release()
+        print(f"Recording finished: {self._summary(counts, 0)}")
+
+    def stats(self):
+        """Returns encoder throughput, queue depth and drop counters for the current or last recording."""
+        frames = self._queue
+        return self._summary(self._counts, frames.qsize() if frames is not None else 0)
+
+    @staticmethod
+    def _summary(counts, queue_depth):
+        return {
+            "submitted": counts["submitted"],
+            "written": counts["written"],
+            "dropped": counts["dropped"],
+            "queue_depth": queue_depth,
+            "encode_fps": counts["written"] / counts["encode_seconds"] if counts["encode_seconds"] else 0.0,
+            "segments": list(counts["segments"]),
+        }